@@ -1,3 +1,4 @@
+import { gunzipSync } from 'zlib';
 import { NextRequest, NextResponse } from 'next/server';
 import { createServerSupabaseClient } from '@/lib/supabase/server';
 
@@ -7,13 +8,38 @@ import { createServerSupabaseClient } from '@/lib/supabase/server';
  * Webhook endpoint for the Python crawler to push results after each run.
  * Protected by CRON_SECRET (shared secret between crawler and API).
  * 
- * Expected payload:
+ * Expected payload (optionally sent with `Content-Encoding: gzip`):
  * {
+ *   "run_id": "uuid generated by the crawler",
+ *   "chunk_index": 0,
+ *   "chunk_count": 3,
  *   "scrapers": ["UPSC", "SSC", "BPSC"],
- *   "exams": [{ ...exam data matching DB schema }],
- *   "stats": { "scraped": 10, "new": 3, "updated": 5, "errors": 2 },
- *   "error_log": "optional error details"
+ *   "exams": [{ ...exam data matching DB schema }],   // only new/changed exams
+ *   "stats": { "scraped": 10, "new": 3, "updated": 5, "errors": 2,
+ *              "perf_regressions": [{ "scraper": "BPSC", "metric": "duration_ms", "value": 412000,
+ *                                     "median": 133000, "message": "BPSC fetch time 3.1× the 14-day median (412s vs 133s)" }] },
+ *   "error_log": "optional error details",
+ *   "status_changes": { "closed_count": 4, "opened_count": 1, "coming_soon_count": 0 }  // optional
  * }
+ *
+ * A run may arrive as several chunks sharing one run_id; they are
+ * accumulated into the same crawler_runs row (id = run_id) and the run is
+ * finalised once every chunk has arrived (in any order).
+ *
+ * Each chunk carries an `Idempotency-Key` header ("<run_id>:<chunk_index>").
+ * record_crawler_chunk() (migration 009) records the key in
+ * crawler_run_chunks and adds the chunk's counters to the run in one
+ * statement, so a spooled retry never double-counts, even one that arrives
+ * while the first attempt is still in flight. A chunk that cannot be
+ * recorded gets a non-2xx response and stays spooled in the crawler.
+ *
+ * `stats.perf_regressions` lists scrapers whose fetch time or yield deviates
+ * significantly from their own recent history (crawler/perfhistory.py); it
+ * is stored with the run in metadata.crawler_stats.
+ *
+ * `status_changes` is present when the crawler already applied the due exam
+ * status transitions itself (crawler/transitions.py); the full-table
+ * update_exam_statuses() sweep is then skipped.
  */
 
 export const dynamic = 'force-dynamic';
@@ -30,29 +56,83 @@ export async function POST(request: NextRequest) {
 
   let body: any;
   try {
-    body = await request.json();
+    const raw = Buffer.from(await request.arrayBuffer());
+    const isGzip = request.headers.get('content-encoding')?.toLowerCase() === 'gzip';
+    body = JSON.parse((isGzip ? gunzipSync(raw) : raw).toString('utf-8'));
   } catch {
     return NextResponse.json({ error: 'Invalid JSON body' }, { status: 400 });
   }
 
-  const { scrapers = [], exams = [], stats = {}, error_log = '' } = body;
+  const {
+    run_id: crawlerRunId,
+    chunk_index: chunkIndex = 0,
+    chunk_count: chunkCount = 1,
+    scrapers = [],
+    exams = [],
+    stats = {},
+    error_log = '',
+    status_changes: crawlerStatusChanges = null,
+  } = body;
+  const idempotencyKey =
+    request.headers.get('idempotency-key') || (crawlerRunId ? `${crawlerRunId}:${chunkIndex}` : null);
 
   // eslint-disable-next-line @typescript-eslint/no-explicit-any
   const supabase = await createServerSupabaseClient() as any;
 
-  // Create crawler_run record
-  const { data: run } = await supabase
-    .from('crawler_runs')
-    .insert({
-      run_type: 'webhook',
-      status: 'running',
-      scrapers_run: scrapers,
-      started_at: new Date().toISOString(),
-    })
-    .select('id')
-    .single();
+  // Create the crawler_run record, or find it when another chunk got there
+  // first (upsert, so racing first chunks cannot both insert it)
+  let runId: string | undefined = crawlerRunId;
+  if (crawlerRunId) {
+    const { error } = await supabase
+      .from('crawler_runs')
+      .upsert(
+        {
+          id: crawlerRunId,
+          run_type: 'webhook',
+          status: 'running',
+          scrapers_run: scrapers,
+          started_at: new Date().toISOString(),
+        },
+        { onConflict: 'id', ignoreDuplicates: true },
+      );
+    if (error) {
+      // Non-2xx: the crawler keeps the chunk spooled and retries it
+      return NextResponse.json({ error: `Could not record run: ${error.message}` }, { status: 503 });
+    }
 
-  const runId = run?.id;
+    // Cheap early exit for a chunk that was already accounted; the atomic
+    // check is record_crawler_chunk() below
+    if (idempotencyKey) {
+      const { data: seen } = await supabase
+        .from('crawler_run_chunks')
+        .select('chunk_key')
+        .eq('run_id', crawlerRunId)
+        .eq('chunk_key', idempotencyKey)
+        .maybeSingle();
+      if (seen) {
+        return NextResponse.json({ success: true, duplicate: true, run_id: crawlerRunId });
+      }
+    }
+  } else {
+    // Legacy payload without a run_id: one chunk, one run
+    const { data: run, error } = await supabase
+      .from('crawler_runs')
+      .insert({
+        run_type: 'webhook',
+        status: 'running',
+        scrapers_run: scrapers,
+        started_at: new Date().toISOString(),
+      })
+      .select('id')
+      .single();
+    if (error || !run) {
+      return NextResponse.json(
+        { error: `Could not record run: ${error?.message || 'no row returned'}` },
+        { status: 503 },
+      );
+    }
+    runId = run.id;
+  }
 
   try {
     let newCount = 0;
@@ -111,30 +191,53 @@ export async function POST(request: NextRequest) {
       }
     }
 
-    // Also auto-update statuses
-    const { data: statusResult } = await supabase.rpc('update_exam_statuses');
-    const statusChanges = statusResult?.[0] || statusResult || {};
-
+    // Record the chunk and add its counters to the run in one statement; a
+    // retry that raced the first attempt is reported as a duplicate here
     const duration = Date.now() - startTime;
+    const { data: recorded, error: recordError } = await supabase.rpc('record_crawler_chunk', {
+      p_run_id: runId,
+      p_chunk_key: idempotencyKey,
+      p_found: exams.length,
+      p_new: newCount,
+      p_updated: updatedCount,
+      p_errors: errorCount,
+      p_error_log: [...errors, error_log].filter(Boolean).join('\n') || null,
+      p_duration_ms: duration,
+    });
+    if (recordError) {
+      throw new Error(`Could not record chunk: ${recordError.message}`);
+    }
+    const chunk = recorded?.[0] || recorded || {};
+    if (chunk.duplicate) {
+      return NextResponse.json({ success: true, duplicate: true, run_id: runId });
+    }
+    // Exactly one chunk of a run sees every chunk recorded
+    const isLastChunk = idempotencyKey ? chunk.received === chunkCount : true;
 
-    // Update crawler_run record
-    if (runId) {
+    // Auto-update statuses once per run, after the last chunk — unless the
+    // crawler already applied the due transitions and reports them
+    // eslint-disable-next-line @typescript-eslint/no-explicit-any
+    let statusChanges: any = {};
+    if (isLastChunk && crawlerStatusChanges) {
+      statusChanges = crawlerStatusChanges;
+    } else if (isLastChunk) {
+      const { data: statusResult } = await supabase.rpc('update_exam_statuses');
+      statusChanges = statusResult?.[0] || statusResult || {};
+    }
+
+    // Finalise the run record once every chunk has been counted
+    if (isLastChunk) {
       await supabase
         .from('crawler_runs')
         .update({
-          status: errorCount > 0 ? 'partial' : 'success',
-          exams_found: exams.length,
-          exams_new: newCount,
-          exams_updated: updatedCount,
+          status: (chunk.total_errors || 0) > 0 ? 'partial' : 'success',
           exams_closed: statusChanges.closed_count || 0,
-          errors: errorCount,
-          error_log: errors.length > 0 ? errors.join('\n') : (error_log || null),
-          duration_ms: duration,
           finished_at: new Date().toISOString(),
           metadata: {
             crawler_stats: stats,
             status_changes: statusChanges,
             scrapers,
+            chunks: chunkCount,
           },
         })
         .eq('id', runId);
@@ -153,15 +256,18 @@ export async function POST(request: NextRequest) {
     const duration = Date.now() - startTime;
 
     if (runId) {
+      // Added to what earlier chunks accumulated; no chunk key, so the
+      // crawler's retry of this chunk is still counted
+      await supabase.rpc('record_crawler_chunk', {
+        p_run_id: runId,
+        p_chunk_key: null,
+        p_errors: 1,
+        p_error_log: error.message || 'Webhook processing failed',
+        p_duration_ms: duration,
+      });
       await supabase
         .from('crawler_runs')
-        .update({
-          status: 'failed',
-          errors: 1,
-          error_log: error.message || 'Webhook processing failed',
-          duration_ms: duration,
-          finished_at: new Date().toISOString(),
-        })
+        .update({ status: 'failed', finished_at: new Date().toISOString() })
         .eq('id', runId);
     }
 
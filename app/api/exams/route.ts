@@ -1,6 +1,38 @@
 import { NextRequest, NextResponse } from 'next/server';
+import { gunzipSync } from 'zlib';
 import { createServerSupabaseClient } from '@/lib/supabase/server';
 
+// Static feeds exported by the crawler (python main.py --export), served from
+// a CDN or /public. Unset → always query Supabase.
+const FEEDS_URL = process.env.EXAM_FEEDS_URL?.replace(/\/$/, '');
+
+type Exam = Record<string, unknown>;
+type FeedManifest = { feeds: Record<string, { file: string; count: number }> };
+
+async function fetchFeed(path: string): Promise<unknown> {
+  const res = await fetch(`${FEEDS_URL}/${path}`, { next: { revalidate: 60 } });
+  if (!res.ok) throw new Error(`${path}: HTTP ${res.status}`);
+  const bytes = Buffer.from(await res.arrayBuffer());
+  // Served without Content-Encoding: gzip the body is still compressed
+  const text = bytes[0] === 0x1f && bytes[1] === 0x8b ? gunzipSync(bytes).toString('utf-8') : bytes.toString('utf-8');
+  return JSON.parse(text);
+}
+
+// Active exams matching the filters, newest first, from the narrowest feed.
+async function examsFromFeeds(filters: Record<string, string | null>): Promise<Exam[] | null> {
+  const manifest = await fetchFeed('manifest.json') as FeedManifest;
+  const candidates = Object.entries(filters)
+    .filter(([, value]) => value)
+    .map(([field, value]) => manifest.feeds[`${field}:${value}`]);
+  if (candidates.some((feed) => !feed)) return [];   // no active exam has that value
+  const feed = [manifest.feeds.all, ...candidates].sort((a, b) => a.count - b.count)[0];
+  if (!feed) return null;
+  const exams = await fetchFeed(feed.file) as Exam[];
+  return exams.filter((exam) =>
+    Object.entries(filters).every(([field, value]) => !value || exam[field] === value)
+  );
+}
+
 export async function GET(request: NextRequest) {
   // eslint-disable-next-line @typescript-eslint/no-explicit-any
   const supabase = await createServerSupabaseClient() as any;
@@ -14,6 +46,31 @@ export async function GET(request: NextRequest) {
   const pageSize = parseInt(searchParams.get('pageSize') ?? '20', 10);
   const offset   = (page - 1) * pageSize;
 
+  if (FEEDS_URL) {
+    try {
+      let exams = await examsFromFeeds({ level, status, state });
+      if (exams) {
+        if (search) {
+          const needle = search.toLowerCase();
+          exams = exams.filter((exam) =>
+            ['exam_name', 'organization', 'description'].some((field) =>
+              String(exam[field] ?? '').toLowerCase().includes(needle)
+            )
+          );
+        }
+        return NextResponse.json({
+          exams: exams.slice(offset, offset + pageSize),
+          total: exams.length,
+          page,
+          pageSize,
+          totalPages: Math.ceil(exams.length / pageSize),
+        });
+      }
+    } catch (err) {
+      console.error('Exam feeds unavailable, querying Supabase:', err);
+    }
+  }
+
   let query = supabase
     .from('exams')
     .select('*', { count: 'exact' })
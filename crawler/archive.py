@@ -0,0 +1,226 @@
+"""
+Page Archive
+-------------
+Local, content-addressed copy of everything the scrapers fetch (listing
+pages, detail pages, PDFs, Selenium-rendered HTML), so parser fixes can be
+checked and backfilled offline (`main.py --reparse`).
+
+Layout under ARCHIVE_DIR (default STATE_DIR/archive):
+
+  blobs/ab/abcdef….zst       page body, keyed by sha256 of the raw bytes,
+                             zstd-compressed (gzip `.gz` when the optional
+                             `zstandard` package is not installed)
+  manifests/<run_id>.jsonl   one line per fetch: url → sha256, status,
+                             content type, time, scraper
+
+Identical bodies are stored once across all runs; a blob's mtime is bumped
+whenever it is seen again. `prune()` drops manifests and blobs not seen
+for ARCHIVE_RETENTION_DAYS, then the least recently seen blobs until the
+store fits in ARCHIVE_MAX_MB. Storing costs one hash plus, for new bodies
+only, one compress + write, so it is left on in production.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Iterator, Optional
+
+from config import (
+    ARCHIVE_DIR,
+    ARCHIVE_ENABLED,
+    ARCHIVE_MAX_MB,
+    ARCHIVE_PRUNE_INTERVAL,
+    ARCHIVE_RETENTION_DAYS,
+)
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+except ImportError:   # optional; gzip is used instead
+    zstandard = None
+
+
+def _compress(data: bytes) -> tuple[bytes, str]:
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=3).compress(data), ".zst"
+    return gzip.compress(data, compresslevel=6), ".gz"
+
+
+def _decompress(data: bytes, suffix: str) -> bytes:
+    if suffix == ".zst":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read .zst archive blobs")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class PageArchive:
+    def __init__(self, root: Path = ARCHIVE_DIR):
+        self.root = root
+        self.blobs = root / "blobs"
+        self.manifests = root / "manifests"
+        self.blobs.mkdir(parents=True, exist_ok=True)
+        self.manifests.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.stored = 0    # new blobs written by this process
+        self.deduped = 0   # bodies already in the store
+
+    # ── Writing ──────────────────────────────────────────────────────────────
+    def store(
+        self,
+        url: str,
+        content: bytes,
+        status: int = 200,
+        content_type: str | None = None,
+        scraper: str | None = None,
+        run_id: str | None = None,
+    ) -> str:
+        """
+        Archive one fetched body and log it in the manifest of `run_id`
+        (fetches outside a crawl run go to a per-day "adhoc" manifest).
+        Returns the body's sha256.
+        """
+        digest = hashlib.sha256(content).hexdigest()
+        existing = self._blob_path(digest)
+        if existing is not None:
+            self.deduped += 1
+            try:
+                os.utime(existing)
+            except OSError:
+                pass
+        else:
+            data, suffix = _compress(content)
+            path = self.blobs / digest[:2] / (digest + suffix)
+            path.parent.mkdir(exist_ok=True)
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}")
+            tmp.write_bytes(data)
+            tmp.replace(path)
+            self.stored += 1
+
+        entry = {
+            "url": url,
+            "sha256": digest,
+            "status": status,
+            "content_type": content_type,
+            "size": len(content),
+            "fetched_at": time.time(),
+            "scraper": scraper,
+        }
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        run_id = run_id or f"adhoc-{time.strftime('%Y%m%d')}"
+        with self._lock:
+            # One O_APPEND write per line, so --isolate workers can share a manifest
+            fd = os.open(self.manifests / f"{run_id}.jsonl", os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+        return digest
+
+    # ── Reading ──────────────────────────────────────────────────────────────
+    def _blob_path(self, digest: str) -> Optional[Path]:
+        for suffix in (".zst", ".gz"):
+            path = self.blobs / digest[:2] / (digest + suffix)
+            if path.exists():
+                return path
+        return None
+
+    def load(self, digest: str) -> Optional[bytes]:
+        path = self._blob_path(digest)
+        if path is None:
+            return None
+        return _decompress(path.read_bytes(), path.suffix)
+
+    def manifest(self, run_id: str | None = None) -> Iterator[dict]:
+        """Entries of one run's manifest, or of every manifest (oldest first)."""
+        paths = (
+            [self.manifests / f"{run_id}.jsonl"] if run_id
+            else sorted(self.manifests.glob("*.jsonl"), key=lambda p: p.stat().st_mtime)
+        )
+        for path in paths:
+            try:
+                with path.open(encoding="utf-8") as fh:
+                    for line in fh:
+                        if line.strip():
+                            yield json.loads(line)
+            except (OSError, ValueError) as exc:
+                logger.warning("Skipping unreadable manifest %s: %s", path, exc)
+
+    # ── Retention ────────────────────────────────────────────────────────────
+    def prune(
+        self,
+        retention_days: float = ARCHIVE_RETENTION_DAYS,
+        max_bytes: float = ARCHIVE_MAX_MB * 1024 * 1024,
+    ) -> int:
+        """Apply retention and the size cap. Returns the number of files removed."""
+        cutoff = time.time() - retention_days * 86400
+        removed = 0
+        for manifest in self.manifests.glob("*.jsonl"):
+            if manifest.stat().st_mtime < cutoff:
+                manifest.unlink(missing_ok=True)
+                removed += 1
+
+        blobs = []
+        for path in self.blobs.glob("*/*"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            if st.st_mtime < cutoff:
+                path.unlink(missing_ok=True)
+                removed += 1
+            else:
+                blobs.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _, size, _ in blobs)
+        if max_bytes and total > max_bytes:
+            for _, size, path in sorted(blobs):   # least recently seen first
+                path.unlink(missing_ok=True)
+                removed += 1
+                total -= size
+                if total <= max_bytes:
+                    break
+
+        (self.root / ".pruned").touch()
+        if removed:
+            logger.info("Archive pruned: %d file(s) removed, %.1f MB kept", removed, total / 2**20)
+        return removed
+
+    def maybe_prune(self) -> None:
+        """prune() at most once per ARCHIVE_PRUNE_INTERVAL (shared across processes)."""
+        marker = self.root / ".pruned"
+        try:
+            if time.time() - marker.stat().st_mtime < ARCHIVE_PRUNE_INTERVAL:
+                return
+        except FileNotFoundError:
+            pass
+        try:
+            self.prune()
+        except OSError as exc:
+            logger.warning("Archive prune failed: %s", exc)
+
+
+_archive: Optional[PageArchive] = None
+_archive_lock = threading.Lock()
+
+
+def get_archive() -> Optional[PageArchive]:
+    """The process-wide archive, or None when ARCHIVE_ENABLED is off or it cannot open."""
+    global _archive
+    if not ARCHIVE_ENABLED:
+        return None
+    with _archive_lock:
+        if _archive is None:
+            try:
+                _archive = PageArchive()
+            except OSError as exc:
+                logger.warning("Page archive unavailable (%s) — not archiving.", exc)
+                return None
+    return _archive
@@ -0,0 +1,99 @@
+"""
+Exam-record memory benchmark
+-----------------------------
+Measures what N exams cost in memory as compact `ExamRecord`s (shared,
+interned metadata — see records.py) versus the plain 16-key dicts they
+replace, e.g. for a backfill from archived pages.
+
+The exams are built through the real UPPSC spec scraper's `_make_exam`,
+with its metadata tables, so the sharing matches a real run.
+
+Fails (exit 1) when records take more than --max-ratio of the dict size.
+
+Usage
+-----
+  python benchmarks/memory.py                  # 20 000 exams
+  python benchmarks/memory.py -n 100000
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+from pathlib import Path
+
+CRAWLER_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(CRAWLER_DIR))
+
+
+def _build(n: int) -> list:
+    from scrapers import get_scraper
+
+    cls = get_scraper("uppsc")
+    scraper = cls()
+    meta_variants = [{}] + list(cls.SPEC.exam_meta.values())
+    exams = []
+    try:
+        for i in range(n):
+            extra = {**cls.SPEC.default_meta, **meta_variants[i % len(meta_variants)]}
+            exams.append(scraper._make_exam(
+                exam_name=f"UPPSC Combined Recruitment Notice {i:06d}",
+                official_website=f"{cls.BASE_URL}/notice/{i}",
+                notification_pdf=f"{cls.BASE_URL}/pdf/{i}.pdf",
+                application_last_date=f"2026-{1 + i % 12:02d}-{1 + i % 28:02d}",
+                description=extra.pop("description", f"Official UPPSC recruitment notice {i}"),
+                **extra,
+            ))
+    finally:
+        scraper.close()
+    return exams
+
+
+def _clean(text: str) -> str:
+    from scrapers.base import BaseScraper
+
+    return BaseScraper._clean(text)
+
+
+def measure(n: int) -> tuple[int, int]:
+    """Return (bytes held by n records, bytes held by the same exams as dicts)."""
+    _build(1)   # import scrapers / bs4 / requests outside the measurement
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    records = _build(n)
+    gc.collect()
+    record_bytes = tracemalloc.get_traced_memory()[0] - base
+
+    base = tracemalloc.get_traced_memory()[0]
+    # The old representation: _make_exam ran every string through _clean, so
+    # each exam dict carried its own copy of the shared metadata
+    dicts = [{k: _clean(v) if isinstance(v, str) else v for k, v in r.items()} for r in records]
+    gc.collect()
+    dict_bytes = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del dicts, records
+    return record_bytes, dict_bytes
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("-n", type=int, default=20_000, help="Number of exams.")
+    p.add_argument("--max-ratio", type=float, default=float(os.environ.get("MEMORY_MAX_RATIO", 0.5)))
+    args = p.parse_args()
+
+    record_bytes, dict_bytes = measure(args.n)
+    ratio = record_bytes / dict_bytes if dict_bytes else 0.0
+    print(f"records: {record_bytes / 1e6:8.2f} MB  ({record_bytes / args.n:6.0f} B/exam)")
+    print(f"dicts:   {dict_bytes / 1e6:8.2f} MB  ({dict_bytes / args.n:6.0f} B/exam)")
+    print(f"ratio:   {ratio:.2f} (max {args.max_ratio:.2f})")
+    if ratio > args.max_ratio:
+        print("FAIL: exam records use more memory than allowed")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""
+Startup-time benchmark
+-----------------------
+Guards the crawler's cold start (`main.py --dry-run --scrapers bpsc`)
+against import-time regressions using `python -X importtime`.
+
+Fails (exit 1) when:
+  - importing main + resolving one static scraper takes longer than the budget
+  - any heavy module (selenium, supabase, tenacity, dateutil, …) is imported
+    before it is actually used
+
+Usage
+-----
+  python benchmarks/startup.py                   # default budget
+  python benchmarks/startup.py --budget-ms 250   # tighter budget
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+CRAWLER_DIR = Path(__file__).resolve().parent.parent
+
+# Must not be imported just to start a static-HTML scraper run
+DEFERRED_MODULES = (
+    "selenium",
+    "webdriver_manager",
+    "supabase",
+    "postgrest",
+    "tenacity",
+    "dateutil",
+)
+
+_PROBE = "import main, scrapers; scrapers.get_scraper('bpsc')"
+
+
+def measure() -> tuple[float, dict[str, int]]:
+    """Return (total import ms, {top-level module: cumulative µs}) for the probe."""
+    env = {k: v for k, v in os.environ.items() if k not in ("SUPABASE_URL", "SUPABASE_SERVICE_KEY")}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE],
+        cwd=CRAWLER_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total_us = 0
+    modules: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        total_us += int(self_us)
+        top = name.split(".")[0]
+        modules[top] = max(modules.get(top, 0), int(cumulative_us))
+    return total_us / 1000, modules
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--budget-ms", type=float, default=float(os.environ.get("STARTUP_BUDGET_MS", 400)))
+    p.add_argument("--top", type=int, default=10, help="Show the N slowest top-level imports.")
+    args = p.parse_args()
+
+    total_ms, modules = measure()
+    for name, us in sorted(modules.items(), key=lambda kv: kv[1], reverse=True)[: args.top]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+    print(f"total import time: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    failed = False
+    eager = [m for m in DEFERRED_MODULES if m in modules]
+    if eager:
+        print(f"FAIL: imported at startup but should be deferred: {', '.join(eager)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print("FAIL: startup import time over budget")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
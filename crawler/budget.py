@@ -0,0 +1,88 @@
+"""
+Time Budgets & Run Lock
+------------------------
+A run may have an overall deadline (`main.py --deadline SECONDS` or
+RUN_DEADLINE) and every scraper a budget of its own (SCRAPER_BUDGET, or
+per scraper via SCRAPER_BUDGETS="ibps=300,ssc=600"). A scraper's budget
+never outlasts the run's deadline.
+
+Scrapers check their budget cooperatively between requests (see
+BaseScraper): once it is used up, retries stop, request timeouts shrink to
+what is left and detail enrichment is skipped — the listing-level exams
+are still saved, and the skipped pages are reported as `truncated`.
+Scrapers that have not started when the run deadline passes are skipped.
+
+`acquire_run_lock()` keeps cron invocations from overlapping: a second run
+exits at once instead of competing with the first for the same sites.
+"""
+from __future__ import annotations
+
+import fcntl
+import logging
+import math
+import os
+import time
+from pathlib import Path
+from typing import IO, Optional
+
+from config import SCRAPER_BUDGET, SCRAPER_BUDGETS, STATE_DIR
+
+logger = logging.getLogger(__name__)
+
+LOCK_PATH: Path = STATE_DIR / "crawler.lock"
+
+
+class Budget:
+    def __init__(self, seconds: float | None = None, parent: Optional["Budget"] = None):
+        now = time.monotonic()
+        ends = [
+            end for end in (
+                now + seconds if seconds is not None else None,
+                parent.ends_at if parent else None,
+            )
+            if end is not None
+        ]
+        self.ends_at: float | None = min(ends) if ends else None
+
+    def remaining(self) -> float:
+        if self.ends_at is None:
+            return math.inf
+        return max(0.0, self.ends_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.ends_at is not None and time.monotonic() >= self.ends_at
+
+    def child(self, seconds: float | None) -> "Budget":
+        """A sub-budget of `seconds` that also ends when this one does."""
+        return Budget(seconds, parent=self)
+
+
+def scraper_budget(name: str) -> float | None:
+    """Configured budget (seconds) for scraper `name`, or None for unlimited."""
+    for item in SCRAPER_BUDGETS.split(","):
+        key, _, value = item.partition("=")
+        if key.strip().lower() == name.lower() and value.strip():
+            return float(value) or None
+    return SCRAPER_BUDGET or None
+
+
+def acquire_run_lock(path: Path = LOCK_PATH) -> IO | None:
+    """
+    Take the exclusive crawler lock. Returns the open lock file (keep it
+    alive for the whole run), or None when another run already holds it.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handle = open(path, "a+")
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.seek(0)
+        holder = handle.read().strip() or "unknown"
+        handle.close()
+        logger.warning("Another crawler run holds %s (pid %s) — exiting.", path, holder)
+        return None
+    handle.seek(0)
+    handle.truncate()
+    handle.write(str(os.getpid()))
+    handle.flush()
+    return handle
@@ -0,0 +1,176 @@
+"""
+Run Checkpoints
+----------------
+Progress of the current run, saved to STATE_DIR/checkpoint.json so a run
+killed part-way (timeout, Chrome OOM, reboot) can be continued with
+`python main.py --resume` instead of being redone from scratch:
+
+  - completed scrapers      → skipped on resume
+  - fetched detail pages    → served from the checkpoint, not re-fetched
+                              (--isolate workers relay theirs to the parent)
+  - exams already upserted  → not written (or notified) again
+  - running totals / delta  → carried over, so the final webhook push and
+                              summary cover the whole run
+
+The file is written atomically, throttled to once per CHECKPOINT_INTERVAL
+seconds (and after every scraper), and removed when the run finishes —
+kept when the run deadline left scrapers unstarted or a scraper crashed,
+for --resume to run. Only a scraper that ran to the end counts as
+completed.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from config import CHECKPOINT_INTERVAL, STATE_DIR
+from records import to_jsonable
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_PATH: Path = STATE_DIR / "checkpoint.json"
+
+
+def exam_key(exam: dict) -> str:
+    return f"{(exam.get('exam_name') or '').lower()}|{(exam.get('organization') or '').lower()}"
+
+
+class Checkpoint:
+    def __init__(self, data: dict, path: Path = CHECKPOINT_PATH):
+        self.path = path
+        self.data = data
+        self._upserted = set(data.get("upserted", []))
+        self._resumed = frozenset(self._upserted)   # upserted by the interrupted run
+        self._lock = threading.Lock()
+        self._saved_at = 0.0
+        self._live: tuple[dict, list, list] | None = None
+
+    # ── Lifecycle ────────────────────────────────────────────────────────────
+    @classmethod
+    def start(cls, run_id: str, scrapers: list[str], path: Path = CHECKPOINT_PATH) -> "Checkpoint":
+        if path.exists():
+            logger.warning("Discarding unfinished checkpoint %s (use --resume to continue it)", path)
+        cp = cls({
+            "run_id": run_id,
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "scrapers": scrapers,
+            "completed": [],
+            "details": {},
+            "upserted": [],
+            "totals": None,
+            "changed_exams": [],
+            "scrapers_run": [],
+        }, path)
+        cp.save(force=True)
+        return cp
+
+    @classmethod
+    def load_unfinished(cls, path: Path = CHECKPOINT_PATH) -> Optional["Checkpoint"]:
+        if not path.exists():
+            return None
+        try:
+            return cls(json.loads(path.read_text(encoding="utf-8")), path)
+        except (OSError, ValueError) as exc:
+            logger.error("Unreadable checkpoint %s: %s", path, exc)
+            return None
+
+    def reported(self) -> None:
+        """
+        The run ended (summary and webhook push done) with scrapers left over.
+        Keep what is done — completed scrapers, details, upserted exams — but
+        start the totals and delta afresh under a new run_id, so a --resume
+        is pushed as its own run instead of as duplicate chunks of this one.
+        """
+        with self._lock:
+            self._live = None
+            self.data.update(
+                run_id=str(uuid.uuid4()), totals=None, changed_exams=[], scrapers_run=[],
+            )
+        self.save(force=True)
+
+    def finish(self) -> None:
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+    # ── Accessors ────────────────────────────────────────────────────────────
+    @property
+    def run_id(self) -> str:
+        return self.data["run_id"]
+
+    @property
+    def scrapers(self) -> list[str]:
+        return self.data["scrapers"]
+
+    def is_completed(self, scraper_name: str) -> bool:
+        return scraper_name in self.data["completed"]
+
+    def detail(self, url: str) -> Optional[dict]:
+        return self.data["details"].get(url)
+
+    def details(self) -> dict[str, dict]:
+        """A copy of every fetched detail page (url → detail), for --isolate workers."""
+        with self._lock:
+            return dict(self.data["details"])
+
+    def is_upserted(self, exam: dict) -> bool:
+        """
+        Upserted before the resume. Keys added during this run don't count:
+        a second exam with the same name in one run (e.g. the calendar entry
+        of a notice) is still written, to enrich the row.
+        """
+        return exam_key(exam) in self._resumed
+
+    # ── Progress ─────────────────────────────────────────────────────────────
+    def bind(self, totals: dict, changed_exams: list[dict], scrapers_run: list[str]) -> None:
+        """
+        Attach the run's live counters; every save snapshots them together
+        with the upserted keys, so resumed totals always match what was written.
+        """
+        self._live = (totals, changed_exams, scrapers_run)
+
+    def mark_detail(self, url: str, detail: dict) -> None:
+        with self._lock:
+            self.data["details"][url] = detail
+        self.save()
+
+    def mark_upserted(self, exam: dict) -> None:
+        key = exam_key(exam)
+        with self._lock:
+            if key not in self._upserted:
+                self._upserted.add(key)
+                self.data["upserted"].append(key)
+        self.save()
+
+    def mark_scraper_done(self, scraper_name: str) -> None:
+        with self._lock:
+            if scraper_name not in self.data["completed"]:
+                self.data["completed"].append(scraper_name)
+        self.save(force=True)
+
+    def save(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._saved_at < CHECKPOINT_INTERVAL:
+            return
+        with self._lock:
+            self._saved_at = now
+            if self._live:
+                totals, changed_exams, scrapers_run = self._live
+                self.data["totals"] = dict(totals)
+                self.data["changed_exams"] = list(changed_exams)
+                self.data["scrapers_run"] = list(scrapers_run)
+            payload = json.dumps(self.data, default=to_jsonable, ensure_ascii=False)
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(payload, encoding="utf-8")
+            tmp.replace(self.path)
+        except OSError as exc:
+            logger.warning("Could not write checkpoint: %s", exc)
@@ -0,0 +1,208 @@
+"""
+Sharded Crawling
+-----------------
+Spreads one run over several processes or machines through the work queue
+(see workqueue.py):
+
+  python main.py --coordinator --notify    # enqueue, work, then upsert/notify/push
+  python main.py --worker                  # on every other node
+
+The coordinator enqueues one `detail` job per known detail page whose
+frontier entry went stale (so those pages are fetched in parallel before
+the listings need them) and one `scraper` job per source, then works the
+queue itself until every job of the run is done or failed. Workers only
+fetch — they need the queue, not Supabase. The collected exams go through
+a single CrawlRun, so upserts, notifications, totals and the webhook push
+are exactly those of a local run.
+
+A job's lease is renewed by a heartbeat while it runs; when a worker dies
+the lease runs out and another worker picks the job up. The coordinator's
+own worker only leases jobs of its run, and a coordinator that is stopped
+cancels what is left of its run, so no worker keeps fetching for it.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+import traceback
+from urllib.parse import urlparse
+
+from archive import get_archive
+from config import WORKER_IDLE_EXIT, WORKER_LEASE_SECONDS, WORKER_POLL_INTERVAL
+from frontier import get_frontier
+from runner import CrawlRun
+from scrapers import get_scraper
+from workqueue import WorkQueue
+
+logger = logging.getLogger("crawler.cluster")
+
+
+class QueueDetails:
+    """Detail pages other workers already fetched for a run (BaseScraper.shared_details)."""
+
+    def __init__(self, queue: WorkQueue, run_id: str):
+        self.queue = queue
+        self.run_id = run_id
+
+    def detail(self, url: str) -> dict | None:
+        try:
+            return self.queue.result(self.run_id, "detail", url)
+        except Exception as exc:
+            logger.debug("Shared detail lookup failed for %s: %s", url, exc)
+            return None
+
+
+class Worker:
+    def __init__(
+        self,
+        queue: WorkQueue,
+        worker_id: str | None = None,
+        lease_seconds: float = WORKER_LEASE_SECONDS,
+        stop: threading.Event | None = None,
+        run_id: str | None = None,
+    ):
+        self.queue = queue
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.run_id = run_id   # only lease this run's jobs (the coordinator's own worker)
+        self.stop = stop or threading.Event()
+        self._detail_scrapers: dict = {}   # warm scraper instances for detail jobs
+        self.done = 0
+
+    def run(self, idle_exit: float = WORKER_IDLE_EXIT, until=None) -> int:
+        """
+        Work jobs until `until()` is true, the queue has been empty for
+        `idle_exit` seconds (0 → never) or `stop` is set. Returns jobs done.
+        """
+        idle_since = time.monotonic()
+        try:
+            while not self.stop.is_set():
+                if until and until():
+                    break
+                job = self.queue.lease(self.worker_id, self.lease_seconds, self.run_id)
+                if job is None:
+                    if idle_exit and time.monotonic() - idle_since > idle_exit:
+                        logger.info("Queue idle for %.0fs — worker exiting.", idle_exit)
+                        break
+                    self.stop.wait(WORKER_POLL_INTERVAL)
+                    continue
+                self._work(job)
+                idle_since = time.monotonic()
+        finally:
+            for scraper in self._detail_scrapers.values():
+                scraper.close()
+            self._detail_scrapers.clear()
+        return self.done
+
+    def _work(self, job: dict) -> None:
+        logger.info("Leased %s job %s (attempt %d)", job["kind"], job["key"], job["attempts"])
+        beat_stop = threading.Event()
+        beat = threading.Thread(target=self._heartbeat, args=(job["id"], beat_stop), daemon=True)
+        beat.start()
+        try:
+            result = self._execute(job)
+        except Exception as exc:
+            logger.error("%s job %s failed: %s", job["kind"], job["key"], exc)
+            logger.debug(traceback.format_exc())
+            self.queue.fail(job["id"], self.worker_id, str(exc) or exc.__class__.__name__)
+            return
+        finally:
+            beat_stop.set()
+            beat.join()
+
+        if self.queue.complete(job["id"], self.worker_id, result):
+            self.done += 1
+        else:
+            logger.warning("Lease on %s job %s was lost — result dropped.", job["kind"], job["key"])
+        archive = get_archive()
+        if archive:
+            archive.maybe_prune()   # long-lived workers keep their node's archive bounded
+
+    def _heartbeat(self, job_id: int, stop: threading.Event) -> None:
+        while not stop.wait(self.lease_seconds / 3):
+            if not self.queue.renew(job_id, self.worker_id, self.lease_seconds):
+                logger.warning("Could not renew lease on job %s", job_id)
+                return
+
+    def _execute(self, job: dict) -> dict:
+        if job["kind"] == "scraper":
+            scraper = get_scraper(job["key"])()
+            scraper.shared_details = QueueDetails(self.queue, job["run_id"])
+            scraper.run_id = job["run_id"]
+            try:
+                return {"exams": scraper.fetch()}
+            finally:
+                scraper.close()
+
+        if job["kind"] == "detail":
+            name = job["payload"]["scraper"]
+            if name not in self._detail_scrapers:
+                self._detail_scrapers[name] = get_scraper(name)()
+            self._detail_scrapers[name].run_id = job["run_id"]
+            return self._detail_scrapers[name]._fetch_detail(job["key"], job["payload"].get("exam_name"))
+
+        raise ValueError(f"Unknown job kind: {job['kind']!r}")
+
+
+def stop_on_signals() -> threading.Event:
+    """An Event set by SIGTERM / SIGINT, so the current job can finish."""
+    stop = threading.Event()
+
+    def _on_signal(signum, _frame):
+        logger.info("Received %s — stopping after the current job.", signal.Signals(signum).name)
+        stop.set()
+
+    signal.signal(signal.SIGTERM, _on_signal)
+    signal.signal(signal.SIGINT, _on_signal)
+    return stop
+
+
+def _stale_details(names: list[str]) -> list[tuple[str, str, str | None]]:
+    """Known detail pages of the selected scrapers due for a refresh → [(url, scraper, exam_name)]."""
+    frontier = get_frontier()
+    if not frontier:
+        return []
+    hosts = {urlparse(get_scraper(n).BASE_URL).netloc: n for n in names}
+    return [
+        (url, hosts[host], exam_name)
+        for url, exam_name in frontier.stale("detail")
+        if (host := urlparse(url).netloc) in hosts
+    ]
+
+
+def run_coordinator(names: list[str], queue: WorkQueue, run: CrawlRun, stop: threading.Event | None = None) -> CrawlRun:
+    """Shard `names` over the queue, work it, then process the results through `run`."""
+    run_id = run.run_id
+    details = _stale_details(names)
+    # Detail jobs first: with FIFO leasing they are fetched before the listings ask
+    for url, scraper_name, exam_name in details:
+        queue.enqueue(run_id, "detail", url, {"scraper": scraper_name, "exam_name": exam_name})
+    for name in names:
+        queue.enqueue(run_id, "scraper", name)
+    logger.info("Run %s: queued %d scraper and %d detail job(s)", run_id, len(names), len(details))
+
+    Worker(queue, stop=stop, run_id=run_id).run(idle_exit=0, until=lambda: queue.outstanding(run_id) == 0)
+    if stop and stop.is_set():
+        # Nobody will collect them: keep workers from fetching for a dead run
+        cancelled = queue.cancel(run_id, "coordinator stopped")
+        logger.warning("Coordinator stopped with %d job(s) outstanding — cancelled.", cancelled)
+
+    # Keep the local frontier current with pages fetched on other nodes
+    frontier = get_frontier()
+    if frontier:
+        for job in queue.results(run_id, "detail"):
+            result = job["result"] or {}
+            if job["status"] == "done" and (result.get("dates") or result.get("pdf_url")):
+                frontier.record(job["key"], "detail", 200, result=result)
+
+    for job in queue.results(run_id, "scraper"):
+        name = get_scraper(job["key"]).NAME
+        if job["status"] == "done":
+            run.process_exams(name, (job["result"] or {}).get("exams", []))
+        else:
+            run.record_failure(name, job["error"])
+    return run
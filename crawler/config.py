@@ -3,6 +3,10 @@ Competitive Exam Crawler — Configuration
 -----------------------------------------
 All settings are loaded from environment variables.
 Copy .env.example → .env and fill in your values.
+
+Required settings (SUPABASE_URL, SUPABASE_SERVICE_KEY) are validated on
+first access, so runs that never touch the database (e.g. --dry-run) start
+without them.
 """
 import os
 from pathlib import Path
@@ -12,8 +16,9 @@ from dotenv import load_dotenv
 load_dotenv(Path(__file__).parent / ".env")
 
 # ── Supabase / PostgreSQL ───────────────────────────────────────────────────
-SUPABASE_URL: str        = os.environ["SUPABASE_URL"]
-SUPABASE_SERVICE_KEY: str = os.environ["SUPABASE_SERVICE_KEY"]   # service-role key (bypass RLS)
+# SUPABASE_URL / SUPABASE_SERVICE_KEY (service-role key, bypasses RLS) are
+# resolved lazily by __getattr__ below.
+_REQUIRED = ("SUPABASE_URL", "SUPABASE_SERVICE_KEY")
 DB_HOST: str             = os.environ.get("DB_HOST", "")
 DB_PORT: int             = int(os.environ.get("DB_PORT", 5432))
 DB_NAME: str             = os.environ.get("DB_NAME", "postgres")
@@ -30,15 +35,97 @@ FROM_NAME: str   = os.environ.get("FROM_NAME", "APC Exam Hub")
 
 # ── Crawler behaviour ───────────────────────────────────────────────────────
 REQUEST_TIMEOUT: int  = int(os.environ.get("REQUEST_TIMEOUT", 30))
-REQUEST_DELAY: float  = float(os.environ.get("REQUEST_DELAY", 2.0))   # seconds between requests
+REQUEST_DELAY: float  = float(os.environ.get("REQUEST_DELAY", 2.0))   # seconds between requests to one host
 MAX_RETRIES: int      = int(os.environ.get("MAX_RETRIES", 3))
+DETAIL_CONCURRENCY: int = int(os.environ.get("DETAIL_CONCURRENCY", 4))   # parallel detail fetches per spec scraper
+STREAM_QUEUE_SIZE: int  = int(os.environ.get("STREAM_QUEUE_SIZE", 32))    # exams buffered between scraper and upserts
+# Parse pages in worker processes (see parsing.py); 0 → parse inline
+PARSE_WORKERS: int        = int(os.environ.get("PARSE_WORKERS", min(4, (os.cpu_count() or 1) - 1)))
+PARSE_OFFLOAD_MIN_KB: int = int(os.environ.get("PARSE_OFFLOAD_MIN_KB", 32))   # smaller pages parse inline
+# Largest page read per response (streamed, aborted past the cap)
+MAX_HTML_MB: float = float(os.environ.get("MAX_HTML_MB", 5))
 HEADLESS_BROWSER: bool = os.environ.get("HEADLESS_BROWSER", "true").lower() == "true"
 CHROME_DRIVER_PATH: str = os.environ.get("CHROME_DRIVER_PATH", "")   # leave blank for auto-detect
 
+# ── Entity resolution (near-duplicate titles, see resolver.py) ────────────
+RESOLVE_ENABLED: bool     = os.environ.get("RESOLVE_ENABLED", "true").lower() == "true"
+RESOLVE_THRESHOLD: float  = float(os.environ.get("RESOLVE_THRESHOLD", 0.8))   # 0–1 title similarity
+RESOLVE_BLOCK_CAP: int    = int(os.environ.get("RESOLVE_BLOCK_CAP", 200))     # ignore keys shared by more exams
+
+# ── Time budgets (see budget.py) ────────────────────────────────────────────
+RUN_DEADLINE: float   = float(os.environ.get("RUN_DEADLINE", 0))     # seconds per run; 0 → none (--deadline)
+SCRAPER_BUDGET: float = float(os.environ.get("SCRAPER_BUDGET", 0))   # seconds per scraper; 0 → none
+SCRAPER_BUDGETS: str  = os.environ.get("SCRAPER_BUDGETS", "")        # per scraper, e.g. "ibps=300,ssc=600"
+
+# ── Deadline reminders (main.py --reminders) ────────────────────────────────
+REMINDER_WINDOW_DAYS: int = int(os.environ.get("REMINDER_WINDOW_DAYS", 3))    # remind this many days ahead
+REMINDER_BATCH_SIZE: int  = int(os.environ.get("REMINDER_BATCH_SIZE", 500))   # rows per DB page / SMTP session
+
+# ── Crawl frontier (visited-URL store, see frontier.py) ────────────────────
+FRONTIER_ENABLED: bool     = os.environ.get("FRONTIER_ENABLED", "true").lower() == "true"
+FRONTIER_TTL_DETAIL: float = float(os.environ.get("FRONTIER_TTL_DETAIL", 12 * 60 * 60))     # seconds
+FRONTIER_TTL_ERROR: float  = float(os.environ.get("FRONTIER_TTL_ERROR", 60 * 60))           # failed fetches
+
+# ── Checkpoints (main.py --resume) ──────────────────────────────────────────
+CHECKPOINT_INTERVAL: float = float(os.environ.get("CHECKPOINT_INTERVAL", 5.0))   # min seconds between writes
+
+# ── Daemon mode (main.py --daemon) ──────────────────────────────────────────
+# Each source is polled between these bounds, faster the more often it changed
+# over its last DAEMON_HISTORY runs.
+DAEMON_MIN_INTERVAL: int  = int(os.environ.get("DAEMON_MIN_INTERVAL", 30 * 60))         # seconds
+DAEMON_MAX_INTERVAL: int  = int(os.environ.get("DAEMON_MAX_INTERVAL", 24 * 60 * 60))    # seconds
+DAEMON_HISTORY: int       = int(os.environ.get("DAEMON_HISTORY", 12))
+DAEMON_RECIPIENTS_TTL: int = int(os.environ.get("DAEMON_RECIPIENTS_TTL", 60 * 60))     # reload student index
+
+# ── Sharded crawling (main.py --coordinator / --worker, see workqueue.py) ──
+# "" → SQLite in STATE_DIR, "sqlite:///path", "postgres" (DB_* settings) or "memory"
+WORKQUEUE_URL: str            = os.environ.get("WORKQUEUE_URL", "")
+WORKQUEUE_MAX_ATTEMPTS: int   = int(os.environ.get("WORKQUEUE_MAX_ATTEMPTS", 3))      # leases per job
+WORKER_LEASE_SECONDS: float   = float(os.environ.get("WORKER_LEASE_SECONDS", 5 * 60)) # renewed while running
+WORKER_IDLE_EXIT: float       = float(os.environ.get("WORKER_IDLE_EXIT", 0))          # 0 → wait forever
+WORKER_POLL_INTERVAL: float   = float(os.environ.get("WORKER_POLL_INTERVAL", 2.0))
+
+# ── Process isolation (main.py --isolate, see isolation.py) ────────────────
+ISOLATE_RSS_LIMIT_MB: float = float(os.environ.get("ISOLATE_RSS_LIMIT_MB", 1536))    # worker + its Chrome
+ISOLATE_TIME_LIMIT: float   = float(os.environ.get("ISOLATE_TIME_LIMIT", 20 * 60))   # seconds per scraper
+ISOLATE_MAX_TASKS: int      = int(os.environ.get("ISOLATE_MAX_TASKS", 3))            # scrapers per worker
+ISOLATE_BATCH: int          = int(os.environ.get("ISOLATE_BATCH", 25))               # exams per pipe message
+
+# ── Local state (spools, caches) ────────────────────────────────────────────
+STATE_DIR: Path = Path(os.environ.get("CRAWLER_STATE_DIR", Path(__file__).parent / "state"))
+
+# ── Page archive (fetched pages, see archive.py) ────────────────────────────
+ARCHIVE_ENABLED: bool          = os.environ.get("ARCHIVE_ENABLED", "true").lower() == "true"
+ARCHIVE_DIR: Path              = Path(os.environ.get("ARCHIVE_DIR", STATE_DIR / "archive"))
+ARCHIVE_RETENTION_DAYS: float  = float(os.environ.get("ARCHIVE_RETENTION_DAYS", 30))
+ARCHIVE_MAX_MB: float          = float(os.environ.get("ARCHIVE_MAX_MB", 2048))          # 0 → no size cap
+ARCHIVE_PRUNE_INTERVAL: float  = float(os.environ.get("ARCHIVE_PRUNE_INTERVAL", 6 * 60 * 60))  # seconds
+
+# ── Performance history (per-scraper regressions, see perfhistory.py) ─────
+PERF_HISTORY_ENABLED: bool   = os.environ.get("PERF_HISTORY_ENABLED", "true").lower() == "true"
+PERF_WINDOW_DAYS: float      = float(os.environ.get("PERF_WINDOW_DAYS", 14))       # compared with runs this recent
+PERF_MIN_SAMPLES: int        = int(os.environ.get("PERF_MIN_SAMPLES", 5))          # past runs needed for a verdict
+PERF_SLOWDOWN_FACTOR: float  = float(os.environ.get("PERF_SLOWDOWN_FACTOR", 3.0))  # × median fetch time
+PERF_YIELD_DROP: float       = float(os.environ.get("PERF_YIELD_DROP", 0.5))       # × median exams found
+
+# ── Static exam feeds (main.py --export, see feeds.py) ─────────────────────
+EXPORT_DIR: Path = Path(os.environ.get("EXPORT_DIR", STATE_DIR / "feeds"))   # e.g. ../public/feeds
+
+# ── Output sinks (main.py --output, see sinks.py) ─────────────────────────
+OUTPUT_BATCH_SIZE: int = int(os.environ.get("OUTPUT_BATCH_SIZE", 500))   # rows per write (ndjson / sqlite)
+
+# ── Metrics (live counters, see metrics.py) ─────────────────────────────────
+METRICS_PORT: int        = int(os.environ.get("METRICS_PORT", 0))              # 0 → no HTTP endpoint
+METRICS_ADDR: str        = os.environ.get("METRICS_ADDR", "127.0.0.1")
+METRICS_TEXTFILE: str    = os.environ.get("METRICS_TEXTFILE", "")              # OpenMetrics file, "" → none
+METRICS_INTERVAL: float  = float(os.environ.get("METRICS_INTERVAL", 15))       # textfile rewrite, seconds
+
 # ── Logging ─────────────────────────────────────────────────────────────────
 LOG_DIR: Path    = Path(__file__).parent / "logs"
 LOG_LEVEL: str   = os.environ.get("LOG_LEVEL", "INFO")
-LOG_DIR.mkdir(exist_ok=True)
+LOG_FORMAT: str  = os.environ.get("LOG_FORMAT", "text").lower()              # "text" or "json" (log file)
+LOG_MAX_MB: float          = float(os.environ.get("LOG_MAX_MB", 50))          # rotate above this size (and daily)
+LOG_RETENTION_DAYS: float  = float(os.environ.get("LOG_RETENTION_DAYS", 14))  # keep rotated .gz files
 
 # ── Browser headers ─────────────────────────────────────────────────────────
 DEFAULT_HEADERS: dict = {
@@ -59,3 +146,14 @@ SCRAPER_TARGETS = [
     "uppsc",
     "mppsc",
 ]
+
+
+def __getattr__(name: str):
+    """Validate required settings on first access instead of at import."""
+    if name in _REQUIRED:
+        value = os.environ.get(name)
+        if not value:
+            raise RuntimeError(f"{name} is not set — copy .env.example → .env and fill it in.")
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,195 @@
+"""
+Crawler Daemon
+---------------
+Long-running mode (`python main.py --daemon`) that replaces the daily cron
+cold start: scraper instances (HTTP sessions, Chrome) and the Supabase
+client stay warm, and every source runs on its own adaptive schedule.
+
+A source's poll interval moves between DAEMON_MIN_INTERVAL and
+DAEMON_MAX_INTERVAL with how often it actually changed over its last
+DAEMON_HISTORY runs (geometric interpolation: never changed → max, always
+changed → min). Schedule state survives restarts in STATE_DIR/schedule.json.
+
+SIGTERM / SIGINT stop the loop after the scraper currently running.
+"""
+from __future__ import annotations
+
+import heapq
+import json
+import logging
+import random
+import signal
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+from archive import get_archive
+from config import (
+    DAEMON_MIN_INTERVAL,
+    DAEMON_MAX_INTERVAL,
+    DAEMON_HISTORY,
+    DAEMON_RECIPIENTS_TTL,
+    STATE_DIR,
+)
+from feeds import export_feeds
+from isolation import IsolatedPool
+from runner import CrawlRun, Recipients
+from resolver import ExamResolver
+from sinks import ExamSink
+from scrapers import get_scraper
+from transitions import StatusTransitions
+from webhook import flush_spool_async, spooled_count
+
+logger = logging.getLogger("crawler.daemon")
+
+
+class AdaptiveScheduler:
+    def __init__(
+        self,
+        names: list[str],
+        min_interval: float = DAEMON_MIN_INTERVAL,
+        max_interval: float = DAEMON_MAX_INTERVAL,
+        history: int = DAEMON_HISTORY,
+        state_path: Path | None = STATE_DIR / "schedule.json",
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.state_path = state_path
+        self._history: dict[str, deque[bool]] = {n: deque(maxlen=history) for n in names}
+        self._heap: list[tuple[float, str]] = []
+
+        saved = self._load()
+        now = time.time()
+        for i, name in enumerate(names):
+            entry = saved.get(name, {})
+            self._history[name].extend(entry.get("history", []))
+            # New sources start now, a few seconds apart
+            heapq.heappush(self._heap, (entry.get("next_due", now + i * 5), name))
+
+    def interval(self, name: str) -> float:
+        hist = self._history[name]
+        rate = sum(hist) / len(hist) if hist else 0.5
+        return self.max_interval * (self.min_interval / self.max_interval) ** rate
+
+    def peek(self) -> tuple[float, str]:
+        return self._heap[0]
+
+    def pop(self) -> str:
+        return heapq.heappop(self._heap)[1]
+
+    def record(self, name: str, changed: bool) -> float:
+        """Record a run's outcome and reschedule the source. Returns the delay."""
+        self._history[name].append(changed)
+        delay = self.interval(name) * random.uniform(0.9, 1.1)
+        heapq.heappush(self._heap, (time.time() + delay, name))
+        self._save()
+        return delay
+
+    # ── Persistence ──────────────────────────────────────────────────────────
+    def _load(self) -> dict:
+        if not self.state_path or not self.state_path.exists():
+            return {}
+        try:
+            return json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as exc:
+            logger.warning("Ignoring unreadable schedule state %s: %s", self.state_path, exc)
+            return {}
+
+    def _save(self) -> None:
+        if not self.state_path:
+            return
+        due = {name: ts for ts, name in self._heap}
+        state = {
+            name: {"history": [bool(x) for x in hist], "next_due": due.get(name)}
+            for name, hist in self._history.items()
+        }
+        try:
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.state_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(state, indent=2), encoding="utf-8")
+            tmp.replace(self.state_path)
+        except OSError as exc:
+            logger.warning("Could not save schedule state: %s", exc)
+
+
+def run_daemon(
+    names: list[str],
+    dry_run: bool = False,
+    notify: bool = False,
+    notify_all: bool = False,
+    pool: IsolatedPool | None = None,
+    export_dir: Path | str | None = None,
+    sink: ExamSink | None = None,
+) -> int:
+    stop = threading.Event()
+
+    def _on_signal(signum, _frame):
+        logger.info("Received %s — stopping after the current scraper.", signal.Signals(signum).name)
+        stop.set()
+
+    signal.signal(signal.SIGTERM, _on_signal)
+    signal.signal(signal.SIGINT, _on_signal)
+
+    classes = {name: get_scraper(name) for name in names}
+    # With --isolate every run happens in a pool worker; the proxies are cheap
+    make = pool.scraper if pool else (lambda name: classes[name]())
+    scrapers = {name: make(name) for name in names}
+    scheduler = AdaptiveScheduler(names)
+    recipients: Recipients | None = None
+    recipients_loaded = 0.0
+    spool_thread: threading.Thread | None = None
+    transitions = StatusTransitions()
+    resolver = ExamResolver()   # shared by every run; reloaded once a day
+
+    logger.info("Daemon started for %s", [cls.NAME for cls in classes.values()])
+    try:
+        while not stop.is_set():
+            due_at, name = scheduler.peek()
+            wait = due_at - time.time()
+            if wait > 0:
+                logger.debug("Next: %s in %.0fs", name, wait)
+                stop.wait(wait)
+                continue
+            scheduler.pop()
+
+            if not dry_run and spooled_count() and not (spool_thread and spool_thread.is_alive()):
+                spool_thread = flush_spool_async()
+
+            if notify and not dry_run and time.time() - recipients_loaded > DAEMON_RECIPIENTS_TTL:
+                recipients = Recipients(notify_all).load()
+                recipients_loaded = time.time()
+
+            run = CrawlRun(dry_run=dry_run, recipients=recipients, resolver=resolver, sink=sink)
+            stats = run.run_scraper(scrapers[name])
+            if sink:
+                try:
+                    sink.flush()
+                except Exception as exc:
+                    logger.error("Output %s:%s failed, no longer writing to it: %s", sink.KIND, sink.path, exc)
+                    sink.abandon()
+                if sink.closed:
+                    sink = None   # a failed write closed it: later runs go without
+            run.update_statuses(transitions)
+            run.check_performance()
+            run.log_summary()
+            run.push_webhook()
+            changed = stats["new"] + stats["updated"] > 0
+            if export_dir and not dry_run and (changed or any((run.status_changes or {}).values())):
+                export_feeds(export_dir)
+            archive = get_archive()
+            if archive:
+                archive.maybe_prune()
+
+            if stats["errors"]:
+                # Start the next attempt from a fresh session / browser
+                scrapers[name].close()
+                scrapers[name] = make(name)
+
+            delay = scheduler.record(name, changed=changed)
+            logger.info("%s: next run in %.1f min", classes[name].NAME, delay / 60)
+    finally:
+        for scraper in scrapers.values():
+            scraper.close()
+        logger.info("Daemon stopped.")
+    return 0
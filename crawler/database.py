@@ -4,20 +4,32 @@ Database writer
 Handles all Supabase / PostgreSQL I/O for the crawler.
 Uses the Supabase Python client (service-role key, so RLS is bypassed).
 """
+from __future__ import annotations
+
 import logging
-from typing import Optional
-from supabase import create_client, Client
-from config import SUPABASE_URL, SUPABASE_SERVICE_KEY
+from datetime import date, datetime, timezone
+from typing import TYPE_CHECKING, Optional
+
+import config
+import metrics
+from records import ExamRecord
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 logger = logging.getLogger(__name__)
 
 _client: Optional[Client] = None
 
+# PostgREST caps every response (1000 rows by default), so bulk reads page.
+_PAGE_SIZE = 1000
+
 
 def get_client() -> Client:
     global _client
     if _client is None:
-        _client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+        from supabase import create_client   # heavy; only imported once the DB is used
+        _client = create_client(config.SUPABASE_URL, config.SUPABASE_SERVICE_KEY)
     return _client
 
 
@@ -26,58 +38,119 @@ def exam_exists(exam_name: str, organization: str) -> Optional[str]:
     Return the existing exam id if (exam_name, organization) already in DB,
     otherwise return None.
     """
+    row = find_exam(exam_name, organization)
+    return row["id"] if row else None
+
+
+def find_exam(exam_name: str, organization: str) -> Optional[dict]:
+    """
+    Return the full existing exam row for (exam_name, organization), or None.
+    """
     try:
         db = get_client()
         res = (
             db.table("exams")
-            .select("id")
+            .select("*")
             .ilike("exam_name", exam_name)
             .ilike("organization", organization)
             .maybe_single()
             .execute()
         )
-        return res.data["id"] if res.data else None
+        return res.data if res and res.data else None
     except Exception as exc:
-        logger.warning("exam_exists check failed: %s", exc)
+        logger.warning("find_exam lookup failed: %s", exc)
         return None
 
 
-def upsert_exam(data: dict) -> tuple[bool, bool, str]:
+def find_exam_by_id(exam_id: str) -> Optional[dict]:
+    """Return the full exam row with id `exam_id`, or None."""
+    try:
+        res = get_client().table("exams").select("*").eq("id", exam_id).maybe_single().execute()
+        return res.data if res and res.data else None
+    except Exception as exc:
+        logger.warning("find_exam_by_id lookup failed: %s", exc)
+        return None
+
+
+def get_active_exams() -> list[dict]:
+    """Every active exam row, newest first (for feeds.py)."""
+    db = get_client()
+    return _fetch_all(
+        lambda: db.table("exams").select("*").eq("is_active", True)
+        .order("created_at", desc=True).order("id")
+    )
+
+
+def get_exam_keys() -> list[dict]:
+    """id, exam_name and organization of every exam (for resolver.py)."""
+    db = get_client()
+    return _fetch_all(lambda: db.table("exams").select("id, exam_name, organization").order("id"))
+
+
+def upsert_exam(data: dict | ExamRecord, existing_id: str | None = None) -> tuple[bool, bool, str, bool]:
     """
     Insert or update an exam row.
 
-    Returns (success, is_new, exam_id)
-      is_new = True  → freshly inserted
-      is_new = False → updated existing row
+    `existing_id` is the row this exam was resolved to under another title
+    (see resolver.py): that row is updated and keeps its own exam_name and
+    organization, and the record is renamed to match so the webhook delta
+    refers to the same row.
+
+    Returns (success, is_new, exam_id, changed)
+      is_new  = True  → freshly inserted
+      is_new  = False → existing row
+      changed = True  → a row was inserted or an existing row actually differed
+                        (unchanged rows are not written at all)
     """
+    with metrics.UPSERT_LATENCY.time():
+        result = _upsert_exam(data, existing_id)
+    success, is_new, _, changed = result
+    metrics.UPSERTS.inc("failed" if not success else "new" if is_new else "updated" if changed else "unchanged")
+    return result
+
+
+def _upsert_exam(data: dict | ExamRecord, existing_id: str | None) -> tuple[bool, bool, str, bool]:
     db = get_client()
 
     # Normalise
+    record = data
+    if isinstance(record, ExamRecord):
+        data = record.to_dict()
     data.setdefault("is_active", True)
-    data.setdefault("status", _infer_status(data))
     data.setdefault("level", "Central")
+    if not data.get("status"):
+        data["status"] = _infer_status(data)
+        record["status"] = data["status"]   # the webhook delta carries it too
 
-    existing_id = exam_exists(data["exam_name"], data["organization"])
+    existing = find_exam_by_id(existing_id) if existing_id else None
+    if existing:
+        data["exam_name"] = record["exam_name"] = existing["exam_name"]
+        data["organization"] = record["organization"] = existing["organization"]
+    else:
+        existing = find_exam(data["exam_name"], data["organization"])
 
     try:
-        if existing_id:
-            # Update — keep existing id
-            res = (
-                db.table("exams")
-                .update({k: v for k, v in data.items() if k not in ("id",)})
-                .eq("id", existing_id)
-                .execute()
-            )
-            logger.info("Updated existing exam: %s", data["exam_name"])
-            return True, False, existing_id
+        if existing:
+            existing_id = existing["id"]
+            diff = {
+                k: v for k, v in data.items()
+                if k != "id" and existing.get(k) != v
+            }
+            if not diff:
+                logger.debug("Unchanged exam: %s", data["exam_name"])
+                return True, False, existing_id, False
+            # Update — keep existing id, only send the columns that changed
+            db.table("exams").update(diff).eq("id", existing_id).execute()
+            logger.info("Updated existing exam: %s (%s)", data["exam_name"], ", ".join(sorted(diff)))
+            return True, False, existing_id, True
         else:
             res = db.table("exams").insert(data).execute()
             new_id = res.data[0]["id"] if res.data else ""
             logger.info("Inserted new exam: %s (id=%s)", data["exam_name"], new_id)
-            return True, True, new_id
+            return True, True, new_id, True
     except Exception as exc:
         logger.error("upsert_exam failed for '%s': %s", data.get("exam_name"), exc)
-        return False, False, ""
+        return False, False, "", False
 
 
 def get_all_student_emails() -> list[dict]:
@@ -98,18 +171,153 @@ def get_all_student_emails() -> list[dict]:
         return []
 
 
+def get_student_interest_rows() -> tuple[list[dict], list[dict], list[dict]]:
+    """
+    Bulk-load everything needed to build the notification interest index.
+
+    Returns (profiles, saved, reminders):
+      profiles  → active profiles with id, email, full_name, state, interests
+      saved     → saved_exams rows with the saved exam's level/state/organization
+      reminders → exam_reminders rows, same shape as saved
+
+    Raises on a database error: an empty index would quietly mail no one.
+    """
+    db = get_client()
+    exam_cols = "student_id, exams(level, state, organization)"
+    profiles = _fetch_all(
+        lambda: db.table("profiles")
+        .select("id, email, full_name, state, interests")
+        .eq("is_active", True)
+        .order("id")
+    )
+    saved = _fetch_all(lambda: db.table("saved_exams").select(exam_cols).order("id"))
+    reminders = _fetch_all(lambda: db.table("exam_reminders").select(exam_cols).order("id"))
+    return profiles, saved, reminders
+
+
+def get_due_reminders(
+    window_days: int,
+    limit: Optional[int],
+    after_student: Optional[str] = None,
+    student: Optional[str] = None,
+) -> list[dict]:
+    """
+    One page of unsent reminders whose exam deadline / exam date falls in the
+    next `window_days` days, ordered by student (see due_exam_reminders()).
+    `student` narrows it to one student; `limit=None` returns every row.
+    """
+    db = get_client()
+    res = db.rpc("due_exam_reminders", {
+        "p_window_days": window_days,
+        "p_limit": limit,
+        "p_after_student": after_student,
+        "p_student": student,
+    }).execute()
+    return res.data or []
+
+
+def record_reminder_deliveries(rows: list[dict]) -> int:
+    """
+    Mark reminders as sent. Each row needs reminder_id, kind, target_date.
+    Already-recorded rows are ignored. Returns the number of rows submitted.
+    """
+    if not rows:
+        return 0
+    db = get_client()
+    payload = [
+        {"reminder_id": r["reminder_id"], "kind": r["kind"], "target_date": r["target_date"]}
+        for r in rows
+    ]
+    db.table("exam_reminder_deliveries").upsert(
+        payload,
+        on_conflict="reminder_id,kind,target_date",
+        ignore_duplicates=True,
+    ).execute()
+    return len(payload)
+
+
+def get_status_rows() -> list[dict]:
+    """
+    id, status and application dates of every active exam that is not
+    Closed yet — the ones a status transition can still apply to.
+    """
+    db = get_client()
+    return _fetch_all(
+        lambda: db.table("exams")
+        .select("id, status, application_start_date, application_last_date")
+        .eq("is_active", True)
+        .neq("status", "Closed")
+        .order("id")
+    )
+
+
+# Ids per UPDATE … WHERE id IN (…); keeps the PostgREST URL short
+_STATUS_BATCH = 200
+
+
+def set_exam_status(ids: list[str], status: str, today: date) -> tuple[list[str], list[str]]:
+    """
+    Move exams `ids` to `status`. The dates are re-checked in the WHERE
+    clause (same rules as update_exam_statuses()), so an exam whose dates
+    changed since `ids` was computed is left alone. Returns (ids changed,
+    ids whose UPDATE failed).
+    """
+    db = get_client()
+    day = today.isoformat()
+    changed: list[str] = []
+    failed: list[str] = []
+    for start in range(0, len(ids), _STATUS_BATCH):
+        batch = ids[start:start + _STATUS_BATCH]
+        query = (
+            db.table("exams")
+            .update({"status": status, "updated_at": datetime.now(timezone.utc).isoformat()})
+            .in_("id", batch)
+            .eq("is_active", True)
+        )
+        if status == "Closed":
+            query = query.neq("status", "Closed").lt("application_last_date", day)
+        elif status == "Open":
+            query = query.eq("status", "Coming Soon").or_(
+                f"application_start_date.is.null,application_start_date.lte.{day}"
+            )
+        else:
+            query = query.eq("status", "Open").gt("application_start_date", day)
+        try:
+            res = query.execute()
+            changed.extend(row["id"] for row in res.data or [])
+        except Exception as exc:
+            logger.error("Status update to %s failed: %s", status, exc)
+            failed.extend(batch)
+    return changed, failed
+
+
+def _fetch_all(build_query) -> list[dict]:
+    """
+    Run a select in _PAGE_SIZE pages until exhausted.
+    `build_query` must return a fresh query builder on every call.
+    """
+    rows: list[dict] = []
+    start = 0
+    while True:
+        res = build_query().range(start, start + _PAGE_SIZE - 1).execute()
+        batch = res.data or []
+        rows.extend(batch)
+        if len(batch) < _PAGE_SIZE:
+            return rows
+        start += _PAGE_SIZE
+
+
 def _infer_status(data: dict) -> str:
     """
     Infer Open / Closed / Coming Soon from dates if not already provided.
     """
-    import datetime
-    today = datetime.date.today()
+    today = date.today()
 
     def parse(d):
         if not d:
             return None
         try:
-            return datetime.date.fromisoformat(str(d)[:10])
+            return date.fromisoformat(str(d)[:10])
         except Exception:
             return None
 
@@ -0,0 +1,123 @@
+"""
+Static Exam Feeds
+------------------
+`python main.py --export [DIR]` writes the active exams, after the run, as
+precomputed gzip-compressed JSON feeds that the site can serve as static
+files or from a CDN instead of querying Supabase on every visit:
+
+  all.<hash>.json.gz                   every active exam, newest first
+  level-central.<hash>.json.gz         one feed per level,
+  state-bihar.<hash>.json.gz           per state,
+  status-coming-soon.<hash>.json.gz    and per status
+  manifest.json                        feed key → file, count, sha256, bytes
+
+Feed files are named by the sha256 of their JSON, so they can be cached
+forever (upload them with `Content-Encoding: gzip`); only manifest.json
+changes between runs. Unchanged feeds are not rewritten, the manifest is
+replaced atomically, and files no longer referenced by the current or the
+previous manifest are removed.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from config import EXPORT_DIR
+from database import get_active_exams
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+
+# Columns published in the feeds (everything the exam pages render)
+FEED_COLUMNS = (
+    "id", "exam_name", "organization", "level", "state", "description",
+    "eligibility", "qualification", "age_limit", "application_start_date",
+    "application_last_date", "exam_date", "official_website", "notification_pdf",
+    "application_fee", "selection_process", "status", "created_at", "updated_at",
+)
+
+
+def _slug(value: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", value.lower()).strip("-") or "none"
+
+
+def _group(exams: list[dict]) -> dict[str, list[dict]]:
+    """Feed key ("all", "level:Central", "state:Bihar", "status:Open") → exams."""
+    feeds: dict[str, list[dict]] = {"all": exams}
+    for exam in exams:
+        for field in ("level", "state", "status"):
+            if exam.get(field):
+                feeds.setdefault(f"{field}:{exam[field]}", []).append(exam)
+    return feeds
+
+
+def _write_feed(directory: Path, key: str, exams: list[dict]) -> dict:
+    body = json.dumps(exams, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+    digest = hashlib.sha256(body).hexdigest()
+    field, _, value = key.partition(":")
+    name = f"{field}-{_slug(value)}" if value else field
+    path = directory / f"{name}.{digest[:16]}.json.gz"
+    if not path.exists():
+        tmp = path.with_name(path.name + ".tmp")
+        # mtime=0: identical feeds compress to identical bytes
+        tmp.write_bytes(gzip.compress(body, compresslevel=9, mtime=0))
+        tmp.replace(path)
+    return {"file": path.name, "count": len(exams), "sha256": digest, "bytes": path.stat().st_size}
+
+
+def export_feeds(directory: Path | str = EXPORT_DIR) -> Optional[dict]:
+    """Write the feeds and manifest to `directory`. Returns the manifest, None on failure."""
+    directory = Path(directory)
+    try:
+        exams = [{c: row.get(c) for c in FEED_COLUMNS} for row in get_active_exams()]
+    except Exception as exc:
+        logger.error("Feed export skipped — could not read exams: %s", exc)
+        return None
+
+    try:
+        return _export(directory, exams)
+    except OSError as exc:
+        logger.error("Feed export to %s failed: %s", directory, exc)
+        return None
+
+
+def _export(directory: Path, exams: list[dict]) -> dict:
+    directory.mkdir(parents=True, exist_ok=True)
+    manifest_path = directory / MANIFEST
+    try:
+        previous = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        previous = {}
+
+    feeds = {key: _write_feed(directory, key, group) for key, group in sorted(_group(exams).items())}
+    manifest = {
+        "version": 1,
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "count": len(exams),
+        "feeds": feeds,
+    }
+    tmp = manifest_path.with_name(MANIFEST + ".tmp")
+    tmp.write_text(json.dumps(manifest, ensure_ascii=False, indent=1), encoding="utf-8")
+    tmp.replace(manifest_path)
+
+    # Clients holding the previous manifest can still fetch its files
+    keep = {f["file"] for m in (manifest, previous) for f in (m.get("feeds") or {}).values()}
+    removed = 0
+    for old in directory.glob("*.json.gz"):
+        if old.name not in keep:
+            old.unlink(missing_ok=True)
+            removed += 1
+
+    changed = sum(1 for k, f in feeds.items() if (previous.get("feeds") or {}).get(k, {}).get("file") != f["file"])
+    logger.info(
+        "Exported %d exam(s) to %d feed(s) in %s (%d changed, %d old file(s) removed)",
+        len(exams), len(feeds), directory, changed, removed,
+    )
+    return manifest
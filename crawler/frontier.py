@@ -0,0 +1,150 @@
+"""
+Crawl Frontier
+---------------
+Persistent visited-URL store shared by all scrapers and runs
+(SQLite at STATE_DIR/frontier.sqlite3).
+
+Per URL it keeps the last fetch time, HTTP status, a content hash, the
+exam the page produced and the extracted result (dates + PDF link).
+Scrapers ask `lookup(url, kind)` before fetching: a fresh record is served
+from the store, so fetching grows with what changed rather than with the
+size of the listings, and a link reached twice in one run (e.g. the SSC
+notices page and `_enrich`) is only fetched once.
+
+Detail pages are fresh for FRONTIER_TTL_DETAIL seconds, failed fetches for
+FRONTIER_TTL_ERROR (so dead links are not hammered).
+"""
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from config import (
+    FRONTIER_ENABLED,
+    FRONTIER_TTL_DETAIL,
+    FRONTIER_TTL_ERROR,
+    STATE_DIR,
+)
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (
+    url          TEXT PRIMARY KEY,
+    kind         TEXT NOT NULL,
+    fetched_at   REAL NOT NULL,
+    status       INTEGER NOT NULL,
+    content_hash TEXT,
+    exam_name    TEXT,
+    result       TEXT
+)
+"""
+
+
+class Frontier:
+    def __init__(self, path: Path, ttls: dict[str, float] | None = None, error_ttl: float = FRONTIER_TTL_ERROR):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.ttls = ttls or {"detail": FRONTIER_TTL_DETAIL}
+        self.error_ttl = error_ttl
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(_SCHEMA)
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, url: str, kind: str) -> Optional[dict]:
+        """
+        Return the stored result if `url` is still fresh for its kind, an empty
+        result if it failed recently, or None when it should be fetched.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT fetched_at, status, result FROM urls WHERE url = ?", (url,)
+            ).fetchone()
+        if row is not None:
+            fetched_at, status, result = row
+            age = time.time() - fetched_at
+            ok = 200 <= status < 400 and result is not None
+            if age < (self.ttls.get(kind, 0) if ok else self.error_ttl):
+                self.hits += 1
+                return json.loads(result) if ok else {}
+        self.misses += 1
+        return None
+
+    def record(
+        self,
+        url: str,
+        kind: str,
+        status: int,
+        content_hash: str | None = None,
+        result: dict | None = None,
+        exam_name: str | None = None,
+    ) -> None:
+        with self._lock:
+            self._db.execute(
+                """
+                INSERT INTO urls (url, kind, fetched_at, status, content_hash, exam_name, result)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    kind = excluded.kind,
+                    fetched_at = excluded.fetched_at,
+                    status = excluded.status,
+                    content_hash = excluded.content_hash,
+                    exam_name = COALESCE(excluded.exam_name, urls.exam_name),
+                    result = excluded.result
+                """,
+                (
+                    url, kind, time.time(), status, content_hash, exam_name,
+                    json.dumps(result, default=str) if result is not None else None,
+                ),
+            )
+
+    def stale(self, kind: str, max_age: float = 7 * 24 * 60 * 60, limit: int = 500) -> list[tuple[str, str | None]]:
+        """
+        URLs of `kind` that fetched fine but are past their TTL (and not older
+        than `max_age`) → [(url, exam_name)], oldest first. Used to pre-fetch
+        known detail pages on queue workers.
+        """
+        now = time.time()
+        with self._lock:
+            return self._db.execute(
+                """
+                SELECT url, exam_name FROM urls
+                WHERE kind = ? AND status BETWEEN 200 AND 399
+                  AND fetched_at < ? AND fetched_at >= ?
+                ORDER BY fetched_at
+                LIMIT ?
+                """,
+                (kind, now - self.ttls.get(kind, 0), now - max_age, limit),
+            ).fetchall()
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+_frontier: Optional[Frontier] = None
+_frontier_lock = threading.Lock()
+
+
+def get_frontier() -> Optional[Frontier]:
+    """The process-wide frontier, or None when FRONTIER_ENABLED is off or it cannot open."""
+    global _frontier
+    if not FRONTIER_ENABLED:
+        return None
+    with _frontier_lock:
+        if _frontier is None:
+            try:
+                _frontier = Frontier(STATE_DIR / "frontier.sqlite3")
+            except (OSError, sqlite3.Error) as exc:
+                logger.warning("Crawl frontier unavailable (%s) — fetching everything.", exc)
+                return None
+    return _frontier
@@ -0,0 +1,343 @@
+"""
+Process Isolation
+------------------
+`python main.py --isolate` runs every scraper in a subprocess from a small,
+recycled worker pool, so a bad page or a leaking Chrome cannot take the
+whole crawler down with it:
+
+  - each worker is its own process group (Chrome and chromedriver included)
+  - a watchdog thread reads the group's RSS from /proc every half second
+    while a scraper runs, also while the parent is busy upserting a batch;
+    above ISOLATE_RSS_LIMIT_MB, or after ISOLATE_TIME_LIMIT seconds, the
+    whole group is killed (SIGKILL) and the scraper counts as failed
+  - a worker is retired after ISOLATE_MAX_TASKS scrapers, so slow leaks
+    never accumulate
+  - exams come back over a pipe in batches of ISOLATE_BATCH, pickled and
+    zlib-compressed, and are upserted in the parent as they arrive
+  - with a run checkpoint, the worker is handed the detail pages it already
+    holds and sends back each page it fetches, so a --resume after a killed
+    worker does not fetch them again
+
+The parent keeps the run itself (upserts, notifications, checkpoint,
+webhook); workers only fetch. Workers are started from a forkserver, not
+forked from the parent, whose log, metrics and webhook threads would leave
+locks held in the child. Linux only (forkserver, /proc).
+"""
+from __future__ import annotations
+
+import logging
+import math
+import multiprocessing
+import os
+import pickle
+import signal
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Iterator
+
+from budget import Budget
+from config import (
+    ISOLATE_BATCH,
+    ISOLATE_MAX_TASKS,
+    ISOLATE_RSS_LIMIT_MB,
+    ISOLATE_TIME_LIMIT,
+)
+
+logger = logging.getLogger("crawler.isolation")
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_POLL = 0.5   # seconds between limit checks
+
+
+class IsolationError(RuntimeError):
+    """A scraper's worker process crashed or was killed for exceeding a limit."""
+
+
+# ── Wire format ──────────────────────────────────────────────────────────────
+_send_lock = threading.Lock()   # detail threads and the batch loop share a worker's pipe
+
+
+def _send(conn, kind: str, payload) -> None:
+    data = zlib.compress(pickle.dumps((kind, payload), protocol=pickle.HIGHEST_PROTOCOL), 6)
+    with _send_lock:
+        conn.send_bytes(data)
+
+
+def _recv(conn) -> tuple[str, object]:
+    return pickle.loads(zlib.decompress(conn.recv_bytes()))
+
+
+def group_rss(pgid: int) -> int:
+    """Total resident memory (bytes) of every process in process group `pgid`."""
+    total = 0
+    for stat in Path("/proc").glob("[0-9]*/stat"):
+        try:
+            fields = stat.read_text().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue   # process exited while we were looking
+        # fields[0] is the state (field 3 of stat); pgrp is field 5, rss field 24
+        if int(fields[2]) == pgid:
+            total += int(fields[21]) * _PAGE_SIZE
+    return total
+
+
+# ── Worker process ───────────────────────────────────────────────────────────
+class _PipeCheckpoint:
+    """The run checkpoint as a scraper in a worker sees it: details in, fetched details out."""
+
+    def __init__(self, conn, details: dict):
+        self._conn = conn
+        self._details = details
+
+    def detail(self, url: str) -> dict | None:
+        return self._details.get(url)
+
+    def mark_detail(self, url: str, detail: dict) -> None:
+        self._details[url] = detail
+        _send(self._conn, "detail", (url, detail))
+
+
+def _worker_main(conn, max_tasks: int, log_level: int) -> None:
+    os.setpgrp()   # own group: killpg() also takes out Chrome / chromedriver
+    signal.signal(signal.SIGINT, signal.SIG_IGN)   # the parent decides when we stop
+
+    from logsetup import log_context, setup_child_logging
+    from scrapers import get_scraper
+
+    setup_child_logging(log_level)
+
+    scrapers: dict = {}
+    try:
+        for _ in range(max_tasks):
+            try:
+                name = conn.recv()
+            except EOFError:
+                break
+            if name is None:
+                break
+            name, budget_seconds, run_id, details = name
+            with log_context(run_id=run_id, scraper=name):
+                try:
+                    scraper = scrapers.get(name) or scrapers.setdefault(name, get_scraper(name)())
+                    scraper.budget = Budget(budget_seconds)
+                    scraper.run_id = run_id
+                    scraper.checkpoint = _PipeCheckpoint(conn, details) if details is not None else None
+                    scraper.truncated = scraper.requests_made = scraper.bytes_fetched = 0
+                    batch = []
+                    for exam in scraper.fetch_iter():
+                        batch.append(exam)
+                        if len(batch) >= ISOLATE_BATCH:
+                            _send(conn, "exams", batch)
+                            batch = []
+                    if batch:
+                        _send(conn, "exams", batch)
+                    _send(conn, "done", {
+                        "truncated": scraper.truncated,
+                        "requests_made": scraper.requests_made,
+                        "bytes_fetched": scraper.bytes_fetched,
+                    })
+                except Exception as exc:
+                    _send(conn, "error", f"{exc.__class__.__name__}: {exc}")
+    finally:
+        for scraper in scrapers.values():
+            scraper.close()
+        conn.close()
+
+
+# ── Parent side ──────────────────────────────────────────────────────────────
+class _Worker:
+    def __init__(self, ctx, max_tasks: int):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main, args=(child_conn, max_tasks, logging.getLogger().level), daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+        self.max_tasks = max_tasks
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    def usable(self) -> bool:
+        return self.process.is_alive() and self.tasks < self.max_tasks
+
+    def kill_group(self) -> None:
+        try:
+            os.killpg(self.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            # Not (yet) a group leader — kill the worker itself
+            self.process.kill()
+
+    def kill(self) -> None:
+        self.kill_group()
+        self.process.join(5)
+        self.conn.close()
+
+    def retire(self) -> None:
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(10)
+        if self.process.is_alive():
+            self.kill()
+        else:
+            self.conn.close()
+
+
+class IsolatedPool:
+    def __init__(
+        self,
+        max_tasks: int = ISOLATE_MAX_TASKS,
+        rss_limit_mb: float = ISOLATE_RSS_LIMIT_MB,
+        time_limit: float = ISOLATE_TIME_LIMIT,
+    ):
+        self.max_tasks = max(1, max_tasks)
+        self.rss_limit = rss_limit_mb * 1024 * 1024
+        self.time_limit = time_limit
+        self._ctx = multiprocessing.get_context("forkserver")
+        self._ctx.set_forkserver_preload(["scrapers.base"])
+        self._idle: list[_Worker] = []
+
+    def scraper(self, name: str) -> "IsolatedScraper":
+        return IsolatedScraper(self, name)
+
+    def _acquire(self) -> _Worker:
+        while self._idle:
+            worker = self._idle.pop()
+            if worker.usable():
+                return worker
+            worker.retire()
+        return _Worker(self._ctx, self.max_tasks)
+
+    def _release(self, worker: _Worker) -> None:
+        worker.tasks += 1
+        if worker.usable():
+            self._idle.append(worker)
+        else:
+            worker.retire()
+
+    def run(
+        self,
+        name: str,
+        budget: Budget | None = None,
+        done: dict | None = None,
+        run_id: str | None = None,
+        checkpoint=None,
+    ) -> Iterator:
+        """
+        Run scraper `name` in a worker; yields its exams as batches arrive.
+        The worker's scraper gets what is left of `budget` and the detail
+        pages in `checkpoint`, and the pages it fetches are recorded there;
+        its closing counters (e.g. {"truncated": n}) are added into `done`.
+        """
+        worker = self._acquire()
+        remaining = budget.remaining() if budget else math.inf
+        details = checkpoint.details() if checkpoint else None
+        worker.conn.send((name, None if remaining == math.inf else remaining, run_id, details))
+        # Checked on a thread of its own: while the consumer works through a
+        # batch this generator is suspended, and the worker keeps running
+        overrun: list[str] = []
+        stop = threading.Event()
+        watchdog = threading.Thread(
+            target=self._watch, args=(name, worker, stop, overrun), name=f"isolate-{name}", daemon=True,
+        )
+        watchdog.start()
+        finished = False
+        try:
+            while not overrun:
+                if not worker.conn.poll(_POLL):
+                    continue
+                try:
+                    kind, payload = _recv(worker.conn)
+                except EOFError:
+                    worker.process.join(1)
+                    if overrun:
+                        break
+                    raise IsolationError(f"{name} worker died (exit code {worker.process.exitcode})")
+                if kind == "exams":
+                    yield from payload
+                    continue
+                if kind == "detail":
+                    if checkpoint:
+                        checkpoint.mark_detail(*payload)
+                    continue
+                if kind == "error":
+                    finished = True
+                    raise RuntimeError(payload)
+                finished = True
+                for key, value in (payload or {}).items():
+                    if done is not None:
+                        done[key] = done.get(key, 0) + value
+                return
+            raise IsolationError(overrun[0])
+        finally:
+            stop.set()
+            watchdog.join()
+            if finished and not overrun:
+                self._release(worker)
+            else:
+                # Overrun, crash or the consumer gave up mid-task: the worker is in an unknown state
+                logger.warning("Killing %s worker (pid %s)", name, worker.pid)
+                worker.kill()
+
+    def _watch(self, name: str, worker: _Worker, stop: threading.Event, overrun: list) -> None:
+        """Kill `worker`'s group once it passes the time or memory limit; the reason goes in `overrun`."""
+        started = time.monotonic()
+        while not stop.wait(_POLL):
+            elapsed = time.monotonic() - started
+            if self.time_limit and elapsed > self.time_limit:
+                overrun.append(f"{name} exceeded its time limit ({self.time_limit:.0f}s)")
+            elif self.rss_limit:
+                rss = group_rss(worker.pid)
+                if rss > self.rss_limit:
+                    overrun.append(
+                        f"{name} exceeded its memory limit ({rss / 2**20:.0f} MB > {self.rss_limit / 2**20:.0f} MB)"
+                    )
+            if overrun:
+                worker.kill_group()
+                return
+
+    def close(self) -> None:
+        while self._idle:
+            self._idle.pop().retire()
+
+
+class IsolatedScraper:
+    """Stands in for a scraper instance in the runner; the real one lives in a worker."""
+
+    def __init__(self, pool: IsolatedPool, name: str):
+        from scrapers import get_scraper
+
+        self._pool = pool
+        self._name = name
+        self.NAME = get_scraper(name).NAME
+        self.checkpoint = None   # set by the runner; detail pages are relayed to it
+        self.budget: Budget | None = None
+        self.run_id: str | None = None
+        self._report: dict = {}
+
+    @property
+    def truncated(self) -> int:
+        return self._report.get("truncated", 0)
+
+    @property
+    def requests_made(self) -> int:
+        return self._report.get("requests_made", 0)
+
+    @property
+    def bytes_fetched(self) -> int:
+        return self._report.get("bytes_fetched", 0)
+
+    def fetch_iter(self) -> Iterator:
+        return self._pool.run(self._name, self.budget, self._report, self.run_id, self.checkpoint)
+
+    def fetch(self) -> list:
+        return list(self.fetch_iter())
+
+    def close(self) -> None:
+        pass
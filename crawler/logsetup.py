@@ -0,0 +1,208 @@
+"""
+Logging Pipeline
+-----------------
+Log calls only put the record on an in-memory queue (QueueHandler); one
+listener thread formats and writes it to the console and the log file, so
+per-exam logging never waits on the disk while scrapers run.
+
+  - records carry `run_id` and `scraper` (see log_context), filled in on
+    the calling thread — stream() and the spec engine's detail threads
+    inherit them
+  - LOG_FORMAT=json writes the file as JSON lines (ts, level, logger, msg,
+    run_id, scraper, exc); the console stays human-readable
+  - LOG_DIR/crawler.log is rotated when it passes LOG_MAX_MB or the day
+    changes; rotated files are gzip-compressed (crawler_<date>-<time>.log.gz)
+    and removed after LOG_RETENTION_DAYS
+
+Child processes (--isolate workers, the --reparse pool) are started from
+a forkserver, so they never inherit the listener; they open their own
+handlers with setup_child_logging and do not rotate.
+"""
+from __future__ import annotations
+
+import atexit
+import contextlib
+import contextvars
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Iterator
+
+from config import LOG_DIR, LOG_FORMAT, LOG_LEVEL, LOG_MAX_MB, LOG_RETENTION_DAYS
+
+_run_id: contextvars.ContextVar[str | None] = contextvars.ContextVar("run_id", default=None)
+_scraper: contextvars.ContextVar[str | None] = contextvars.ContextVar("scraper", default=None)
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+# ── Context ──────────────────────────────────────────────────────────────────
+@contextlib.contextmanager
+def log_context(run_id: str | None = None, scraper: str | None = None) -> Iterator[None]:
+    """Tag records logged inside the block (on this thread / context) with run_id / scraper."""
+    tokens = []
+    if run_id is not None:
+        tokens.append((_run_id, _run_id.set(run_id)))
+    if scraper is not None:
+        tokens.append((_scraper, _scraper.set(scraper)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+class _ContextFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.run_id = _run_id.get()
+        record.scraper = _scraper.get()
+        return True
+
+
+# ── Formatting ───────────────────────────────────────────────────────────────
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "run_id": getattr(record, "run_id", None),
+            "scraper": getattr(record, "scraper", None),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+# ── Rotation ─────────────────────────────────────────────────────────────────
+class RotatingLogFile(logging.handlers.BaseRotatingHandler):
+    """
+    `path` rotated by size and by calendar day. Old files are renamed with
+    their rotation time, gzip-compressed and dropped after `retention_days`.
+    """
+
+    def __init__(self, path: Path, max_bytes: int, retention_days: float):
+        super().__init__(path, "a", encoding="utf-8", delay=True)
+        self.max_bytes = max_bytes
+        self.retention_days = retention_days
+        self.rotate = True   # off in child processes
+        self._day = date.fromtimestamp(path.stat().st_mtime) if path.exists() else date.today()
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if not self.rotate:
+            return False
+        if date.today() != self._day:
+            return True
+        if not self.max_bytes:
+            return False
+        if self.stream is not None:
+            return self.stream.tell() >= self.max_bytes
+        return os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename) >= self.max_bytes
+
+    def doRollover(self) -> None:
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        path = Path(self.baseFilename)
+        if path.exists() and path.stat().st_size:
+            stamp = f"{path.stem}_{datetime.now():%Y%m%d-%H%M%S}"
+            rotated, n = path.with_name(stamp + path.suffix), 1
+            while rotated.exists() or Path(f"{rotated}.gz").exists():
+                rotated, n = path.with_name(f"{stamp}-{n}{path.suffix}"), n + 1
+            path.rename(rotated)
+            self._compress(rotated)
+        self._prune(path)
+        self._day = date.today()
+
+    @staticmethod
+    def _compress(path: Path) -> None:
+        with open(path, "rb") as src, gzip.open(f"{path}.gz", "wb", compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst)
+        path.unlink()
+
+    def _prune(self, path: Path) -> None:
+        cutoff = time.time() - self.retention_days * 86400
+        for old in path.parent.glob(f"{path.stem}_*{path.suffix}.gz"):
+            if old.stat().st_mtime < cutoff:
+                old.unlink(missing_ok=True)
+
+
+# ── Setup ────────────────────────────────────────────────────────────────────
+def _handlers() -> list[logging.Handler]:
+    import colorlog
+
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+
+    console = colorlog.StreamHandler()
+    console.setFormatter(colorlog.ColoredFormatter(
+        "%(log_color)s%(asctime)s │ %(levelname)-8s │ %(name)s │ %(message)s",
+        datefmt="%H:%M:%S",
+        log_colors={
+            "DEBUG":    "cyan",
+            "INFO":     "green",
+            "WARNING":  "yellow",
+            "ERROR":    "red",
+            "CRITICAL": "bold_red",
+        },
+    ))
+
+    file_handler = RotatingLogFile(
+        LOG_DIR / "crawler.log", int(LOG_MAX_MB * 1024 * 1024), LOG_RETENTION_DAYS,
+    )
+    if LOG_FORMAT == "json":
+        file_handler.setFormatter(JsonFormatter())
+    else:
+        file_handler.setFormatter(logging.Formatter(
+            "%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S",
+        ))
+    return [console, file_handler]
+
+
+def setup_logging(level: str | int = LOG_LEVEL) -> None:
+    """Route the root logger through the queue to the console and LOG_DIR/crawler.log."""
+    global _listener
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(records)
+    queue_handler.addFilter(_ContextFilter())
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(records, *_handlers())
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging() -> None:
+    """Drain the queue and stop the listener (registered atexit)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def setup_child_logging(level: str | int = LOG_LEVEL) -> None:
+    """Write straight to the console and log file, for a child process (no listener thread)."""
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    for handler in _handlers():
+        if isinstance(handler, RotatingLogFile):
+            handler.rotate = False   # the parent rotates
+        handler.addFilter(_ContextFilter())
+        root.addHandler(handler)
+    root.setLevel(level)
@@ -15,8 +15,50 @@ Usage
   python main.py --dry-run
 
   # Run and explicitly send notifications for new exams
+  # (only to students whose profile/history matches each exam)
   python main.py --notify
 
+  # Notify every active student instead of the matched ones
+  python main.py --notify --notify-all
+
+  # Send due deadline / exam-date reminders (no scraping)
+  python main.py --reminders
+
+  # Retry webhook pushes that failed in earlier runs, then exit
+  python main.py --flush-webhooks
+
+  # Continue the last interrupted run (skips finished scrapers / upserts)
+  python main.py --resume --notify
+
+  # Stay running; poll each source on its own adaptive schedule
+  python main.py --daemon --notify
+
+  # Shard a run over several nodes sharing a work queue (WORKQUEUE_URL)
+  python main.py --coordinator --notify     # one node
+  python main.py --worker                   # any number of others
+
+  # Run each scraper in a memory/time-limited subprocess
+  python main.py --isolate --notify
+
+  # Stop starting scrapers / enriching detail pages after 45 minutes
+  python main.py --deadline 2700 --notify
+
+  # Re-parse saved pages (page archive or a wget-style directory), no network
+  python main.py --reparse state/archive --dry-run -v
+  python main.py --reparse ~/saved-pages --scrapers ssc
+
+  # Keep the scraped exams of a dry run for analysis
+  python main.py --dry-run --output ndjson:runs/today.ndjson.gz
+  python main.py --dry-run --output sqlite:runs/exams.db
+  python main.py --dry-run --output parquet:runs/today.parquet
+
+  # Also publish static exam feeds for the site / CDN (EXPORT_DIR)
+  python main.py --notify --export
+  python main.py --notify --export ../public/feeds
+
+  # Watch a long run live (OpenMetrics, e.g. for Prometheus)
+  METRICS_PORT=9108 python main.py --daemon   # curl localhost:9108/metrics
+
   # Combine flags
   python main.py --scrapers bpsc,uppsc,mppsc --notify
 """
@@ -25,41 +67,27 @@ from __future__ import annotations
 import argparse
 import logging
 import sys
-import traceback
-from datetime import datetime
-
-import colorlog
-
-from config import LOG_DIR
-from database import upsert_exam, get_all_student_emails
-from notifier import send_new_exam_notification
-from webhook import push_results
-from scrapers import ALL_SCRAPERS
-
-# ── Logging ──────────────────────────────────────────────────────────────────
-LOG_DIR.mkdir(parents=True, exist_ok=True)
-_LOG_FILE = LOG_DIR / f"crawler_{datetime.now():%Y%m%d}.log"
-
-_handler = colorlog.StreamHandler()
-_handler.setFormatter(colorlog.ColoredFormatter(
-    "%(log_color)s%(asctime)s │ %(levelname)-8s │ %(name)s │ %(message)s",
-    datefmt="%H:%M:%S",
-    log_colors={
-        "DEBUG":    "cyan",
-        "INFO":     "green",
-        "WARNING":  "yellow",
-        "ERROR":    "red",
-        "CRITICAL": "bold_red",
-    },
-))
-
-_file_handler = logging.FileHandler(_LOG_FILE, encoding="utf-8")
-_file_handler.setFormatter(logging.Formatter(
-    "%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-))
-
-logging.basicConfig(level=logging.INFO, handlers=[_handler, _file_handler])
+import uuid
+
+from archive import get_archive
+from checkpoint import Checkpoint
+from cluster import Worker, run_coordinator, stop_on_signals
+from budget import Budget, acquire_run_lock
+from config import EXPORT_DIR, RUN_DEADLINE
+from daemon import run_daemon
+from feeds import export_feeds
+from isolation import IsolatedPool
+from logsetup import setup_logging
+from metrics import start_metrics
+from reminders import dispatch_reminders
+from reparse import reparse
+from runner import CrawlRun, Recipients
+from sinks import open_sink
+from webhook import flush_spool, flush_spool_async
+from workqueue import open_queue
+from scrapers import SCRAPER_NAMES, get_scraper
+
+
 logger = logging.getLogger("crawler.main")
 
 
@@ -83,6 +111,70 @@ def _parse_args() -> argparse.Namespace:
         action="store_true",
         help="Send email notifications to registered students for newly discovered exams.",
     )
+    p.add_argument(
+        "--notify-all",
+        action="store_true",
+        help="With --notify: mail every active student, not only those matching the exam.",
+    )
+    p.add_argument(
+        "--reminders",
+        action="store_true",
+        help="Send due reminders from exam_reminders and exit (no scraping).",
+    )
+    p.add_argument(
+        "--flush-webhooks",
+        action="store_true",
+        help="Retry spooled (previously failed) webhook pushes and exit.",
+    )
+    p.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue the last unfinished run from its checkpoint instead of starting over.",
+    )
+    p.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Keep running and poll each scraper on an adaptive schedule (stops on SIGTERM).",
+    )
+    p.add_argument(
+        "--coordinator",
+        action="store_true",
+        help="Queue this run's scraper/detail jobs for --worker nodes, work them too, then upsert and notify.",
+    )
+    p.add_argument(
+        "--worker",
+        action="store_true",
+        help="Pull scraper/detail jobs from the shared work queue until stopped (or WORKER_IDLE_EXIT).",
+    )
+    p.add_argument(
+        "--isolate",
+        action="store_true",
+        help="Run each scraper in a recycled subprocess with memory/time limits (ISOLATE_*).",
+    )
+    p.add_argument(
+        "--deadline",
+        metavar="SECONDS",
+        type=float,
+        default=RUN_DEADLINE,
+        help="Overall time limit for the run; detail enrichment / remaining scrapers are skipped after it.",
+    )
+    p.add_argument(
+        "--reparse",
+        metavar="DIR",
+        help="Run the parsers over saved pages (page archive, manifest or wget -x directory) instead of the sites.",
+    )
+    p.add_argument(
+        "--output",
+        metavar="KIND:PATH",
+        help="Also stream every scraped exam to ndjson:PATH, sqlite:PATH or parquet:PATH (works with --dry-run).",
+    )
+    p.add_argument(
+        "--export",
+        metavar="DIR",
+        nargs="?",
+        const=EXPORT_DIR,
+        help=f"After the run, write static gzipped JSON feeds of the active exams (default DIR: {EXPORT_DIR}).",
+    )
     p.add_argument(
         "--verbose", "-v",
         action="store_true",
@@ -94,104 +186,163 @@ def _parse_args() -> argparse.Namespace:
 # ── Main ─────────────────────────────────────────────────────────────────────
 def main() -> int:
     args = _parse_args()
+    setup_logging()
+    start_metrics()
 
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
 
-    # Filter scrapers if requested
-    scraper_classes = ALL_SCRAPERS
+    if args.reminders:
+        try:
+            dispatch_reminders(dry_run=args.dry_run)
+        except Exception as exc:
+            logger.error("Reminder dispatch failed: %s", exc)
+            return 1
+        return 0
+
+    if args.flush_webhooks:
+        flush_spool()
+        return 0
+
+    if args.worker:
+        queue = open_queue()
+        try:
+            done = Worker(queue, stop=stop_on_signals()).run()
+        finally:
+            queue.close()
+        logger.info("Worker finished %d job(s).", done)
+        return 0
+
+    # One scraping run per machine at a time (cron slots must not overlap)
+    run_lock = acquire_run_lock()
+    if run_lock is None:
+        return 0
+    deadline = Budget(args.deadline) if args.deadline else None
+
+    # Resume an interrupted run with its own scraper selection
+    checkpoint = Checkpoint.load_unfinished() if args.resume and not args.dry_run else None
+    if args.resume and not args.dry_run:
+        if checkpoint:
+            logger.info(
+                "Resuming run %s from %s (done: %s)",
+                checkpoint.run_id, checkpoint.data.get("started_at"),
+                ", ".join(checkpoint.data["completed"]) or "none",
+            )
+            args.scrapers = ",".join(checkpoint.scrapers)
+        else:
+            logger.info("No unfinished run to resume — starting a new one.")
+
+    # Filter scrapers if requested (only the selected modules get imported)
+    names = SCRAPER_NAMES
     if args.scrapers:
         requested = {n.strip().lower() for n in args.scrapers.split(",")}
-        scraper_classes = [
-            cls for cls in ALL_SCRAPERS if cls.NAME.lower() in requested
-        ]
+        names = [n for n in SCRAPER_NAMES if n in requested]
+        scraper_classes = [get_scraper(n) for n in names]
         if not scraper_classes:
             logger.error("No matching scrapers found for: %s", args.scrapers)
             return 1
         logger.info("Running scrapers: %s", [cls.NAME for cls in scraper_classes])
     else:
+        scraper_classes = [get_scraper(n) for n in names]
         logger.info("Running ALL scrapers (%d)", len(scraper_classes))
 
-    # Pre-fetch student list once (if notifications are enabled)
-    students: list[dict] = []
-    if args.notify and not args.dry_run:
+    sink = None
+    if args.output:
         try:
-            students = get_all_student_emails()
-            logger.info("Loaded %d student email(s) for notification.", len(students))
-        except Exception as exc:
-            logger.warning("Could not load student emails: %s", exc)
+            sink = open_sink(args.output)
+        except (ValueError, RuntimeError) as exc:
+            logger.error("%s", exc)
+            return 1
 
-    # ── Per-scraper run ──────────────────────────────────────────────────────
-    totals = {"scraped": 0, "new": 0, "updated": 0, "errors": 0, "notified": 0}
-    all_exams: list[dict] = []   # collect for webhook push
+    if args.reparse:
+        # Historical pages: upsert (unless --dry-run) but never notify
+        run = CrawlRun(dry_run=args.dry_run, sink=sink)
+        try:
+            for name, exams, error in reparse(args.reparse, names):
+                if error:
+                    run.record_failure(get_scraper(name).NAME, error)
+                else:
+                    run.process_exams(get_scraper(name).NAME, exams)
+        except FileNotFoundError as exc:
+            logger.error("Nothing to re-parse at %s", exc)
+            return 1
+        return _finish_run(run, args)
+
+    pool = IsolatedPool() if args.isolate else None
 
-    for ScraperClass in scraper_classes:
-        scraper = ScraperClass()
-        logger.info("━━━ Running %s scraper ━━━", scraper.NAME)
+    if args.daemon:
         try:
-            exams = scraper.fetch()
-            totals["scraped"] += len(exams)
-            logger.info("%s: scraped %d exam(s)", scraper.NAME, len(exams))
-            all_exams.extend(exams)   # accumulate for webhook
-
-            for exam in exams:
-                if not exam.get("exam_name") or not exam.get("official_website"):
-                    logger.debug("Skipping incomplete exam record: %s", exam)
-                    continue
-
-                if args.dry_run:
-                    logger.info("[DRY-RUN] Would upsert: %s", exam["exam_name"])
-                    continue
-
-                try:
-                    success, is_new, exam_id = upsert_exam(exam)
-                    if success:
-                        if is_new:
-                            totals["new"] += 1
-                            logger.info("NEW exam saved: %s (id=%s)", exam["exam_name"], exam_id)
-                            # Notify students about new exam
-                            if args.notify and students:
-                                sent = send_new_exam_notification(exam, students)
-                                totals["notified"] += sent
-                                logger.info(
-                                    "Notifications sent for '%s': %d/%d",
-                                    exam["exam_name"], sent, len(students),
-                                )
-                        else:
-                            totals["updated"] += 1
-                            logger.debug("Updated existing exam: %s (id=%s)", exam["exam_name"], exam_id)
-                    else:
-                        totals["errors"] += 1
-                        logger.warning("DB upsert failed for: %s", exam["exam_name"])
-                except Exception as exc:
-                    totals["errors"] += 1
-                    logger.error("Error upserting '%s': %s", exam.get("exam_name"), exc)
+            return run_daemon(
+                names, dry_run=args.dry_run, notify=args.notify, notify_all=args.notify_all, pool=pool,
+                export_dir=args.export, sink=sink,
+            )
+        finally:
+            if pool:
+                pool.close()
+            if sink:
+                sink.close()
 
-        except Exception as exc:
-            totals["errors"] += 1
-            logger.error("Scraper %s crashed: %s", scraper.NAME, exc)
-            logger.debug(traceback.format_exc())
+    # Retry earlier failed webhook pushes in the background
+    if not args.dry_run:
+        flush_spool_async()
+
+    # Pre-fetch students once (if notifications are enabled)
+    recipients = None
+    if args.notify and not args.dry_run:
+        recipients = Recipients(args.notify_all).load()
+
+    if args.coordinator:
+        run = CrawlRun(dry_run=args.dry_run, recipients=recipients, sink=sink)
+        queue = open_queue()
+        try:
+            run_coordinator(names, queue, run, stop=stop_on_signals())
         finally:
-            scraper.close()
+            queue.close()
+        return _finish_run(run, args)
 
-    # ── Summary ──────────────────────────────────────────────────────────────
-    logger.info(
-        "━━━ DONE ━━━  scraped=%d  new=%d  updated=%d  errors=%d  notified=%d",
-        totals["scraped"], totals["new"], totals["updated"],
-        totals["errors"], totals["notified"],
+    # ── Per-scraper run ──────────────────────────────────────────────────────
+    if checkpoint is None and not args.dry_run:
+        checkpoint = Checkpoint.start(str(uuid.uuid4()), names)
+    run = CrawlRun(
+        dry_run=args.dry_run, recipients=recipients, checkpoint=checkpoint, deadline=deadline, sink=sink,
     )
+    try:
+        for name, ScraperClass in zip(names, scraper_classes):
+            scraper = pool.scraper(name) if pool else ScraperClass()
+            try:
+                run.run_scraper(scraper)
+            finally:
+                scraper.close()
+    finally:
+        if pool:
+            pool.close()
 
-    # ── Push results to the Next.js webhook ──────────────────────────────────
-    if not args.dry_run:
-        scrapers_used = [cls.NAME for cls in scraper_classes]
-        push_results(
-            scrapers=scrapers_used,
-            exams=all_exams,
-            stats=totals,
-            error_log="" if totals["errors"] == 0 else f"{totals['errors']} error(s) during run",
-        )
-
-    return 0 if totals["errors"] == 0 else 1
+    code = _finish_run(run, args)
+    if checkpoint:
+        pending = [n for n in checkpoint.scrapers if not checkpoint.is_completed(get_scraper(n).NAME)]
+        if pending:
+            # Deadline hit or a scraper crashed: keep the checkpoint so --resume runs the rest
+            checkpoint.reported()
+            logger.warning("Not completed: %s — continue with --resume", ", ".join(pending))
+        else:
+            checkpoint.finish()
+    return code
+
+
+def _finish_run(run: CrawlRun, args: argparse.Namespace) -> int:
+    """Status transitions, summary, webhook push of the run's delta, feed export."""
+    if run.sink:
+        run.sink.close()
+    run.update_statuses()
+    run.check_performance()
+    run.log_summary()
+    run.push_webhook()
+    if args.export and not args.dry_run:
+        export_feeds(args.export)
+    archive = get_archive()
+    if archive:
+        archive.maybe_prune()
+    return 0 if run.totals["errors"] == 0 else 1
 
 
 if __name__ == "__main__":
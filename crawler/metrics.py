@@ -0,0 +1,249 @@
+"""
+Crawler Metrics
+----------------
+Live counters, gauges and histograms of a running crawl, exposed in the
+OpenMetrics text format, so long runs and the daemon can be watched (or
+scraped by Prometheus) instead of tailing the log:
+
+  METRICS_PORT=9108        serve http://METRICS_ADDR:9108/metrics
+  METRICS_TEXTFILE=path    rewrite the file every METRICS_INTERVAL seconds
+                           (node_exporter textfile collector) and at exit
+
+Instrumented: HTTP fetches per host (requests by outcome, latency, bytes,
+in-flight), the scraper → upsert stream queue, exams per scraper and
+outcome, upserts (latency, outcome), scraper failures and emails sent.
+Recording is a dict update under a lock, so it stays on even when nothing
+is exported. Counters are per process: --isolate workers and the parse
+pool do not report theirs to the parent; cluster workers export their own
+when started with their own METRICS_PORT.
+"""
+from __future__ import annotations
+
+import atexit
+import contextlib
+import logging
+import math
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterator
+
+from config import METRICS_ADDR, METRICS_INTERVAL, METRICS_PORT, METRICS_TEXTFILE
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+# ── Metric types ─────────────────────────────────────────────────────────────
+class _Metric:
+    TYPE = ""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+        _REGISTRY.append(self)
+
+    def _label_str(self, values: tuple, extra: str = "") -> str:
+        pairs = [f'{k}="{_escape(v)}"' for k, v in zip(self.labels, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        suffix = "_total" if self.TYPE == "counter" else ""
+        return [f"{self.name}{suffix}{self._label_str(k)} {_num(v)}" for k, v in items]
+
+
+class Counter(_Metric):
+    TYPE = "counter"
+
+    def inc(self, *labels: str, by: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + by
+
+
+class Gauge(_Metric):
+    TYPE = "gauge"
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, *labels: str, by: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + by
+
+    def dec(self, *labels: str, by: float = 1) -> None:
+        self.inc(*labels, by=-by)
+
+
+class Histogram(_Metric):
+    TYPE = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = ()):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: dict[tuple, list] = {}   # labels → [bucket counts…, count, sum]
+
+    def observe(self, value: float, *labels: str) -> None:
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1   # non-cumulative here, summed up when rendered
+                    break
+            series[-2] += 1
+            series[-1] += value
+
+    @contextlib.contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        lines = []
+        for labels, series in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, series):
+                cumulative += n
+                le = 'le="+Inf"' if bound == math.inf else f'le="{_num(bound)}"'
+                lines.append(f"{self.name}_bucket{self._label_str(labels, le)} {cumulative}")
+            lines.append(f"{self.name}_count{self._label_str(labels)} {series[-2]}")
+            lines.append(f"{self.name}_sum{self._label_str(labels)} {_num(series[-1])}")
+        return lines
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _num(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+_REGISTRY: list[_Metric] = []
+
+_HTTP_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+_DB_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+# ── Crawler metrics ──────────────────────────────────────────────────────────
+HTTP_REQUESTS = Counter("crawler_http_requests", "HTTP fetches by host and outcome", ("host", "outcome"))
+HTTP_LATENCY = Histogram(
+    "crawler_http_request_duration_seconds", "HTTP fetch latency (headers and body)", ("host",), _HTTP_BUCKETS,
+)
+HTTP_BYTES = Counter("crawler_http_response_bytes", "Response bytes read", ("host",))
+HTTP_IN_FLIGHT = Gauge("crawler_http_in_flight", "HTTP fetches in progress")
+QUEUE_DEPTH = Gauge("crawler_stream_queue_depth", "Exams waiting between a scraper and the upserts", ("scraper",))
+EXAMS = Counter("crawler_exams", "Exams processed by scraper and result", ("scraper", "result"))
+UPSERTS = Counter("crawler_upserts", "Exam upserts by outcome", ("outcome",))
+UPSERT_LATENCY = Histogram("crawler_upsert_duration_seconds", "Exam upsert latency", (), _DB_BUCKETS)
+SCRAPER_FAILURES = Counter("crawler_scraper_failures", "Scraper runs that crashed", ("scraper",))
+EMAILS = Counter("crawler_emails", "Emails sent and failed", ("kind", "outcome"))
+
+
+@contextlib.contextmanager
+def track_request(host: str) -> Iterator[None]:
+    """Count one HTTP fetch of `host`: in flight while inside, then latency and outcome."""
+    HTTP_IN_FLIGHT.inc()
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    except Exception as exc:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+        outcome = f"http_{status}" if status else exc.__class__.__name__
+        raise
+    finally:
+        HTTP_IN_FLIGHT.dec()
+        HTTP_LATENCY.observe(time.perf_counter() - started, host)
+        HTTP_REQUESTS.inc(host, outcome)
+
+
+# ── Export ───────────────────────────────────────────────────────────────────
+def render() -> str:
+    lines = []
+    for metric in _REGISTRY:
+        lines.append(f"# TYPE {metric.name} {metric.TYPE}")
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.extend(metric.samples())
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass   # scrapes every few seconds would flood the crawler log
+
+
+def write_textfile(path: Path | str) -> None:
+    path = Path(path)
+    tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+    tmp.write_text(render(), encoding="utf-8")
+    tmp.replace(path)
+
+
+_started = False
+
+
+def start_metrics(port: int = METRICS_PORT, textfile: str = METRICS_TEXTFILE) -> None:
+    """Start the configured exporters (none by default). Safe to call more than once."""
+    global _started
+    if _started or not (port or textfile):
+        return
+    _started = True
+    if port:
+        try:
+            server = ThreadingHTTPServer((METRICS_ADDR, port), _Handler)
+        except OSError as exc:
+            logger.warning("Metrics endpoint not started on %s:%d: %s", METRICS_ADDR, port, exc)
+        else:
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+            logger.info("Metrics at http://%s:%d/metrics", METRICS_ADDR, port)
+    if textfile:
+        Path(textfile).parent.mkdir(parents=True, exist_ok=True)
+
+        def loop() -> None:
+            while True:
+                time.sleep(METRICS_INTERVAL)
+                try:
+                    write_textfile(textfile)
+                except OSError as exc:
+                    logger.debug("Could not write metrics textfile: %s", exc)
+
+        threading.Thread(target=loop, name="metrics-textfile", daemon=True).start()
+        atexit.register(_final_textfile, textfile)
+
+
+def _final_textfile(path: str) -> None:
+    try:
+        write_textfile(path)
+    except OSError:
+        pass
@@ -2,7 +2,8 @@
 Email Notifier
 --------------
 Sends "New Exam Released" emails to all registered students when a
-brand-new exam is discovered by the crawler.
+brand-new exam is discovered by the crawler, and deadline reminder
+digests for rows in exam_reminders.
 
 Uses SMTP (Gmail App Password by default).
 """
@@ -12,6 +13,7 @@ from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from typing import Optional
 
+import metrics
 from config import SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASS, FROM_EMAIL, FROM_NAME
 
 logger = logging.getLogger(__name__)
@@ -102,10 +104,7 @@ def send_new_exam_notification(exam: dict, students: list[dict]) -> int:
     sent = 0
 
     try:
-        server = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=10)
-        server.ehlo()
-        server.starttls()
-        server.login(SMTP_USER, SMTP_PASS)
+        server = _open_smtp()
 
         for student in students:
             to_email = student.get("email", "").strip()
@@ -125,7 +124,9 @@ def send_new_exam_notification(exam: dict, students: list[dict]) -> int:
                 msg.attach(MIMEText(personalised, "html"))
                 server.sendmail(FROM_EMAIL, to_email, msg.as_string())
                 sent += 1
+                metrics.EMAILS.inc("new_exam", "sent")
             except Exception as exc:
+                metrics.EMAILS.inc("new_exam", "failed")
                 logger.warning("Failed to send to %s: %s", to_email, exc)
 
         server.quit()
@@ -134,3 +135,111 @@ def send_new_exam_notification(exam: dict, students: list[dict]) -> int:
         logger.error("SMTP connection failed: %s", exc)
 
     return sent
+
+
+def _open_smtp() -> smtplib.SMTP:
+    server = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=10)
+    server.ehlo()
+    server.starttls()
+    server.login(SMTP_USER, SMTP_PASS)
+    return server
+
+
+_REMINDER_LABELS = {
+    "application_deadline": "Last date to apply",
+    "exam_date":            "Exam date",
+}
+
+
+def _build_reminder_html(name: str, items: list[dict]) -> str:
+    rows = "\n".join(
+        f"""      <div class="exam-card">
+        <h2>{item.get("exam_name", "Exam")}</h2>
+        <div class="info-row"><span class="label">Organization:</span> {item.get("organization", "")}</div>
+        <div class="info-row"><span class="label">{_REMINDER_LABELS.get(item.get("kind"), "Date")}:</span> <strong style="color:#dc2626">{item.get("target_date", "")}</strong></div>
+        <a href="{item.get("official_website") or "#"}" class="cta" target="_blank">Open Official Website →</a>
+      </div>"""
+        for item in items
+    )
+    return f"""
+<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="UTF-8" />
+  <meta name="viewport" content="width=device-width, initial-scale=1.0" />
+  <style>
+    body {{ font-family: Arial, sans-serif; background: #f4f4f4; margin: 0; padding: 0; }}
+    .container {{ max-width: 600px; margin: 32px auto; background: #fff; border-radius: 12px; overflow: hidden; box-shadow: 0 4px 24px rgba(0,0,0,.08); }}
+    .header {{ background: linear-gradient(135deg,#ea580c,#dc2626); color: #fff; padding: 32px 24px; text-align: center; }}
+    .header h1 {{ margin: 0; font-size: 22px; }}
+    .body {{ padding: 28px 24px; }}
+    .exam-card {{ background: #fff7ed; border: 1px solid #fed7aa; border-radius: 10px; padding: 20px; margin-bottom: 20px; }}
+    .exam-card h2 {{ margin: 0 0 8px; color: #1c1917; font-size: 18px; }}
+    .info-row {{ display: flex; gap: 8px; margin-top: 10px; font-size: 14px; color: #57534e; }}
+    .label {{ font-weight: 700; color: #44403c; min-width: 120px; }}
+    .cta {{ display: inline-block; background: #ea580c; color: #fff; text-decoration: none; padding: 10px 20px; border-radius: 8px; font-weight: 700; font-size: 14px; margin-top: 12px; }}
+    .footer {{ background: #f9fafb; padding: 16px 24px; text-align: center; font-size: 12px; color: #9ca3af; }}
+  </style>
+</head>
+<body>
+<div class="container">
+  <div class="header">
+    <h1>⏰ Upcoming Exam Dates</h1>
+  </div>
+  <div class="body">
+    <p style="color:#57534e;font-size:14px;line-height:1.6;">Hi {name}, these dates from your reminders are coming up soon:</p>
+{rows}
+  </div>
+  <div class="footer">
+    You receive this email because you set a reminder in the APC Competitive Exam Hub.<br>
+    © 2026 Association for Progressive Community
+  </div>
+</div>
+</body>
+</html>
+""".strip()
+
+
+def send_reminder_digests(digests: list[tuple[dict, list[dict]]]) -> list[dict]:
+    """
+    Send one reminder email per student over a single SMTP session.
+
+    `digests` is a list of (student, items) where student has email/full_name
+    and each item has exam_name, organization, kind, target_date, official_website.
+    Returns the items whose email was sent successfully.
+    """
+    if not SMTP_USER or not SMTP_PASS:
+        logger.warning("SMTP not configured — skipping reminder emails")
+        return []
+
+    delivered: list[dict] = []
+    try:
+        server = _open_smtp()
+
+        for student, items in digests:
+            to_email = (student.get("email") or "").strip()
+            if not to_email or not items:
+                continue
+            name = student.get("full_name") or "Student"
+            subject = (
+                f"⏰ Reminder: {items[0].get('exam_name', 'Exam')}"
+                if len(items) == 1 else f"⏰ {len(items)} exam dates coming up"
+            )
+            try:
+                msg = MIMEMultipart("alternative")
+                msg["Subject"] = subject
+                msg["From"]    = f"{FROM_NAME} <{FROM_EMAIL}>"
+                msg["To"]      = to_email
+                msg.attach(MIMEText(_build_reminder_html(name, items), "html"))
+                server.sendmail(FROM_EMAIL, to_email, msg.as_string())
+                delivered.extend(items)
+                metrics.EMAILS.inc("reminder", "sent")
+            except Exception as exc:
+                metrics.EMAILS.inc("reminder", "failed")
+                logger.warning("Failed to send reminder to %s: %s", to_email, exc)
+
+        server.quit()
+    except Exception as exc:
+        logger.error("SMTP connection failed: %s", exc)
+
+    return delivered
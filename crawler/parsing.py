@@ -0,0 +1,181 @@
+"""
+Page Parsing
+-------------
+The CPU-bound half of scraping — building the lxml tree of a page,
+flattening it to text and running dateutil over every date-looking string —
+as plain functions of the fetched bytes. Large pages are handed to a pool of
+PARSE_WORKERS processes, so the scraper threads keep fetching while pages
+are parsed on other cores (threads alone would share one core through the
+GIL). Workers only send back compact results: a detail page's dates and
+first PDF link, a listing page's (text, href) anchors. Pool workers are
+started from a forkserver, since the pool is created from a scraper thread.
+
+  offload(fn, content, ...)   run fn in the pool, inline for pages under
+                              PARSE_OFFLOAD_MIN_KB, with PARSE_WORKERS=0,
+                              or where no pool can be started (--isolate
+                              workers are daemonic and may not have children)
+
+BaseScraper keeps `_parse_date` / `_extract_dates_from_text` as thin
+wrappers for the hand-written scrapers.
+"""
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional, TypeVar
+
+from bs4 import BeautifulSoup
+
+from config import PARSE_OFFLOAD_MIN_KB, PARSE_WORKERS
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_START_KW = ("notification", "start date", "begin", "opening date", "apply from")
+_LAST_KW  = ("last date", "closing date", "end date", "final date", "last day")
+_EXAM_KW  = ("exam date", "examination date", "written test", "date of exam", "tentative date")
+
+_DATE_PAT = re.compile(
+    r"\b(\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{2,4}"
+    r"|\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.?\s+\d{4}"
+    r"|\d{4}[\/\-\.]\d{2}[\/\-\.]\d{2})\b",
+    re.IGNORECASE,
+)
+_PARENS = re.compile(r"\(.*?\)")
+_ORDINAL = re.compile(r"(\d+)(st|nd|rd|th)", re.IGNORECASE)
+
+
+# ── Text ─────────────────────────────────────────────────────────────────────
+def clean(text: str | None, max_len: int = 0) -> str:
+    if not text:
+        return ""
+    cleaned = " ".join(text.split())
+    if max_len and len(cleaned) > max_len:
+        cleaned = cleaned[:max_len].rsplit(" ", 1)[0] + "…"
+    return cleaned
+
+
+def absolute(base_url: str, href: str) -> str:
+    if href.startswith("http"):
+        return href
+    return base_url.rstrip("/") + "/" + href.lstrip("/")
+
+
+# ── Dates ────────────────────────────────────────────────────────────────────
+def parse_date(text: str | None) -> str | None:
+    """
+    Parse a messy date string → ISO 8601 'YYYY-MM-DD' or None.
+    Handles: "15 March 2026", "15/03/2026", "March 15, 2026", etc.
+    """
+    if not text:
+        return None
+    # Remove parenthetical notes e.g. "(till 11:59 PM)", ordinal suffixes: 15th → 15
+    text = _PARENS.sub("", text.strip()).strip()
+    text = _ORDINAL.sub(r"\1", text)
+    from dateutil import parser as dateparser
+    try:
+        parsed = dateparser.parse(text, dayfirst=True)
+        if parsed:
+            return parsed.date().isoformat()
+    except Exception:
+        pass
+    return None
+
+
+def extract_dates(text: str) -> dict:
+    """
+    Look for common date patterns inside a block of text.
+    Returns dict with keys: application_start_date, application_last_date, exam_date
+    """
+    result = {}
+    for line in text.splitlines():
+        dates = _DATE_PAT.findall(line)
+        if not dates:
+            continue
+        parsed_date = parse_date(dates[0])
+        if not parsed_date:
+            continue
+
+        low = line.lower()
+        if any(kw in low for kw in _LAST_KW):
+            result.setdefault("application_last_date", parsed_date)
+        elif any(kw in low for kw in _EXAM_KW):
+            result.setdefault("exam_date", parsed_date)
+        elif any(kw in low for kw in _START_KW):
+            result.setdefault("application_start_date", parsed_date)
+    return result
+
+
+# ── Pages ────────────────────────────────────────────────────────────────────
+def first_pdf(soup: BeautifulSoup, base_url: str) -> str | None:
+    """Absolute URL of the first PDF linked from `soup`, or None."""
+    for a in soup.find_all("a", href=True):
+        if a["href"].lower().endswith(".pdf"):
+            return absolute(base_url, a["href"])
+    return None
+
+
+def detail_summary(content: bytes, encoding: str | None, base_url: str, selector: str | None) -> dict:
+    """{"dates": {...}, "pdf_url": ...} of a detail page (dates within `selector` if it matches)."""
+    page = BeautifulSoup(content, "lxml", from_encoding=encoding)
+    scope = (page.select_one(selector) if selector else None) or page
+    return {
+        "dates": extract_dates(scope.get_text(separator="\n")),
+        "pdf_url": first_pdf(page, base_url),
+    }
+
+
+def listing_anchors(content: bytes, encoding: str | None, base_url: str) -> list[tuple[str, str]]:
+    """(cleaned link text, absolute href) of every anchor of a listing page, in page order."""
+    page = BeautifulSoup(content, "lxml", from_encoding=encoding)
+    return [
+        (clean(a.get_text(), 300), absolute(base_url, a["href"]))
+        for a in page.find_all("a", href=True)
+    ]
+
+
+# ── Pool ─────────────────────────────────────────────────────────────────────
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_parse_pool() -> Optional[ProcessPoolExecutor]:
+    """The process-wide parse pool, or None when parsing runs inline."""
+    global _pool
+    if PARSE_WORKERS <= 0 or multiprocessing.current_process().daemon:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            # Started lazily from a scraper thread: fork() would copy the
+            # parent's locks mid-use, a forkserver child starts clean
+            ctx = multiprocessing.get_context("forkserver")
+            ctx.set_forkserver_preload(["parsing"])
+            _pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS, mp_context=ctx)
+    return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def offload(fn: Callable[..., T], content: bytes, *args) -> T:
+    """fn(content, *args), in the parse pool when the page is large enough to be worth it."""
+    pool = get_parse_pool() if len(content) >= PARSE_OFFLOAD_MIN_KB * 1024 else None
+    if pool is None:
+        return fn(content, *args)
+    try:
+        return pool.submit(fn, content, *args).result()
+    except BrokenProcessPool as exc:
+        # A worker died (OOM-killed, …): start a fresh pool next time
+        logger.warning("Parse pool broken (%s) — parsing inline.", exc)
+        _discard_pool(pool)
+        return fn(content, *args)
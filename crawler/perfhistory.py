@@ -0,0 +1,174 @@
+"""
+Scraper Performance History
+----------------------------
+Keeps one row per scraper per run (SQLite at STATE_DIR/perf.sqlite3): wall
+time, HTTP requests, bytes downloaded, exams found, errors and truncated
+detail pages. At the end of a run every scraper that ran is compared with
+its own history over the last PERF_WINDOW_DAYS, so slow decay and sources
+that quietly stopped yielding show up:
+
+  slowdown   fetch time ≥ PERF_SLOWDOWN_FACTOR × the median
+  yield      exams found ≤ PERF_YIELD_DROP × the median (0 when it used to
+             find some)
+
+A deviation is only reported when it is also significant against the
+spread of the history — more than 3 robust standard deviations (1.4826 ×
+MAD) from the median — and there are at least PERF_MIN_SAMPLES clean past
+runs (no errors, not cut short by a time budget). Verdicts are logged and
+sent in the webhook stats as "perf_regressions".
+"""
+from __future__ import annotations
+
+import logging
+import sqlite3
+import statistics
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from config import (
+    PERF_HISTORY_ENABLED,
+    PERF_MIN_SAMPLES,
+    PERF_SLOWDOWN_FACTOR,
+    PERF_WINDOW_DAYS,
+    PERF_YIELD_DROP,
+    STATE_DIR,
+)
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scraper_runs (
+    run_id      TEXT NOT NULL,
+    scraper     TEXT NOT NULL,
+    started_at  REAL NOT NULL,
+    duration_ms INTEGER NOT NULL,
+    requests    INTEGER NOT NULL,
+    bytes       INTEGER NOT NULL,
+    exams       INTEGER NOT NULL,
+    errors      INTEGER NOT NULL,
+    truncated   INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scraper_runs_by_scraper ON scraper_runs (scraper, started_at);
+"""
+
+_KEEP_DAYS = 90            # rows older than this are dropped
+_MIN_SLOWDOWN_MS = 10_000  # ignore slowdowns smaller than this (cache hits make short runs noisy)
+_Z = 3.0
+
+
+def _robust_z(value: float, values: list[float]) -> tuple[float, float]:
+    """(median, robust z-score of `value`); z is inf when the history has no spread."""
+    median = statistics.median(values)
+    mad = statistics.median(abs(v - median) for v in values)
+    if mad == 0:
+        return median, (0.0 if value == median else float("inf") * (1 if value > median else -1))
+    return median, (value - median) / (1.4826 * mad)
+
+
+class PerfHistory:
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+
+    def record(self, run_id: str, sample: dict) -> None:
+        with self._lock:
+            self._db.execute(
+                """
+                INSERT INTO scraper_runs
+                    (run_id, scraper, started_at, duration_ms, requests, bytes, exams, errors, truncated)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    run_id, sample["scraper"], sample["started_at"], sample["duration_ms"],
+                    sample["requests"], sample["bytes"], sample["exams"], sample["errors"], sample["truncated"],
+                ),
+            )
+            self._db.execute("DELETE FROM scraper_runs WHERE started_at < ?", (time.time() - _KEEP_DAYS * 86400,))
+
+    def baseline(self, scraper: str, before: float, days: float = PERF_WINDOW_DAYS) -> list[tuple[int, int]]:
+        """(duration_ms, exams) of the scraper's clean runs in the `days` before `before`."""
+        with self._lock:
+            return self._db.execute(
+                """
+                SELECT duration_ms, exams FROM scraper_runs
+                WHERE scraper = ? AND started_at >= ? AND started_at < ?
+                  AND errors = 0 AND truncated = 0
+                """,
+                (scraper, before - days * 86400, before),
+            ).fetchall()
+
+    def check(self, sample: dict) -> list[dict]:
+        """Regressions of `sample` against the scraper's history (see module docstring)."""
+        history = self.baseline(sample["scraper"], sample["started_at"])
+        if len(history) < PERF_MIN_SAMPLES:
+            return []
+        name, days = sample["scraper"], f"{PERF_WINDOW_DAYS:g}-day"
+        verdicts = []
+
+        duration = sample["duration_ms"]
+        median, z = _robust_z(duration, [d for d, _ in history])
+        if (
+            median > 0 and duration >= PERF_SLOWDOWN_FACTOR * median
+            and duration - median >= _MIN_SLOWDOWN_MS and z >= _Z
+        ):
+            verdicts.append({
+                "scraper": name, "metric": "duration_ms", "value": duration, "median": median,
+                "message": f"{name} fetch time {duration / median:.1f}× the {days} median "
+                           f"({duration / 1000:.0f}s vs {median / 1000:.0f}s)",
+            })
+
+        # A run cut short by its budget found fewer exams for a known reason
+        exams = sample["exams"]
+        median, z = _robust_z(exams, [e for _, e in history])
+        if not sample["truncated"] and median > 0 and exams <= PERF_YIELD_DROP * median and z <= -_Z:
+            verdicts.append({
+                "scraper": name, "metric": "exams", "value": exams, "median": median,
+                "message": f"{name} found {exams} exam(s), {days} median {median:g}",
+            })
+        return verdicts
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+_history: Optional[PerfHistory] = None
+_history_lock = threading.Lock()
+
+
+def get_perf_history() -> Optional[PerfHistory]:
+    """The process-wide history, or None when PERF_HISTORY_ENABLED is off or it cannot open."""
+    global _history
+    if not PERF_HISTORY_ENABLED:
+        return None
+    with _history_lock:
+        if _history is None:
+            try:
+                _history = PerfHistory(STATE_DIR / "perf.sqlite3")
+            except sqlite3.Error as exc:
+                logger.warning("Performance history unavailable (%s) — not recording.", exc)
+                return None
+    return _history
+
+
+def check_run(run_id: str, samples: list[dict]) -> list[dict]:
+    """Compare each scraper's sample with its history, then add it. Returns the regressions."""
+    history = get_perf_history()
+    if history is None:
+        return []
+    regressions = []
+    try:
+        for sample in samples:
+            regressions.extend(history.check(sample))
+            history.record(run_id, sample)
+    except sqlite3.Error as exc:
+        logger.warning("Performance history failed: %s", exc)
+    for verdict in regressions:
+        logger.warning("Performance regression: %s", verdict["message"])
+    return regressions
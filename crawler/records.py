@@ -0,0 +1,167 @@
+"""
+Exam Records
+-------------
+Compact in-memory exam type built by `BaseScraper._make_exam`.
+
+The long per-commission strings (eligibility, fees, selection process, …)
+are identical for most exams of a scraper, so they live in an `ExamMeta`
+that is interned: every exam with the same metadata shares one instance
+(and one copy of each string). An `ExamRecord` only holds what differs per
+exam. Records use __slots__ and behave like the old exam dicts for reading
+(`exam["exam_name"]`, `exam.get("state")`), and are turned into plain dicts
+only at the boundaries — the database write, the webhook payload and the
+JSON state files (`to_jsonable` as `json.dumps(default=...)`).
+
+See benchmarks/memory.py for the footprint at 10k+ exams.
+"""
+from __future__ import annotations
+
+import sys
+import threading
+from dataclasses import dataclass, fields, replace
+from datetime import date
+from typing import Any, Iterator
+
+_META_FIELDS = (
+    "organization",
+    "level",
+    "state",
+    "eligibility",
+    "qualification",
+    "age_limit",
+    "application_fee",
+    "selection_process",
+)
+
+# Column order of the exams table (and of the old exam dicts)
+EXAM_FIELDS = (
+    "exam_name",
+    "organization",
+    "level",
+    "state",
+    "description",
+    "eligibility",
+    "qualification",
+    "age_limit",
+    "application_start_date",
+    "application_last_date",
+    "exam_date",
+    "official_website",
+    "notification_pdf",
+    "application_fee",
+    "selection_process",
+    "status",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class ExamMeta:
+    organization: str
+    level: str
+    state: str | None
+    eligibility: str
+    qualification: str
+    age_limit: str
+    application_fee: str
+    selection_process: str
+
+    # Not fields (no annotations): the class-wide intern table
+    _pool = {}
+    _pool_lock = threading.Lock()
+
+    @classmethod
+    def intern(cls, **values) -> "ExamMeta":
+        """The shared instance for these values (created on first use)."""
+        key = tuple(values.get(f) for f in _META_FIELDS)
+        meta = cls._pool.get(key)
+        if meta is None:
+            with cls._pool_lock:
+                meta = cls._pool.setdefault(
+                    key, cls(*(sys.intern(v) if isinstance(v, str) else v for v in key))
+                )
+        return meta
+
+    def __reduce__(self):
+        # Unpickled copies (e.g. from --isolate workers) rejoin the intern table
+        return (_intern_values, (tuple(getattr(self, f) for f in _META_FIELDS),))
+
+
+def _intern_values(values: tuple) -> ExamMeta:
+    return ExamMeta.intern(**dict(zip(_META_FIELDS, values)))
+
+
+@dataclass(slots=True)
+class ExamRecord:
+    exam_name: str
+    meta: ExamMeta
+    description: str = ""
+    official_website: str = ""
+    application_start_date: str | None = None
+    application_last_date: str | None = None
+    exam_date: str | None = None
+    notification_pdf: str | None = None
+    status: str | None = None
+
+    # ── Mapping-style access (drop-in for the old exam dicts) ────────────────
+    def __getitem__(self, key: str) -> Any:
+        if key in _META_FIELDS:
+            return getattr(self.meta, key)
+        if key in _OWN_FIELDS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in _META_FIELDS:
+            values = {f: getattr(self.meta, f) for f in _META_FIELDS}
+            values[key] = value
+            self.meta = ExamMeta.intern(**values)
+        elif key in _OWN_FIELDS:
+            setattr(self, key, value)
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in EXAM_FIELDS
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self) -> tuple[str, ...]:
+        return EXAM_FIELDS
+
+    def items(self) -> Iterator[tuple[str, Any]]:
+        return ((k, self[k]) for k in EXAM_FIELDS)
+
+    def copy(self) -> "ExamRecord":
+        return replace(self)
+
+    # ── Boundaries ───────────────────────────────────────────────────────────
+    def to_dict(self) -> dict:
+        return {k: self[k] for k in EXAM_FIELDS}
+
+
+_OWN_FIELDS = frozenset(f.name for f in fields(ExamRecord)) - {"meta"}
+
+
+def make_record(**values) -> ExamRecord:
+    """Build a record from exam-dict style keyword arguments."""
+    meta = ExamMeta.intern(**{f: values.get(f) for f in _META_FIELDS})
+    return ExamRecord(meta=meta, **{k: v for k, v in values.items() if k in _OWN_FIELDS})
+
+
+def to_jsonable(obj: Any) -> Any:
+    """`json.dumps(default=...)` hook for records, dates and sets.
+
+    Anything else raises TypeError, as json.dumps does without a hook,
+    rather than being written out as its str().
+    """
+    if isinstance(obj, ExamRecord):
+        return obj.to_dict()
+    if isinstance(obj, date):  # datetime too
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -0,0 +1,82 @@
+"""
+Reminder Dispatcher
+--------------------
+Sends deadline / exam-date reminders for rows in exam_reminders
+(`python main.py --reminders`).
+
+Due reminders are read with one bulk join per page (due_exam_reminders(),
+keyset-paged by student), grouped into one digest email per student, sent
+over a single SMTP session per page and recorded in
+exam_reminder_deliveries so they are never sent twice.
+"""
+from __future__ import annotations
+
+import logging
+from itertools import groupby
+
+from config import REMINDER_WINDOW_DAYS, REMINDER_BATCH_SIZE
+from database import get_due_reminders, record_reminder_deliveries
+from notifier import send_reminder_digests
+
+logger = logging.getLogger(__name__)
+
+
+def dispatch_reminders(
+    window_days: int = REMINDER_WINDOW_DAYS,
+    batch_size: int = REMINDER_BATCH_SIZE,
+    dry_run: bool = False,
+) -> dict:
+    """
+    Send every due, unsent reminder. Returns counters:
+      due      → reminder rows found
+      students → digests built
+      sent     → reminder rows delivered (and recorded)
+    """
+    totals = {"due": 0, "students": 0, "sent": 0}
+    after: str | None = None
+
+    while True:
+        rows = get_due_reminders(window_days, batch_size, after)
+        if not rows:
+            break
+
+        # A full page may end part-way through a student's reminders; leave
+        # that student for the next page so each student gets one digest.
+        # If the student fills the whole page, read all of theirs instead —
+        # paging past them would leave the rest for a second digest.
+        if len(rows) == batch_size:
+            last = rows[-1]["student_id"]
+            if rows[0]["student_id"] != last:
+                rows = [r for r in rows if r["student_id"] != last]
+            else:
+                rows = get_due_reminders(window_days, None, student=last)
+
+        digests = [
+            (items[0], items)
+            for items in (list(g) for _, g in groupby(rows, key=lambda r: r["student_id"]))
+        ]
+        totals["due"] += len(rows)
+        totals["students"] += len(digests)
+
+        if dry_run:
+            for student, items in digests:
+                logger.info("[DRY-RUN] Would remind %s of %d date(s)", student.get("email"), len(items))
+        else:
+            delivered = send_reminder_digests(digests)
+            try:
+                totals["sent"] += record_reminder_deliveries(delivered)
+            except Exception as exc:
+                # Sent but not recorded — these would be sent again next run.
+                logger.error("Could not record %d reminder delivery(ies): %s", len(delivered), exc)
+
+        after = rows[-1]["student_id"]
+        logger.info(
+            "Reminders page: %d row(s), %d student(s) — total sent=%d",
+            len(rows), len(digests), totals["sent"],
+        )
+
+    logger.info(
+        "━━━ REMINDERS DONE ━━━  due=%d  students=%d  sent=%d",
+        totals["due"], totals["students"], totals["sent"],
+    )
+    return totals
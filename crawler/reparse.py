@@ -0,0 +1,248 @@
+"""
+Offline Re-parse
+-----------------
+`python main.py --reparse DIR` runs the scrapers' parsing code (listing
+pages, detail pages, Selenium pages) over saved pages instead of the live
+sites — no network, no delays, no frontier or checkpoint shortcuts — to
+check a parser fix or backfill exams from history.
+
+DIR can be:
+
+  - the page archive (STATE_DIR/archive, see archive.py): every run
+    manifest is a snapshot, re-parsed oldest first
+  - one manifest file (archive/manifests/<run_id>.jsonl)
+  - a plain directory of saved pages in `wget -x` layout:
+    DIR/<host>/<path>, with `index.html` for directory URLs
+
+Each (snapshot, scraper) pair is one task for a process pool (started from
+a forkserver, as the parent already runs its log and metrics threads);
+pages are read through mmap (archive blobs are decompressed straight from
+the map).
+A page that is not in the snapshot behaves like a 404.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import mmap
+import multiprocessing
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator
+from urllib.parse import unquote, urldefrag, urlparse
+
+import requests
+
+from logsetup import setup_child_logging
+
+logger = logging.getLogger("crawler.reparse")
+
+
+# ── Page sources ─────────────────────────────────────────────────────────────
+def _read(path: Path) -> bytes:
+    """File contents through a read-only mmap (archive blobs decompressed from it)."""
+    with open(path, "rb") as fh:
+        if os.fstat(fh.fileno()).st_size == 0:
+            return b""
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if path.suffix == ".gz":
+                return zlib.decompress(mm, 16 + zlib.MAX_WBITS)
+            if path.suffix == ".zst":
+                from archive import _decompress
+                return _decompress(mm, ".zst")
+            return mm[:]
+
+
+class _History:
+    """Every archived fetch of every URL, across all manifests (loaded once per process)."""
+
+    def __init__(self, manifests: list[Path]):
+        self.order = {path: i for i, path in enumerate(manifests)}
+        self.fetches: dict[str, list[tuple[int, str, str | None]]] = {}
+        for i, path in enumerate(manifests):
+            for entry in _entries(path):
+                if (entry.get("status") or 200) < 400:
+                    self.fetches.setdefault(_normalise(entry["url"]), []).append(
+                        (i, entry["sha256"], entry.get("content_type"))
+                    )
+
+    def latest(self, url: str, manifest: Path) -> tuple[str, str | None] | None:
+        """The most recent fetch of `url` up to and including `manifest`'s run."""
+        limit = self.order.get(manifest, -1)
+        found = None
+        for i, sha, content_type in self.fetches.get(url, ()):
+            if i > limit:
+                break
+            found = (sha, content_type)
+        return found
+
+
+_histories: dict[Path, _History] = {}
+
+
+def _history(root: Path) -> _History:
+    if root not in _histories:
+        _histories[root] = _History(_manifests(root))
+    return _histories[root]
+
+
+class OfflinePages:
+    """Serves saved pages to a scraper in place of the network (see BaseScraper)."""
+
+    def __init__(self, root: Path, manifest: Path | None = None):
+        """
+        `manifest` is the snapshot's run. Pages that run did not fetch itself
+        (served from the frontier at the time) come from the most recent
+        earlier run that did.
+        """
+        self.root = root
+        self.manifest = manifest
+        self._index: dict[str, tuple[str, str | None]] = {}   # url → (sha256, content type)
+        self.scrapers: set[str] = set()                       # scraper names in the snapshot's run
+        if manifest is not None:
+            for entry in _entries(manifest):
+                self.scrapers.add((entry.get("scraper") or "").lower())
+                if (entry.get("status") or 200) < 400:
+                    # Later fetches of a URL in the run win
+                    self._index[_normalise(entry["url"])] = (entry["sha256"], entry.get("content_type"))
+
+    def _lookup(self, url: str) -> tuple[str, str | None] | None:
+        url = _normalise(url)
+        return self._index.get(url) or _history(self.root).latest(url, self.manifest)
+
+    def _path(self, url: str) -> Path | None:
+        if self.manifest is not None:
+            found = self._lookup(url)
+            if found is None:
+                return None
+            for suffix in (".zst", ".gz"):
+                path = self.root / "blobs" / found[0][:2] / (found[0] + suffix)
+                if path.exists():
+                    return path
+            return None
+
+        parsed = urlparse(_normalise(url))
+        rel = unquote(parsed.path).lstrip("/")
+        if not rel or rel.endswith("/"):
+            rel += "index.html"
+        if parsed.query:
+            rel += "?" + parsed.query
+        for candidate in (rel, rel + ".html", rel.rstrip("/") + "/index.html"):
+            path = self.root / parsed.netloc / candidate
+            if path.is_file():
+                return path
+        return None
+
+    def response(self, url: str) -> requests.Response:
+        """The saved page as a Response; raises HTTPError (404) when it was not saved."""
+        resp = requests.Response()
+        resp.url = url
+        path = self._path(url)
+        if path is None:
+            resp.status_code = 404
+            resp.reason = "Not in snapshot"
+            raise requests.HTTPError(f"404 Not in snapshot: {url}", response=resp)
+        resp.status_code = 200
+        resp._content = _read(path)
+        content_type = self._lookup(url)[1] if self.manifest is not None else None
+        if content_type:
+            resp.headers["Content-Type"] = content_type
+            resp.encoding = requests.utils.get_encoding_from_headers(resp.headers)
+        else:
+            resp.encoding = "utf-8"   # wget keeps the original bytes; most sites here are UTF-8
+        return resp
+
+    def covers(self, scraper_cls) -> bool:
+        """Whether this snapshot holds any pages of `scraper_cls`."""
+        if self.manifest is not None:
+            return scraper_cls.NAME.lower() in self.scrapers
+        return (self.root / urlparse(scraper_cls.BASE_URL).netloc).is_dir()
+
+
+def _normalise(url: str) -> str:
+    return urldefrag(url)[0]
+
+
+def _entries(manifest: Path) -> Iterator[dict]:
+    try:
+        with manifest.open(encoding="utf-8") as fh:
+            for line in fh:
+                if line.strip():
+                    yield json.loads(line)
+    except OSError:
+        return   # pruned meanwhile
+
+
+def _manifests(root: Path) -> list[Path]:
+    return sorted((root / "manifests").glob("*.jsonl"), key=lambda p: (p.stat().st_mtime, p.name))
+
+
+def _snapshots(directory: Path) -> list[tuple[Path, Path | None]]:
+    """(root, manifest) per snapshot in DIR, oldest first; manifest None for a plain directory."""
+    if directory.is_file() and directory.suffix == ".jsonl":
+        return [(directory.parent.parent, directory)]
+    if not (directory / "manifests").is_dir():
+        return [(directory, None)]
+    return [(directory, m) for m in _manifests(directory)]
+
+
+# ── Pool task ────────────────────────────────────────────────────────────────
+def _reparse_one(task: tuple[str, Path, Path | None]) -> tuple[str, str, list, str | None]:
+    """Run scraper `name` over one snapshot. Returns (name, snapshot, exams, error)."""
+    from scrapers import get_scraper
+
+    name, root, manifest = task
+    pages = OfflinePages(root, manifest)
+    scraper = get_scraper(name)()
+    scraper.offline = pages
+    label = manifest.stem if manifest else str(root)
+    try:
+        return name, label, scraper.fetch(), None
+    except Exception as exc:
+        return name, label, [], f"{exc.__class__.__name__}: {exc}"
+    finally:
+        scraper.close()
+
+
+def reparse(
+    directory: str | Path,
+    names: list[str],
+    workers: int | None = None,
+) -> Iterator[tuple[str, list, str | None]]:
+    """
+    Re-parse every snapshot in `directory` with scrapers `names`.
+    Yields (scraper name, exams, error) per snapshot and scraper, oldest
+    snapshot first, so newer pages win when the results are upserted in
+    order. `error` is None unless the scraper failed on that snapshot.
+    """
+    from scrapers import get_scraper
+
+    directory = Path(directory).resolve()
+    if not directory.exists():
+        raise FileNotFoundError(directory)
+
+    tasks = []
+    for root, manifest in _snapshots(directory):
+        pages = OfflinePages(root, manifest)
+        for name in names:
+            if pages.covers(get_scraper(name)):
+                tasks.append((name, root, manifest))
+    logger.info("Re-parsing %d snapshot/scraper pair(s) from %s", len(tasks), directory)
+    if not tasks:
+        return
+
+    ctx = multiprocessing.get_context("forkserver")
+    ctx.set_forkserver_preload(["scrapers.base"])
+    pool = ProcessPoolExecutor(
+        max_workers=workers, mp_context=ctx,
+        initializer=setup_child_logging, initargs=(logging.getLogger().level,),
+    )
+    with pool:
+        for name, label, exams, error in pool.map(_reparse_one, tasks, chunksize=1):
+            if error:
+                error = f"re-parse of {label} failed: {error}"
+            else:
+                logger.debug("%s: %d exam(s) from %s", name, len(exams), label)
+            yield name, exams, error
@@ -0,0 +1,182 @@
+"""
+Exam Entity Resolution
+-----------------------
+Recognises a scraped exam as an exam already in the table even when its
+title differs, e.g. "UPSC Engineering Services Examination 2026" and
+"Engineering Services (Preliminary) Examination, 2026", so it updates that
+row instead of adding a near-duplicate (and mailing students about it
+again).
+
+  - titles are normalised to keys: lower-case, punctuation and filler words
+    ("examination", "recruitment", "notice", …) and the organization's own
+    name / acronym dropped
+  - exams are only compared within their organization, and only with the
+    candidates that share the most blocking keys (title tokens and
+    character trigrams) — keys shared by more than RESOLVE_BLOCK_CAP exams
+    are too common to narrow anything down and are ignored — so resolving
+    stays near linear in the number of exams
+  - a candidate matches when 0.5 × token Dice + 0.5 × trigram Dice
+    reaches RESOLVE_THRESHOLD, and both titles carry the same
+    discriminators — numbers (years, advertisement numbers), roman
+    numerals and single letters: "… 2025" never merges with "… 2026",
+    "Tier I" with "Tier II" or "Grade C" with "Grade D" ("Tier II" and
+    "Tier 2" are the same)
+  - a title that is already indexed exactly (case-insensitively) is never
+    resolved to another row
+
+The index is built from one bulk read of (id, exam_name, organization) and
+grows with every exam inserted during the run.
+"""
+from __future__ import annotations
+
+import logging
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from datetime import date
+from typing import Optional
+
+from config import RESOLVE_BLOCK_CAP, RESOLVE_THRESHOLD
+from database import get_exam_keys
+
+logger = logging.getLogger(__name__)
+
+_FILLER = frozenset({
+    "a", "an", "and", "the", "of", "for", "in", "to", "on", "by",
+    "exam", "exams", "examination", "examinations", "recruitment", "notice",
+    "notification", "advertisement", "advt", "no", "detailed", "official",
+})
+_WORD = re.compile(r"[a-z0-9]+")
+_NUMBER = re.compile(r"\d+")
+_ROMAN = {"i": 1, "v": 5, "x": 10}
+_ROMAN_NUMERAL = re.compile(r"x{0,3}(?:ix|iv|v?i{0,3})")
+
+_CANDIDATES = 25   # best-blocked candidates scored per lookup
+
+
+def _roman(word: str) -> int:
+    values = [_ROMAN[c] for c in word]
+    return sum(-v if v < n else v for v, n in zip(values, values[1:] + [0]))
+
+
+def _discriminators(words: list[str]) -> frozenset[str]:
+    """Numbers ("70th" → "70", "ii" → "2") and single letters among a title's words."""
+    found = set()
+    for word in words:
+        if _ROMAN_NUMERAL.fullmatch(word):
+            found.add(str(_roman(word)))
+        elif len(word) == 1 and word.isalpha():
+            found.add(word)
+        else:
+            found.update(str(int(n)) for n in _NUMBER.findall(word))
+    return frozenset(found)
+
+
+def _fold(text: str | None) -> str:
+    text = unicodedata.normalize("NFKD", text or "")
+    return "".join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+def org_key(organization: str | None) -> str:
+    """The organization without its "(ABBR)" suffix, folded and collapsed."""
+    return " ".join(_WORD.findall(re.sub(r"\(.*?\)", " ", _fold(organization))))
+
+
+def _org_words(organization: str | None) -> frozenset[str]:
+    """Words naming the organization in a title: its words, acronym and "(ABBR)"."""
+    folded = _fold(organization)
+    words = set(_WORD.findall(folded))
+    full = _WORD.findall(re.sub(r"\(.*?\)", " ", folded))
+    if len(full) > 1:
+        words.add("".join(w[0] for w in full))
+    return frozenset(words)
+
+
+class TitleKey:
+    __slots__ = ("tokens", "trigrams", "numbers")
+
+    def __init__(self, title: str | None, organization: str | None = None):
+        skip = _FILLER | _org_words(organization)
+        words = [w for w in _WORD.findall(_fold(title)) if w not in skip]
+        self.tokens = frozenset(words)
+        self.numbers = _discriminators(words)
+        text = " ".join(words)
+        self.trigrams = frozenset(text[i:i + 3] for i in range(len(text) - 2))
+
+    def blocking_keys(self) -> set[str]:
+        return set(self.tokens) | {"#" + t for t in self.trigrams}
+
+    def similarity(self, other: "TitleKey") -> float:
+        if self.numbers != other.numbers or not self.tokens or not other.tokens:
+            return 0.0
+        overlap = 2 * len(self.tokens & other.tokens) / (len(self.tokens) + len(other.tokens))
+        grams = len(self.trigrams) + len(other.trigrams)
+        dice = 2 * len(self.trigrams & other.trigrams) / grams if grams else 0.0
+        return 0.5 * overlap + 0.5 * dice
+
+
+class ExamResolver:
+    def __init__(self, threshold: float = RESOLVE_THRESHOLD, block_cap: int = RESOLVE_BLOCK_CAP):
+        self.threshold = threshold
+        self.block_cap = block_cap
+        self._keys: dict[str, TitleKey] = {}                    # exam id → key
+        self._names: dict[str, str] = {}                        # exam id → stored exam_name
+        self._titles: set[tuple[str, str]] = set()              # (org key, lower-cased exam_name)
+        self._blocks: dict[str, dict[str, set[str]]] = defaultdict(lambda: defaultdict(set))
+        self.loaded_on: Optional[date] = None
+        self.merged = 0
+
+    def load(self) -> "ExamResolver":
+        """(Re)build the index from one bulk read of the exams table."""
+        self._keys.clear()
+        self._names.clear()
+        self._titles.clear()
+        self._blocks.clear()
+        for row in get_exam_keys():
+            self.add(row["id"], row.get("exam_name"), row.get("organization"))
+        self.loaded_on = date.today()
+        logger.info("Entity resolver: %d exam(s) indexed", len(self._keys))
+        return self
+
+    def add(self, exam_id: str, exam_name: str | None, organization: str | None) -> None:
+        key = TitleKey(exam_name, organization)
+        self._keys[exam_id] = key
+        self._names[exam_id] = exam_name or ""
+        org = org_key(organization)
+        self._titles.add((org, (exam_name or "").lower()))
+        block = self._blocks[org]
+        for k in key.blocking_keys():
+            block[k].add(exam_id)
+
+    def resolve(self, exam_name: str | None, organization: str | None) -> Optional[tuple[str, str]]:
+        """
+        (id, stored exam_name) of the indexed exam this title refers to, or
+        None when it is new. An exact (case-insensitive) title never needs
+        resolving; it is left to the normal lookup.
+        """
+        org = org_key(organization)
+        if (org, (exam_name or "").lower()) in self._titles:
+            return None
+        key = TitleKey(exam_name, organization)
+        block = self._blocks.get(org)
+        if not block or not key.tokens:
+            return None
+
+        shared: Counter[str] = Counter()
+        for k in key.blocking_keys():
+            ids = block.get(k)
+            if ids and len(ids) <= self.block_cap:
+                shared.update(ids)
+
+        best_id, best = None, self.threshold
+        for exam_id, _ in shared.most_common(_CANDIDATES):
+            score = key.similarity(self._keys[exam_id])
+            if score >= best:
+                best_id, best = exam_id, score
+        if best_id is None:
+            return None
+        self.merged += 1
+        logger.info(
+            "Resolved %r → existing %r (score %.2f)", exam_name, self._names[best_id], best,
+        )
+        return best_id, self._names[best_id]
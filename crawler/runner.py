@@ -0,0 +1,370 @@
+"""
+Crawl Run
+----------
+One crawler run: runs scrapers, upserts their exams, notifies students about
+new ones and pushes the run's delta to the webhook.
+
+Shared by the one-shot CLI (`main.py`), the long-running daemon
+(`main.py --daemon`), which keeps scraper instances warm between runs, and
+the sharded coordinator (`main.py --coordinator`), which feeds it exams
+fetched by queue workers.
+"""
+from __future__ import annotations
+
+import contextvars
+import logging
+import queue
+import threading
+import time
+import traceback
+import uuid
+from datetime import date
+from typing import Iterable, Iterator
+
+from budget import Budget, scraper_budget
+from checkpoint import Checkpoint
+from config import RESOLVE_ENABLED, STREAM_QUEUE_SIZE
+from database import upsert_exam, get_all_student_emails
+from logsetup import log_context
+import metrics
+from notifier import send_new_exam_notification
+from perfhistory import check_run
+from resolver import ExamResolver
+from sinks import ExamSink
+from targeting import StudentIndex
+from transitions import StatusTransitions
+from webhook import push_results
+
+logger = logging.getLogger("crawler.run")
+
+_END = object()
+
+
+class _Raised:
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+
+def stream(source: Iterable, maxsize: int = STREAM_QUEUE_SIZE, name: str = "") -> Iterator:
+    """
+    Iterate `source` on a producer thread through a bounded queue, so the
+    consumer works while the producer waits on the network, and at most
+    `maxsize` items are in flight. Errors in the producer are re-raised here.
+    The queue depth is exported per `name` (see metrics.py).
+    """
+    q: queue.Queue = queue.Queue(maxsize)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.5)
+                metrics.QUEUE_DEPTH.set(q.qsize(), name)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in source:
+                if not put(item):
+                    return
+            put(_END)
+        except BaseException as exc:
+            put(_Raised(exc))
+
+    # The producer logs with the consumer's run_id / scraper (see logsetup.py)
+    producer = threading.Thread(
+        target=contextvars.copy_context().run, args=(produce,), name="scraper-stream", daemon=True,
+    )
+    producer.start()
+    try:
+        while True:
+            item = q.get()
+            metrics.QUEUE_DEPTH.set(q.qsize(), name)
+            if item is _END:
+                return
+            if isinstance(item, _Raised):
+                raise item.exc
+            yield item
+    finally:
+        stop.set()    # consumer gone early → let the producer exit
+        metrics.QUEUE_DEPTH.set(0, name)
+
+
+class Recipients:
+    """Who gets mailed about a new exam — the interest index or everyone."""
+
+    def __init__(self, notify_all: bool = False):
+        self.notify_all = notify_all
+        self.students: list[dict] = []
+        self.index: StudentIndex | None = None
+
+    def load(self) -> "Recipients":
+        try:
+            if self.notify_all:
+                self.students = get_all_student_emails()
+                logger.info("Loaded %d student email(s) for notification.", len(self.students))
+            else:
+                self.index = StudentIndex.load()
+        except Exception as exc:
+            logger.error("Could not load students for notification — none will be mailed: %s", exc)
+        return self
+
+    def for_exam(self, exam: dict) -> list[dict]:
+        return self.index.match(exam) if self.index else self.students
+
+
+def _new_stats() -> dict:
+    """Per-scraper counters returned by run_scraper."""
+    return {"scraped": 0, "new": 0, "updated": 0, "errors": 0, "truncated": 0}
+
+
+class CrawlRun:
+    def __init__(
+        self,
+        dry_run: bool = False,
+        recipients: Recipients | None = None,
+        run_id: str | None = None,
+        checkpoint: Checkpoint | None = None,
+        deadline: Budget | None = None,
+        resolver: ExamResolver | None = None,
+        sink: ExamSink | None = None,
+    ):
+        self.run_id = checkpoint.run_id if checkpoint else (run_id or str(uuid.uuid4()))
+        self.dry_run = dry_run
+        self.recipients = recipients          # None → no notifications
+        self.checkpoint = checkpoint
+        self.deadline = deadline or Budget()   # the whole run's time limit (none by default)
+        self.totals = {
+            "scraped": 0, "new": 0, "updated": 0, "unchanged": 0, "errors": 0, "notified": 0,
+            "truncated": 0,   # detail pages skipped because a time budget ran out
+            "skipped": 0,     # scrapers not started before the run deadline
+        }
+        self.changed_exams: list[dict] = []   # inserted/changed this run — the webhook delta
+        self.status_changes: dict | None = None   # set by update_statuses()
+        self.perf_samples: list[dict] = []     # per scraper run: time, requests, bytes, exams
+        self.perf_regressions: list[dict] = [] # set by check_performance()
+        self.resolver = resolver              # None → built on the first upsert (see _resolve)
+        self.sink = sink                      # --output: every exam also streamed to a file
+        self.scrapers_run: list[str] = []
+
+        if checkpoint:
+            # Resuming: carry over what the interrupted run already did
+            self.totals.update(checkpoint.data.get("totals") or {})
+            self.changed_exams.extend(checkpoint.data.get("changed_exams") or [])
+            self.scrapers_run.extend(checkpoint.data.get("scrapers_run") or [])
+            checkpoint.bind(self.totals, self.changed_exams, self.scrapers_run)
+
+    # ── Scrapers ─────────────────────────────────────────────────────────────
+    def run_scraper(self, scraper) -> dict:
+        """
+        Fetch one scraper and process its exams. The scraper is not closed,
+        so callers can keep it warm. Returns this scraper's own counters.
+        """
+        stats = _new_stats()
+        if self.checkpoint and self.checkpoint.is_completed(scraper.NAME):
+            logger.info("━━━ %s already completed in run %s — skipping ━━━", scraper.NAME, self.run_id)
+            return stats
+        if self.deadline.expired():
+            # Not marked completed, so a --resume still runs it
+            logger.warning("━━━ Run deadline reached — skipping %s ━━━", scraper.NAME)
+            self.totals["skipped"] += 1
+            return stats
+
+        scraper.checkpoint = self.checkpoint
+        scraper.run_id = self.run_id
+        scraper.budget = self.deadline.child(scraper_budget(scraper.NAME))
+        truncated_before = scraper.truncated
+        requests_before, bytes_before = scraper.requests_made, scraper.bytes_fetched
+        started_at, started = time.time(), time.monotonic()
+        logger.info("━━━ Running %s scraper ━━━", scraper.NAME)
+        with log_context(run_id=self.run_id, scraper=scraper.NAME):
+            try:
+                # The scraper runs ahead on its own thread; exams are upserted as they arrive
+                self.process_exams(scraper.NAME, stream(scraper.fetch_iter(), name=scraper.NAME), stats)
+            except Exception as exc:
+                self.record_failure(scraper.NAME, exc, stats)
+                logger.debug(traceback.format_exc())
+            else:
+                # Only a scraper that ran to the end is skipped by --resume
+                if self.checkpoint:
+                    self.checkpoint.mark_scraper_done(scraper.NAME)
+
+        truncated = scraper.truncated - truncated_before
+        if truncated:
+            self._count(stats, "truncated", truncated)
+            logger.warning("%s: time budget used up — skipped %d detail page(s)", scraper.NAME, truncated)
+        self.perf_samples.append({
+            "scraper": scraper.NAME,
+            "started_at": started_at,
+            "duration_ms": int((time.monotonic() - started) * 1000),
+            # A warm (daemon) scraper keeps counting across runs
+            "requests": scraper.requests_made - requests_before,
+            "bytes": scraper.bytes_fetched - bytes_before,
+            "exams": stats["scraped"],
+            "errors": stats["errors"],
+            "truncated": truncated,
+        })
+        return stats
+
+    def process_exams(self, name: str, exams: Iterable[dict], stats: dict | None = None) -> dict:
+        """Upsert / notify a scraper's exams (streamed from it or fetched by a queue worker)."""
+        stats = stats if stats is not None else _new_stats()
+        if name not in self.scrapers_run:
+            self.scrapers_run.append(name)
+        with log_context(run_id=self.run_id, scraper=name):
+            for exam in exams:
+                self._process_exam(name, exam, stats)
+            logger.info("%s: scraped %d exam(s)", name, stats["scraped"])
+        return stats
+
+    def record_failure(self, name: str, error, stats: dict | None = None) -> None:
+        if name not in self.scrapers_run:
+            self.scrapers_run.append(name)
+        if stats is not None:
+            stats["errors"] += 1
+        self.totals["errors"] += 1
+        metrics.SCRAPER_FAILURES.inc(name)
+        logger.error("Scraper %s crashed: %s", name, error)
+
+    def _process_exam(self, name: str, exam: dict, stats: dict) -> None:
+        if self.checkpoint and self.checkpoint.is_upserted(exam):
+            # Done before a --resume; already counted in the carried-over totals
+            logger.debug("Already upserted before resume: %s", exam["exam_name"])
+            return
+        self._count(stats, "scraped")
+        metrics.EXAMS.inc(name, "scraped")
+
+        if not exam.get("exam_name") or not exam.get("official_website"):
+            logger.debug("Skipping incomplete exam record: %s", exam)
+            return
+
+        if self.sink:
+            try:
+                self.sink.write(exam, name, self.run_id)
+            except Exception as exc:
+                logger.error("Output %s:%s failed, no longer writing to it: %s", self.sink.KIND, self.sink.path, exc)
+                self.sink.abandon()   # closed, also for whoever else holds it (the daemon)
+                self.sink = None
+
+        if self.dry_run:
+            logger.info("[DRY-RUN] Would upsert: %s", exam["exam_name"])
+            return
+
+        try:
+            resolved = self._resolve(exam)
+            success, is_new, exam_id, changed = upsert_exam(exam, existing_id=resolved)
+            if not success:
+                self._count(stats, "errors")
+                metrics.EXAMS.inc(name, "error")
+                logger.warning("DB upsert failed for: %s", exam["exam_name"])
+                return
+            if changed:
+                self.changed_exams.append(exam)
+            if is_new:
+                if self.resolver:
+                    self.resolver.add(exam_id, exam["exam_name"], exam["organization"])
+                self._count(stats, "new")
+                metrics.EXAMS.inc(name, "new")
+                logger.info("NEW exam saved: %s (id=%s)", exam["exam_name"], exam_id)
+                self._notify(exam)
+            elif changed:
+                self._count(stats, "updated")
+                metrics.EXAMS.inc(name, "updated")
+                logger.debug("Updated existing exam: %s (id=%s)", exam["exam_name"], exam_id)
+            else:
+                self.totals["unchanged"] += 1
+                metrics.EXAMS.inc(name, "unchanged")
+            if self.checkpoint:
+                self.checkpoint.mark_upserted(exam)
+        except Exception as exc:
+            self._count(stats, "errors")
+            metrics.EXAMS.inc(name, "error")
+            logger.error("Error upserting '%s': %s", exam.get("exam_name"), exc)
+
+    def _resolve(self, exam: dict) -> str | None:
+        """Id of the existing exam this one is a differently-titled copy of (see resolver.py)."""
+        if not RESOLVE_ENABLED:
+            return None
+        if self.resolver is None:
+            self.resolver = ExamResolver()
+        if self.resolver.loaded_on != date.today():
+            try:
+                self.resolver.load()
+            except Exception as exc:
+                logger.error("Entity resolver unavailable, upserting by exact title: %s", exc)
+                self.resolver.loaded_on = date.today()   # don't retry for every exam
+                return None
+        match = self.resolver.resolve(exam["exam_name"], exam["organization"])
+        return match[0] if match else None
+
+    def _count(self, stats: dict, key: str, n: int = 1) -> None:
+        stats[key] += n
+        self.totals[key] += n
+
+    def _notify(self, exam: dict) -> None:
+        if self.recipients is None:
+            return
+        recipients = self.recipients.for_exam(exam)
+        if not recipients:
+            return
+        sent = send_new_exam_notification(exam, recipients)
+        self.totals["notified"] += sent
+        logger.info(
+            "Notifications sent for '%s': %d/%d",
+            exam["exam_name"], sent, len(recipients),
+        )
+
+    # ── Wrap-up ──────────────────────────────────────────────────────────────
+    def log_summary(self) -> None:
+        t = self.totals
+        logger.info(
+            "━━━ DONE ━━━  scraped=%d  new=%d  updated=%d  unchanged=%d  errors=%d  notified=%d",
+            t["scraped"], t["new"], t["updated"], t["unchanged"], t["errors"], t["notified"],
+        )
+        if t["truncated"] or t["skipped"]:
+            logger.warning(
+                "Run cut short by time budgets: %d detail page(s) skipped, %d scraper(s) not started",
+                t["truncated"], t["skipped"],
+            )
+
+    def check_performance(self) -> list[dict]:
+        """Record this run's per-scraper samples and flag regressions (see perfhistory.py)."""
+        if self.perf_samples:
+            self.perf_regressions = check_run(self.run_id, self.perf_samples)
+        return self.perf_regressions
+
+    def update_statuses(self, transitions: StatusTransitions | None = None) -> dict | None:
+        """
+        Apply due exam status transitions (see transitions.py) — from a fresh
+        read, or from the daemon's long-lived heap, reloaded once a day.
+        When they cannot all be written no counts are reported (None), so
+        the webhook route falls back to its own status sweep.
+        """
+        if self.dry_run:
+            return None
+        try:
+            transitions = transitions or StatusTransitions()
+            if transitions.loaded_on != date.today():
+                transitions.load()
+            self.status_changes = transitions.apply()
+        except Exception as exc:
+            logger.error("Status transitions failed: %s", exc)
+            self.status_changes = None
+        return self.status_changes
+
+    def push_webhook(self) -> bool:
+        """Push the run's delta to the Next.js webhook (no-op for dry runs)."""
+        if self.dry_run:
+            return False
+        errors = self.totals["errors"]
+        return push_results(
+            scrapers=self.scrapers_run,
+            exams=self.changed_exams,
+            stats={**self.totals, "perf_regressions": self.perf_regressions},
+            error_log="" if errors == 0 else f"{errors} error(s) during run",
+            run_id=self.run_id,
+            status_changes=self.status_changes,
+        )
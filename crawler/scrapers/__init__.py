@@ -1,21 +1,41 @@
 """
-Scrapers package — exports all site-specific scraper classes.
+Scrapers package — registry of all site-specific scraper classes.
+
+Scraper modules are imported lazily by name (`get_scraper("bpsc")`), so a
+run limited to a few scrapers only imports those. `ALL_SCRAPERS` and the
+class names remain available as package attributes and resolve on access.
 """
-from scrapers.upsc  import UPSCScraper
-from scrapers.ssc   import SSCScraper
-from scrapers.ibps  import IBPSScraper
-from scrapers.bpsc  import BPSCScraper
-from scrapers.uppsc import UPPSCScraper
-from scrapers.mppsc import MPPSCScraper
-
-ALL_SCRAPERS = [
-    UPSCScraper,
-    SSCScraper,
-    IBPSScraper,
-    BPSCScraper,
-    UPPSCScraper,
-    MPPSCScraper,
-]
+from __future__ import annotations
+
+import importlib
+
+# name → (module, class)
+_REGISTRY: dict[str, tuple[str, str]] = {
+    "upsc":  ("scrapers.upsc",  "UPSCScraper"),
+    "ssc":   ("scrapers.ssc",   "SSCScraper"),
+    "ibps":  ("scrapers.ibps",  "IBPSScraper"),
+    "bpsc":  ("scrapers.bpsc",  "BPSCScraper"),
+    "uppsc": ("scrapers.uppsc", "UPPSCScraper"),
+    "mppsc": ("scrapers.mppsc", "MPPSCScraper"),
+}
+
+SCRAPER_NAMES: list[str] = list(_REGISTRY)
+
+
+def get_scraper(name: str):
+    """Return the scraper class registered under `name` (case-insensitive)."""
+    module, cls = _REGISTRY[name.strip().lower()]
+    return getattr(importlib.import_module(module), cls)
+
+
+def __getattr__(name: str):
+    if name == "ALL_SCRAPERS":
+        return [get_scraper(n) for n in SCRAPER_NAMES]
+    for key, (_, cls) in _REGISTRY.items():
+        if cls == name:
+            return get_scraper(key)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "UPSCScraper",
@@ -25,4 +45,6 @@ __all__ = [
     "UPPSCScraper",
     "MPPSCScraper",
     "ALL_SCRAPERS",
+    "SCRAPER_NAMES",
+    "get_scraper",
 ]
@@ -3,25 +3,31 @@ Base Scraper
 -------------
 Abstract base class that every site-specific scraper inherits from.
 Provides:
-  - Requests session with retry logic
+  - Requests session with retry logic, HTML-only streamed bodies capped at
+    MAX_HTML_MB, charsets detected once per host and requests to a host
+    spaced REQUEST_DELAY apart (across threads and scrapers)
   - Selenium browser (lazy-loaded)
   - Date parsing helpers
   - Sanitisation helpers
   - Standard return type (list of exam dicts)
+
+Selenium, webdriver_manager, tenacity and dateutil are imported on first
+use, so scrapers that never need them do not pay for them at startup.
 """
 from __future__ import annotations
 
 import abc
+import hashlib
 import logging
 import re
+import threading
 import time
-from datetime import date, datetime
-from typing import Optional
+from types import SimpleNamespace
+from typing import Iterator, Optional
+from urllib.parse import urlparse
 
 import requests
 from bs4 import BeautifulSoup
-from dateutil import parser as dateparser
-from tenacity import retry, stop_after_attempt, wait_fixed
 
 from config import (
     DEFAULT_HEADERS,
@@ -30,23 +36,123 @@ from config import (
     MAX_RETRIES,
     HEADLESS_BROWSER,
     CHROME_DRIVER_PATH,
+    MAX_HTML_MB,
 )
+import metrics
+import parsing
+from records import ExamRecord, make_record
 
 logger = logging.getLogger(__name__)
 
-# ── Selenium lazy import ────────────────────────────────────────────────────
-_SELENIUM_AVAILABLE = True
-try:
-    from selenium import webdriver
-    from selenium.webdriver.chrome.options import Options as ChromeOptions
-    from selenium.webdriver.chrome.service import Service as ChromeService
-    from selenium.webdriver.common.by import By
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-    from webdriver_manager.chrome import ChromeDriverManager
-except ImportError:
-    _SELENIUM_AVAILABLE = False
-    logger.warning("Selenium not installed; dynamic-page scrapers will be skipped.")
+
+def _selenium():
+    """Import Selenium on first use; raises RuntimeError when it is not installed."""
+    try:
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options as ChromeOptions
+        from selenium.webdriver.chrome.service import Service as ChromeService
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from webdriver_manager.chrome import ChromeDriverManager
+    except ImportError as exc:
+        logger.warning("Selenium not installed; dynamic-page scrapers will be skipped.")
+        raise RuntimeError("Selenium is not installed.") from exc
+    return SimpleNamespace(
+        webdriver=webdriver,
+        ChromeOptions=ChromeOptions,
+        ChromeService=ChromeService,
+        By=By,
+        WebDriverWait=WebDriverWait,
+        EC=EC,
+        ChromeDriverManager=ChromeDriverManager,
+    )
+
+
+class ResponseRejected(requests.RequestException):
+    """Body not read: not HTML, or larger than MAX_HTML_MB. Not retried."""
+
+
+_MAX_BYTES = int(MAX_HTML_MB * 1024 * 1024)
+_CHUNK = 64 * 1024
+_META_CHARSET = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?([\w.:-]+)""", re.I)
+
+# host → encoding detected for its pages that declare no charset
+_charsets: dict[str, str] = {}
+
+# host → monotonic time its next request may start
+_next_request: dict[str, float] = {}
+_pace_lock = threading.Lock()
+
+
+def _pace(host: str) -> None:
+    """Wait for `host`'s next request slot: REQUEST_DELAY after the one before it, in any thread."""
+    with _pace_lock:
+        now = time.monotonic()
+        slot = max(now, _next_request.get(host, 0.0))
+        _next_request[host] = slot + REQUEST_DELAY
+    if slot > now:
+        time.sleep(slot - now)
+
+
+def _is_html(content_type: str) -> bool:
+    return not content_type or content_type.startswith("text/") or content_type in (
+        "application/xhtml+xml", "application/xml",
+    )
+
+
+def _read_body(resp: requests.Response) -> None:
+    """Stream the HTML body into resp.content, abandoning it past MAX_HTML_MB."""
+    content_type = (resp.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+    if not _is_html(content_type):
+        raise ResponseRejected(f"expected HTML, got {content_type} from {resp.url}")
+    length = resp.headers.get("Content-Length")
+    if length and length.isdigit() and int(length) > _MAX_BYTES:
+        raise ResponseRejected(f"{resp.url}: {int(length)} bytes exceeds the cap of {_MAX_BYTES}")
+
+    chunks, size = [], 0
+    for chunk in resp.iter_content(_CHUNK):
+        size += len(chunk)
+        if size > _MAX_BYTES:
+            raise ResponseRejected(f"{resp.url}: body exceeds the cap of {_MAX_BYTES} bytes")
+        chunks.append(chunk)
+    resp._content = b"".join(chunks)
+    resp.encoding = _encoding(resp)
+
+
+def _encoding(resp: requests.Response) -> str:
+    """
+    The page's charset: from the Content-Type header, else its <meta> tag,
+    else utf-8 if it decodes, else what was detected for the host before if
+    the page decodes with it, else detected now (charset_normalizer over the
+    first 64 KB) and cached. The trial decodes are cheap next to detection
+    and catch a host that changed its encoding.
+    """
+    header = resp.headers.get("Content-Type") or ""
+    if "charset=" in header.lower():
+        return requests.utils.get_encoding_from_headers(resp.headers)
+    content = resp.content
+    meta = _META_CHARSET.search(content[:4096])
+    if meta:
+        return meta.group(1).decode("ascii")
+    host = urlparse(resp.url).hostname or ""
+    cached = _charsets.get(host)
+    for candidate in ("utf-8", cached):
+        if not candidate:
+            continue
+        try:
+            content.decode(candidate)
+        except (UnicodeDecodeError, LookupError):
+            continue
+        detected = candidate
+        break
+    else:
+        detected = requests.compat.chardet.detect(content[:_CHUNK])["encoding"] or "utf-8"
+    if detected == cached:
+        return cached
+    _charsets[host] = detected
+    logger.debug("Charset for %s: %s (detected)", host, detected)
+    return detected
 
 
 MONTH_ABBR = {
@@ -62,10 +168,21 @@ class BaseScraper(abc.ABC):
     LEVEL: str        = "Central"
     STATE: str | None = None
     BASE_URL: str     = ""
+    DETAIL_SELECTOR: str | None = None   # CSS scope for dates on detail pages (None → whole page)
 
     def __init__(self):
         self._session = self._build_session()
         self._driver  = None   # Selenium WebDriver (lazy)
+        self.checkpoint = None # set by the runner; see checkpoint.py
+        self.shared_details = None  # set by queue workers; see cluster.py
+        self.budget = None     # set by the runner; see budget.py
+        # Counters, bumped from the spec engine's detail threads too (see _tally)
+        self.truncated = 0     # detail pages skipped because the budget ran out
+        self.requests_made = 0 # HTTP requests (retries included)
+        self.bytes_fetched = 0 # response bytes read
+        self._counter_lock = threading.Lock()
+        self.run_id = None     # set by the runner; names the page-archive manifest
+        self.offline = None    # saved pages instead of the network; see reparse.py
 
     # ── Session ─────────────────────────────────────────────────────────────
     def _build_session(self) -> requests.Session:
@@ -74,23 +191,155 @@ class BaseScraper(abc.ABC):
         s.max_redirects = 5
         return s
 
-    @retry(stop=stop_after_attempt(MAX_RETRIES), wait=wait_fixed(REQUEST_DELAY))
     def _get(self, url: str, **kwargs) -> requests.Response:
-        resp = self._session.get(url, timeout=REQUEST_TIMEOUT, **kwargs)
-        resp.raise_for_status()
-        time.sleep(REQUEST_DELAY)
+        """
+        GET an HTML page with retries. The body is streamed and abandoned past
+        MAX_HTML_MB; non-HTML responses (mislinked PDFs, …) are abandoned
+        before reading them. Either raises ResponseRejected.
+        """
+        if self.offline is not None:
+            return self.offline.response(url)
+
+        from tenacity import Retrying, retry_if_not_exception_type, wait_fixed
+
+        def stop(state) -> bool:
+            # No more retries once the time budget is spent
+            return state.attempt_number >= MAX_RETRIES or self._out_of_time()
+
+        retrying = Retrying(
+            stop=stop, wait=wait_fixed(REQUEST_DELAY), retry=retry_if_not_exception_type(ResponseRejected),
+        )
+        host = urlparse(url).hostname or ""
+        for attempt in retrying:
+            with attempt:
+                if not self._out_of_time():
+                    _pace(host)
+                self._tally("requests_made")
+                with metrics.track_request(host):
+                    resp = self._session.get(url, timeout=self._timeout(), stream=True, **kwargs)
+                    try:
+                        resp.raise_for_status()
+                        _read_body(resp)
+                    finally:
+                        resp.close()
+                self._tally("bytes_fetched", len(resp.content))
+                metrics.HTTP_BYTES.inc(host, by=len(resp.content))
+        self._archive(url, resp.content, resp.status_code, resp.headers.get("Content-Type"))
         return resp
 
+    def _archive(self, url: str, content: bytes, status: int = 200, content_type: str | None = None) -> None:
+        """Keep a copy of a fetched body in the page archive (see archive.py)."""
+        from archive import get_archive
+
+        archive = get_archive()
+        if archive is None:
+            return
+        try:
+            archive.store(url, content, status, content_type, scraper=self.NAME, run_id=self.run_id)
+        except OSError as exc:
+            logger.debug("Could not archive %s: %s", url, exc)
+
+    def _tally(self, counter: str, n: int = 1) -> None:
+        with self._counter_lock:
+            setattr(self, counter, getattr(self, counter) + n)
+
+    def _out_of_time(self) -> bool:
+        return self.budget is not None and self.budget.expired()
+
+    def _timeout(self) -> float:
+        """REQUEST_TIMEOUT, cut down to what is left of the budget (at least 5 s)."""
+        if self.budget is None:
+            return REQUEST_TIMEOUT
+        return max(5.0, min(REQUEST_TIMEOUT, self.budget.remaining()))
+
     def _soup(self, url: str, **kwargs) -> BeautifulSoup:
         html = self._get(url, **kwargs).text
         return BeautifulSoup(html, "lxml")
 
+    # ── Detail pages ─────────────────────────────────────────────────────────
+    def _fetch_detail(self, url: str, exam_name: str | None = None) -> dict:
+        """
+        Fetch a linked detail page and extract its dates and first PDF link.
+        Returns {"dates": {...}, "pdf_url": str | None}; empty on failure.
+
+        Goes through the run checkpoint (pages fetched before a --resume), the
+        work queue (pages other workers fetched for this run) and the crawl
+        frontier: a page fetched recently (by any scraper, in this or an
+        earlier run) is served from the store. Pages that would need a fetch
+        are skipped once the scraper's time budget is spent. Re-parsing saved
+        pages (`offline`) always parses the page itself.
+        """
+        from frontier import get_frontier
+
+        if self.offline is not None:
+            try:
+                return self._parse_detail(self._get(url))
+            except Exception as exc:
+                logger.debug("Could not re-parse %s linked page %s: %s", self.NAME, url, exc)
+                return {"dates": {}, "pdf_url": None}
+
+        for store in (self.checkpoint, self.shared_details):
+            saved = store.detail(url) if store else None
+            if saved is not None:
+                return saved
+
+        frontier = get_frontier()
+        if frontier:
+            cached = frontier.lookup(url, "detail")
+            if cached is not None:
+                return {"dates": cached.get("dates", {}), "pdf_url": cached.get("pdf_url")}
+
+        if self._out_of_time():
+            # Budget spent: keep the listing-level exam, skip its enrichment
+            self._tally("truncated")
+            return {"dates": {}, "pdf_url": None}
+
+        try:
+            resp = self._get(url)
+            detail = self._parse_detail(resp)
+        except Exception as exc:
+            logger.debug("Could not fetch %s linked page %s: %s", self.NAME, url, exc)
+            if frontier:
+                # tenacity wraps the last error in a RetryError
+                last = exc.last_attempt.exception() if hasattr(exc, "last_attempt") else exc
+                status = getattr(getattr(last, "response", None), "status_code", None) or 0
+                frontier.record(url, "detail", status, exam_name=exam_name)
+            return {"dates": {}, "pdf_url": None}
+
+        if frontier:
+            frontier.record(
+                url, "detail", resp.status_code,
+                content_hash=hashlib.sha1(resp.content).hexdigest(),
+                result=detail,
+                exam_name=exam_name,
+            )
+        if self.checkpoint:
+            self.checkpoint.mark_detail(url, detail)
+        return detail
+
+    def _parse_detail(self, resp: requests.Response) -> dict:
+        return self._offload(
+            parsing.detail_summary, resp.content, resp.encoding, self.BASE_URL, self.DETAIL_SELECTOR,
+        )
+
+    def _offload(self, fn, content: bytes, *args):
+        """Parse in the parse pool (see parsing.py); re-parsing runs are already one process per scraper."""
+        if self.offline is not None:
+            return fn(content, *args)
+        return parsing.offload(fn, content, *args)
+
+    def _first_pdf(self, soup: BeautifulSoup) -> str | None:
+        """Absolute URL of the first PDF linked from `soup`, or None."""
+        return parsing.first_pdf(soup, self.BASE_URL)
+
+    def _absolute(self, href: str) -> str:
+        return parsing.absolute(self.BASE_URL, href)
+
     # ── Selenium ─────────────────────────────────────────────────────────────
     def _get_driver(self):
-        if not _SELENIUM_AVAILABLE:
-            raise RuntimeError("Selenium is not installed.")
         if self._driver is None:
-            opts = ChromeOptions()
+            sel = _selenium()
+            opts = sel.ChromeOptions()
             if HEADLESS_BROWSER:
                 opts.add_argument("--headless=new")
             opts.add_argument("--no-sandbox")
@@ -100,22 +349,30 @@ class BaseScraper(abc.ABC):
             opts.add_argument(f"user-agent={DEFAULT_HEADERS['User-Agent']}")
 
             if CHROME_DRIVER_PATH:
-                service = ChromeService(executable_path=CHROME_DRIVER_PATH)
+                service = sel.ChromeService(executable_path=CHROME_DRIVER_PATH)
             else:
-                service = ChromeService(ChromeDriverManager().install())
+                service = sel.ChromeService(sel.ChromeDriverManager().install())
 
-            self._driver = webdriver.Chrome(service=service, options=opts)
+            self._driver = sel.webdriver.Chrome(service=service, options=opts)
         return self._driver
 
     def _selenium_get(self, url: str, wait_selector: str | None = None, timeout: int = 15) -> BeautifulSoup:
+        if self.offline is not None:
+            return BeautifulSoup(self.offline.response(url).text, "lxml")
         driver = self._get_driver()
         driver.get(url)
         if wait_selector:
-            WebDriverWait(driver, timeout).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, wait_selector))
+            sel = _selenium()
+            sel.WebDriverWait(driver, timeout).until(
+                sel.EC.presence_of_element_located((sel.By.CSS_SELECTOR, wait_selector))
             )
         time.sleep(REQUEST_DELAY)
-        return BeautifulSoup(driver.page_source, "lxml")
+        html = driver.page_source
+        body = html.encode("utf-8")
+        self._tally("requests_made")
+        self._tally("bytes_fetched", len(body))
+        self._archive(url, body, content_type="text/html; charset=utf-8")
+        return BeautifulSoup(html, "lxml")
 
     def close(self):
         try:
@@ -127,80 +384,27 @@ class BaseScraper(abc.ABC):
 
     # ── Date helpers ─────────────────────────────────────────────────────────
     def _parse_date(self, text: str | None) -> str | None:
-        """
-        Parse a messy date string → ISO 8601 'YYYY-MM-DD' or None.
-        Handles: "15 March 2026", "15/03/2026", "March 15, 2026", etc.
-        """
-        if not text:
-            return None
-        text = text.strip()
-        # Remove parenthetical notes e.g. "(till 11:59 PM)"
-        text = re.sub(r"\(.*?\)", "", text).strip()
-        # Replace ordinal suffixes: 15th → 15
-        text = re.sub(r"(\d+)(st|nd|rd|th)", r"\1", text, flags=re.IGNORECASE)
-        try:
-            parsed = dateparser.parse(text, dayfirst=True)
-            if parsed:
-                return parsed.date().isoformat()
-        except Exception:
-            pass
-        return None
+        """Messy date string → ISO 8601 'YYYY-MM-DD' or None (see parsing.parse_date)."""
+        return parsing.parse_date(text)
 
     def _extract_dates_from_text(self, text: str) -> dict:
-        """
-        Look for common date patterns inside a block of text.
-        Returns dict with keys: application_start_date, application_last_date, exam_date
-        """
-        result = {}
-        lines = text.splitlines()
-
-        START_KW  = ["notification", "start date", "begin", "opening date", "apply from"]
-        LAST_KW   = ["last date", "closing date", "end date", "final date", "last day"]
-        EXAM_KW   = ["exam date", "examination date", "written test", "date of exam", "tentative date"]
-
-        DATE_PAT = re.compile(
-            r"\b(\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{2,4}"
-            r"|\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.?\s+\d{4}"
-            r"|\d{4}[\/\-\.]\d{2}[\/\-\.]\d{2})\b",
-            re.IGNORECASE,
-        )
-
-        for line in lines:
-            low = line.lower()
-            dates = DATE_PAT.findall(line)
-            if not dates:
-                continue
-            parsed_date = self._parse_date(dates[0])
-            if not parsed_date:
-                continue
-
-            if any(kw in low for kw in LAST_KW):
-                result.setdefault("application_last_date", parsed_date)
-            elif any(kw in low for kw in EXAM_KW):
-                result.setdefault("exam_date", parsed_date)
-            elif any(kw in low for kw in START_KW):
-                result.setdefault("application_start_date", parsed_date)
-
-        return result
+        """application_start_date / application_last_date / exam_date found in `text`."""
+        return parsing.extract_dates(text)
 
     # ── Text helpers ─────────────────────────────────────────────────────────
     @staticmethod
     def _clean(text: str | None, max_len: int = 0) -> str:
-        if not text:
-            return ""
-        cleaned = " ".join(text.split())
-        if max_len and len(cleaned) > max_len:
-            cleaned = cleaned[:max_len].rsplit(" ", 1)[0] + "…"
-        return cleaned
+        return parsing.clean(text, max_len)
 
     # ── Abstract interface ───────────────────────────────────────────────────
     @abc.abstractmethod
-    def fetch(self) -> list[dict]:
+    def fetch_iter(self) -> Iterator[ExamRecord]:
         """
-        Main entry point.
-        Returns a list of exam dicts matching the DB schema.
+        Main entry point — a generator that yields each exam (built with
+        _make_exam, matching the DB schema) as soon as it is built / enriched,
+        so the runner can upsert while the scraper is still waiting on the network.
 
-        Required keys per dict:
+        Required keys per exam:
           exam_name, organization, level, official_website
         Optional: state, description, eligibility, qualification, age_limit,
                   application_start_date, application_last_date, exam_date,
@@ -208,24 +412,28 @@ class BaseScraper(abc.ABC):
         """
         ...
 
+    def fetch(self) -> list[ExamRecord]:
+        """All exams at once (see fetch_iter)."""
+        return list(self.fetch_iter())
+
     # ── Result builder ───────────────────────────────────────────────────────
-    def _make_exam(self, **kw) -> dict:
-        """Helper to build a well-formed exam dict with defaults."""
-        return {
-            "exam_name":              self._clean(kw.get("exam_name", ""), 255),
-            "organization":           self._clean(kw.get("organization", self.ORG), 255),
-            "level":                  kw.get("level", self.LEVEL),
-            "state":                  kw.get("state", self.STATE),
-            "description":            self._clean(kw.get("description", ""), 2000),
-            "eligibility":            self._clean(kw.get("eligibility", ""), 1000),
-            "qualification":          self._clean(kw.get("qualification", ""), 500),
-            "age_limit":              self._clean(kw.get("age_limit", ""), 200),
-            "application_start_date": kw.get("application_start_date"),
-            "application_last_date":  kw.get("application_last_date"),
-            "exam_date":              kw.get("exam_date"),
-            "official_website":       kw.get("official_website", self.BASE_URL),
-            "notification_pdf":       kw.get("notification_pdf"),
-            "application_fee":        self._clean(kw.get("application_fee", ""), 200),
-            "selection_process":      self._clean(kw.get("selection_process", ""), 500),
-            "status":                 kw.get("status"),   # None → auto-inferred by database.py
-        }
+    def _make_exam(self, **kw) -> ExamRecord:
+        """Helper to build a well-formed exam record with defaults (see records.py)."""
+        return make_record(
+            exam_name=self._clean(kw.get("exam_name", ""), 255),
+            organization=self._clean(kw.get("organization", self.ORG), 255),
+            level=kw.get("level", self.LEVEL),
+            state=kw.get("state", self.STATE),
+            description=self._clean(kw.get("description", ""), 2000),
+            eligibility=self._clean(kw.get("eligibility", ""), 1000),
+            qualification=self._clean(kw.get("qualification", ""), 500),
+            age_limit=self._clean(kw.get("age_limit", ""), 200),
+            application_start_date=kw.get("application_start_date"),
+            application_last_date=kw.get("application_last_date"),
+            exam_date=kw.get("exam_date"),
+            official_website=kw.get("official_website", self.BASE_URL),
+            notification_pdf=kw.get("notification_pdf"),
+            application_fee=self._clean(kw.get("application_fee", ""), 200),
+            selection_process=self._clean(kw.get("selection_process", ""), 500),
+            status=kw.get("status"),   # None → auto-inferred by database.py
+        )
@@ -0,0 +1,133 @@
+"""
+Spec-driven Scraper Engine
+---------------------------
+State PSC sites all follow the same pattern: a static listing page of
+anchors, some of which lead to a detail page (dates + notification PDF) or
+straight to a PDF. Instead of one hand-written loop per commission, a site
+is described by a `ScraperSpec` and run by `SpecScraper`:
+
+    class XYZPSCScraper(SpecScraper):
+        SPEC = ScraperSpec(
+            name="XYZPSC", org="...", state="...", base_url="https://...",
+            listing_urls=("https://.../notices",),
+            link_pattern=r"exam|recruit|advt",
+            default_meta={...},
+            exam_meta={"keyword": {...}},
+        )
+
+Listing links are collected in page order, then their detail pages are
+fetched concurrently (DETAIL_CONCURRENCY threads, each through the usual
+checkpoint / frontier lookups), and the exams are yielded in listing order.
+The threads share the host's REQUEST_DELAY spacing (see BaseScraper._get),
+so they overlap slow responses without raising the request rate.
+Listing and detail pages are parsed in the parse pool (see parsing.py), so
+the threads spend their time on the network.
+"""
+from __future__ import annotations
+
+import contextvars
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterator
+
+import parsing
+from config import DETAIL_CONCURRENCY
+from scrapers.base import BaseScraper
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ScraperSpec:
+    name: str                                   # short name, also the exam-name prefix
+    org: str
+    base_url: str
+    listing_urls: tuple[str, ...]
+    level: str = "State"
+    state: str | None = None
+    link_pattern: str | None = None             # regex over href + link text; None → every link
+    min_text_len: int = 8                       # shorter link texts are navigation, not notices
+    default_meta: dict = field(default_factory=dict)
+    exam_meta: dict = field(default_factory=dict)  # keyword in link text → meta overrides
+    detail_selector: str | None = None          # CSS scope for dates on detail pages
+    detail_concurrency: int = DETAIL_CONCURRENCY
+
+
+class SpecScraper(BaseScraper):
+    SPEC: ScraperSpec
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        spec = cls.__dict__.get("SPEC")
+        if spec is None:
+            return
+        cls.NAME = spec.name
+        cls.ORG = spec.org
+        cls.LEVEL = spec.level
+        cls.STATE = spec.state
+        cls.BASE_URL = spec.base_url
+        cls.DETAIL_SELECTOR = spec.detail_selector
+        cls._link_re = re.compile(spec.link_pattern, re.I) if spec.link_pattern else None
+
+    def fetch_iter(self) -> Iterator[dict]:
+        spec = self.SPEC
+        links: list[tuple[str, str]] = []
+        seen: set[str] = set()
+        for url in spec.listing_urls:
+            try:
+                resp = self._get(url)
+                anchors = self._offload(parsing.listing_anchors, resp.content, resp.encoding, self.BASE_URL)
+                links.extend(self._listing_links(anchors, seen))
+            except Exception as exc:
+                logger.error("%s fetch error (%s): %s", spec.name, url, exc)
+
+        pool = ThreadPoolExecutor(max_workers=max(1, spec.detail_concurrency))
+        count = 0
+        try:
+            # map() yields in listing order as soon as each exam is ready
+            context = contextvars.copy_context()   # keep the run's log fields on the pool threads
+            for exam in pool.map(lambda link: context.copy().run(self._build_exam, *link), links):
+                count += 1
+                yield exam
+        finally:
+            pool.shutdown(cancel_futures=True)
+        logger.info("%s: found %d exam(s)", spec.name, count)
+
+    def _listing_links(self, anchors: list[tuple[str, str]], seen: set[str]) -> list[tuple[str, str]]:
+        """Matching (link text, absolute href) pairs of a listing page, de-duplicated by text."""
+        links = []
+        for text, href in anchors:
+            if not text or len(text) < self.SPEC.min_text_len or text in seen:
+                continue
+            seen.add(text)
+
+            if self._link_re and not self._link_re.search(href + text):
+                continue
+            links.append((text, href))
+        return links
+
+    def _build_exam(self, text: str, href: str) -> dict:
+        spec = self.SPEC
+        pdf_url = href if href.lower().endswith(".pdf") else None
+        dates = {}
+        if not pdf_url:
+            detail = self._fetch_detail(href, exam_name=text)
+            dates, pdf_url = detail["dates"], detail["pdf_url"]
+
+        meta = {**spec.default_meta}
+        low = text.lower()
+        for key, extra in spec.exam_meta.items():
+            if key in low:
+                meta.update(extra)
+                break
+
+        return self._make_exam(
+            exam_name=text if spec.name.lower() in low else f"{spec.name} {text}",
+            official_website=href if not pdf_url else self.BASE_URL,
+            notification_pdf=pdf_url,
+            description=meta.pop("description", f"Official {spec.name} recruitment: {text}"),
+            **meta,
+            **dates,
+        )
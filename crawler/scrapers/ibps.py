@@ -9,7 +9,7 @@ from __future__ import annotations
 
 import logging
 import re
-from typing import Optional
+from typing import Iterator, Optional
 
 from bs4 import BeautifulSoup
 from scrapers.base import BaseScraper
@@ -62,7 +62,7 @@ class IBPSScraper(BaseScraper):
         },
     }
 
-    def fetch(self) -> list[dict]:
+    def fetch_iter(self) -> Iterator[dict]:
         exams: list[dict] = []
         try:
             exams += self._fetch_static()
@@ -73,15 +73,15 @@ class IBPSScraper(BaseScraper):
             except Exception as exc2:
                 logger.error("IBPS Selenium fetch also failed: %s", exc2)
 
-        seen, unique = set(), []
+        # Both listings come from a single page load, so there is nothing to stream
+        seen = set()
         for e in exams:
             key = e["exam_name"]
             if key not in seen:
                 seen.add(key)
-                unique.append(e)
+                yield e
 
-        logger.info("IBPS: found %d exam(s)", len(unique))
-        return unique
+        logger.info("IBPS: found %d exam(s)", len(seen))
 
     def _fetch_static(self) -> list[dict]:
         results = []
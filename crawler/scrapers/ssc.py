@@ -8,7 +8,7 @@ from __future__ import annotations
 
 import logging
 import re
-from typing import Optional
+from typing import Iterator, Optional
 
 from bs4 import BeautifulSoup, Tag
 from scrapers.base import BaseScraper
@@ -77,29 +77,24 @@ class SSCScraper(BaseScraper):
         },
     }
 
-    def fetch(self) -> list[dict]:
-        exams: list[dict] = []
-        try:
-            exams += self._scrape_latest_notices()
-        except Exception as exc:
-            logger.error("SSC latest notices error: %s", exc)
-        try:
-            exams += self._scrape_calendar()
-        except Exception as exc:
-            logger.error("SSC calendar error: %s", exc)
-
-        # Deduplicate by exam_name
-        seen, unique = set(), []
-        for e in exams:
-            if e["exam_name"] not in seen:
-                seen.add(e["exam_name"])
-                unique.append(e)
+    def fetch_iter(self) -> Iterator[dict]:
+        seen: set[str] = set()   # deduplicate by exam_name across both sources
+        sources = (
+            ("latest notices", self._scrape_latest_notices),
+            ("calendar", self._scrape_calendar),
+        )
+        for label, source in sources:
+            try:
+                for e in source():
+                    if e["exam_name"] not in seen:
+                        seen.add(e["exam_name"])
+                        yield e
+            except Exception as exc:
+                logger.error("SSC %s error: %s", label, exc)
 
-        logger.info("SSC: found %d exam(s)", len(unique))
-        return unique
+        logger.info("SSC: found %d exam(s)", len(seen))
 
-    def _scrape_latest_notices(self) -> list[dict]:
-        results = []
+    def _scrape_latest_notices(self) -> Iterator[dict]:
         soup = self._soup(self.LATEST_NOTICES_URL)
         rows = soup.find_all("a", href=True)
 
@@ -117,9 +112,7 @@ class SSCScraper(BaseScraper):
 
             exam_data = self._enrich(text, href)
             if exam_data:
-                results.append(exam_data)
-
-        return results
+                yield exam_data
 
     def _scrape_calendar(self) -> list[dict]:
         results = []
@@ -158,18 +151,8 @@ class SSCScraper(BaseScraper):
 
         dates = {}
         if not href.lower().endswith(".pdf"):
-            try:
-                linked = self._soup(href)
-                text = linked.get_text(separator="\n")
-                dates = self._extract_dates_from_text(text)
-                for a2 in linked.find_all("a", href=True):
-                    if a2["href"].lower().endswith(".pdf"):
-                        pdf_url = a2["href"]
-                        if not pdf_url.startswith("http"):
-                            pdf_url = self.BASE_URL.rstrip("/") + "/" + pdf_url.lstrip("/")
-                        break
-            except Exception:
-                pass
+            detail = self._fetch_detail(href, exam_name=title)
+            dates, pdf_url = detail["dates"], detail["pdf_url"]
 
         meta = self._match_meta(title)
         return self._make_exam(
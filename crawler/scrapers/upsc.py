@@ -9,7 +9,7 @@ from __future__ import annotations
 
 import logging
 import re
-from typing import Optional
+from typing import Iterator, Optional
 
 from bs4 import BeautifulSoup, Tag
 from scrapers.base import BaseScraper
@@ -65,17 +65,15 @@ class UPSCScraper(BaseScraper):
         },
     }
 
-    def fetch(self) -> list[dict]:
-        exams: list[dict] = []
+    def fetch_iter(self) -> Iterator[dict]:
         try:
             soup = self._soup(self.NOTIFICATIONS_URL)
-            exams = self._parse_recruitment_page(soup)
+            yield from self._parse_recruitment_page(soup)
         except Exception as exc:
             logger.error("UPSC fetch error: %s", exc)
-        return exams
 
-    def _parse_recruitment_page(self, soup: BeautifulSoup) -> list[dict]:
-        results = []
+    def _parse_recruitment_page(self, soup: BeautifulSoup) -> Iterator[dict]:
+        found = 0
 
         # UPSC renders active exams in a table or ul/li with anchor links
         # Try multiple selectors to be resilient against minor layout changes
@@ -110,31 +108,20 @@ class UPSCScraper(BaseScraper):
 
             exam_data = self._build_exam_from_link(title, href)
             if exam_data:
-                results.append(exam_data)
+                found += 1
+                yield exam_data
 
-        logger.info("UPSC: found %d exam(s)", len(results))
-        return results
+        logger.info("UPSC: found %d exam(s)", found)
 
     def _build_exam_from_link(self, title: str, href: str) -> Optional[dict]:
         pdf_url   = href if href.lower().endswith(".pdf") else None
         page_url  = href if not href.lower().endswith(".pdf") else self.BASE_URL
 
-        # Try to fetch the linked page for date details
+        # Try to fetch the linked page for date details (and its first PDF link)
         dates = {}
         if not href.lower().endswith(".pdf"):
-            try:
-                linked_soup = self._soup(href)
-                text = linked_soup.get_text(separator="\n")
-                dates = self._extract_dates_from_text(text)
-                # Look for PDF links on that page
-                for a2 in linked_soup.find_all("a", href=True):
-                    if a2["href"].lower().endswith(".pdf"):
-                        pdf_url = a2["href"]
-                        if not pdf_url.startswith("http"):
-                            pdf_url = self.BASE_URL.rstrip("/") + "/" + pdf_url.lstrip("/")
-                        break
-            except Exception as exc:
-                logger.debug("Could not fetch UPSC linked page %s: %s", href, exc)
+            detail = self._fetch_detail(href, exam_name=title)
+            dates, pdf_url = detail["dates"], detail["pdf_url"]
 
         # Match against known exams for richer metadata
         meta = {}
@@ -0,0 +1,192 @@
+"""
+Exam Output Sinks
+------------------
+`python main.py --output KIND:PATH` streams every scraped exam to a local
+file as it is processed, next to (or, with --dry-run, instead of) the
+database upsert — for analysing large runs and archiving them cheaply:
+
+  ndjson:runs/today.ndjson[.gz]   one JSON object per line (gzip if .gz)
+  sqlite:runs/exams.db            rows appended to table `exams`
+  parquet:runs/today.parquet      columnar, zstd-compressed (needs pyarrow)
+
+Each row is the exam's columns plus run_id, scraper and scraped_at.
+Rows are buffered and written in batches (OUTPUT_BATCH_SIZE rows per write
+/ transaction; Parquet row groups of PARQUET_ROW_GROUP rows), and the file
+is only created on the first exam. ndjson and parquet files are replaced,
+sqlite accumulates runs. A Parquet file is readable once the sink is closed
+(its footer is written last). A failed write closes the sink; the run, and
+a daemon's later runs, carry on without it.
+"""
+from __future__ import annotations
+
+import abc
+import gzip
+import json
+import logging
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+
+from config import OUTPUT_BATCH_SIZE
+from records import EXAM_FIELDS, to_jsonable
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ("run_id", "scraper", "scraped_at") + EXAM_FIELDS
+
+PARQUET_ROW_GROUP = 50_000
+
+
+class ExamSink(abc.ABC):
+    """Buffers rows and hands them to `_write_batch` OUTPUT_BATCH_SIZE at a time."""
+
+    KIND = ""
+
+    def __init__(self, path: Path | str, batch_size: int = OUTPUT_BATCH_SIZE):
+        self.path = Path(path)
+        self.batch_size = max(1, batch_size)
+        self.written = 0
+        self._rows: list[tuple] = []
+        self._opened = False
+        self._closed = False
+
+    def write(self, exam, scraper: str, run_id: str | None = None) -> None:
+        if self._closed:
+            raise RuntimeError(f"{self.KIND} sink {self.path} is closed")
+        scraped_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self._rows.append((run_id, scraper, scraped_at) + tuple(exam.get(f) for f in EXAM_FIELDS))
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._rows:
+            return
+        if not self._opened:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._open()
+            self._opened = True
+        rows, self._rows = self._rows, []
+        self._write_batch(rows)
+        self.written += len(rows)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def close(self) -> None:
+        """Write what is buffered and close the file (idempotent)."""
+        if self._closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self._closed = True
+            if self._opened:
+                self._close()
+        if self.written:
+            logger.info("Wrote %d exam(s) to %s:%s", self.written, self.KIND, self.path)
+
+    def abandon(self) -> None:
+        """Close after a failed write, dropping what is buffered; never raises."""
+        self._rows = []
+        try:
+            self.close()
+        except Exception as exc:
+            logger.debug("Closing %s:%s failed: %s", self.KIND, self.path, exc)
+
+    def __enter__(self) -> "ExamSink":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ── Per format ───────────────────────────────────────────────────────────
+    @abc.abstractmethod
+    def _open(self) -> None:
+        ...
+
+    @abc.abstractmethod
+    def _write_batch(self, rows: list[tuple]) -> None:
+        ...
+
+    @abc.abstractmethod
+    def _close(self) -> None:
+        ...
+
+
+class NdjsonSink(ExamSink):
+    KIND = "ndjson"
+
+    def _open(self) -> None:
+        if self.path.suffix == ".gz":
+            self._file = gzip.open(self.path, "wt", encoding="utf-8", compresslevel=6)
+        else:
+            self._file = open(self.path, "w", encoding="utf-8")
+
+    def _write_batch(self, rows: list[tuple]) -> None:
+        self._file.write("".join(
+            json.dumps(dict(zip(COLUMNS, row)), ensure_ascii=False, default=to_jsonable) + "\n"
+            for row in rows
+        ))
+
+    def _close(self) -> None:
+        self._file.close()
+
+
+class SqliteSink(ExamSink):
+    KIND = "sqlite"
+
+    def _open(self) -> None:
+        self._db = sqlite3.connect(self.path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(f"CREATE TABLE IF NOT EXISTS exams ({', '.join(c + ' TEXT' for c in COLUMNS)})")
+        self._db.execute("CREATE INDEX IF NOT EXISTS exams_run ON exams (run_id, scraper)")
+        self._insert = f"INSERT INTO exams ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+
+    def _write_batch(self, rows: list[tuple]) -> None:
+        with self._db:   # one transaction per batch
+            self._db.executemany(self._insert, rows)
+
+    def _close(self) -> None:
+        self._db.close()
+
+
+class ParquetSink(ExamSink):
+    KIND = "parquet"
+
+    def __init__(self, path: Path | str, batch_size: int = PARQUET_ROW_GROUP):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise RuntimeError("parquet output needs pyarrow — pip install pyarrow") from None
+        self._pa = pyarrow
+        self._schema = pyarrow.schema([(c, pyarrow.string()) for c in COLUMNS])
+        super().__init__(path, batch_size)
+
+    def _open(self) -> None:
+        self._writer = self._pa.parquet.ParquetWriter(
+            str(self.path), self._schema, compression="zstd", use_dictionary=True,
+        )
+
+    def _write_batch(self, rows: list[tuple]) -> None:
+        columns = [
+            self._pa.array([None if v is None else str(v) for v in values], type=self._pa.string())
+            for values in zip(*rows)
+        ]
+        self._writer.write_table(self._pa.Table.from_arrays(columns, schema=self._schema))
+
+    def _close(self) -> None:
+        self._writer.close()
+
+
+SINKS = {cls.KIND: cls for cls in (NdjsonSink, SqliteSink, ParquetSink)}
+
+
+def open_sink(spec: str) -> ExamSink:
+    """Sink for a "kind:path" spec (ValueError / RuntimeError if it can't be used)."""
+    kind, sep, path = spec.partition(":")
+    if not sep or not path or kind.lower() not in SINKS:
+        raise ValueError(f"--output expects {' / '.join(k + ':PATH' for k in SINKS)}, got {spec!r}")
+    return SINKS[kind.lower()](path)
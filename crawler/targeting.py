@@ -0,0 +1,112 @@
+"""
+Notification Targeting
+-----------------------
+In-memory index of student interests, so a new exam is only mailed to the
+students it is relevant to instead of every active profile.
+
+Signals (all loaded in bulk, once per run):
+  - profiles.state / profiles.interests
+  - the level, state and organization of exams in saved_exams
+  - the same for exam_reminders
+
+Matching rules for a new exam:
+  - students following its organization always match
+  - State exams   → students whose profile or history points at that state
+  - Central exams → students with Central exams in their history, plus
+                    students with no exam history yet (no preference known)
+  - any profile interest that appears in the exam name / organization matches
+"""
+from __future__ import annotations
+
+import logging
+import re
+from collections import defaultdict
+
+from database import get_student_interest_rows
+
+logger = logging.getLogger(__name__)
+
+
+def _norm(text: str | None) -> str:
+    """Lower-case, drop "(ABBR)" suffixes and collapse whitespace."""
+    if not text:
+        return ""
+    return " ".join(re.sub(r"\(.*?\)", " ", text).lower().split())
+
+
+class StudentIndex:
+    def __init__(self):
+        self.students: dict[str, dict] = {}
+        self.by_state: dict[str, set[str]] = defaultdict(set)
+        self.by_org: dict[str, set[str]] = defaultdict(set)
+        self.by_interest: dict[str, set[str]] = defaultdict(set)
+        self.central: set[str] = set()
+        self._with_history: set[str] = set()
+
+    # ── Build ────────────────────────────────────────────────────────────────
+    @classmethod
+    def load(cls) -> "StudentIndex":
+        """Build the index from one bulk read of profiles, saved_exams and exam_reminders."""
+        profiles, saved, reminders = get_student_interest_rows()
+        index = cls()
+        for profile in profiles:
+            index.add_profile(profile)
+        for row in (*saved, *reminders):
+            index.add_history(row.get("student_id"), row.get("exams") or {})
+        logger.info(
+            "Interest index: %d student(s), %d state(s), %d organization(s)",
+            len(index.students), len(index.by_state), len(index.by_org),
+        )
+        return index
+
+    def add_profile(self, profile: dict) -> None:
+        sid = profile.get("id")
+        if not sid or not (profile.get("email") or "").strip():
+            return
+        self.students[sid] = {
+            "id": sid,
+            "email": profile["email"],
+            "full_name": profile.get("full_name"),
+        }
+        state = _norm(profile.get("state"))
+        if state:
+            self.by_state[state].add(sid)
+        for interest in profile.get("interests") or []:
+            term = _norm(interest)
+            if len(term) >= 3:
+                self.by_interest[term].add(sid)
+
+    def add_history(self, sid: str | None, exam: dict) -> None:
+        if not sid:
+            return
+        self._with_history.add(sid)
+        org = _norm(exam.get("organization"))
+        if org:
+            self.by_org[org].add(sid)
+        if exam.get("level") == "State":
+            state = _norm(exam.get("state"))
+            if state:
+                self.by_state[state].add(sid)
+        else:
+            self.central.add(sid)
+
+    # ── Match ────────────────────────────────────────────────────────────────
+    def match(self, exam: dict) -> list[dict]:
+        """Return the student dicts (id, email, full_name) relevant to `exam`."""
+        ids = set(self.by_org.get(_norm(exam.get("organization")), ()))
+
+        if exam.get("level") == "State":
+            ids |= self.by_state.get(_norm(exam.get("state")), set())
+        else:
+            ids |= self.central
+            ids |= self.students.keys() - self._with_history
+
+        haystack = _norm(f"{exam.get('exam_name', '')} {exam.get('organization', '')}")
+        for term, sids in self.by_interest.items():
+            if term in haystack:
+                ids |= sids
+
+        return [self.students[sid] for sid in ids if sid in self.students]
+
+    def __len__(self) -> int:
+        return len(self.students)
@@ -0,0 +1,132 @@
+"""
+Exam Status Transitions
+------------------------
+Moves exams between Coming Soon / Open / Closed as their dates pass,
+without sweeping the whole exams table.
+
+One bulk read of the exams that can still change (active, not Closed)
+builds a min-heap of their upcoming transitions:
+
+  application_start_date      → Open
+  application_last_date + 1   → Closed
+  (start date in the future   → Coming Soon, due at once, if not already)
+
+`apply()` pops only the transitions that are due and writes them as one
+targeted UPDATE per target status (ids batched), so the work grows with the
+number of transitions, not with the table. Each UPDATE re-checks the dates
+in its WHERE clause, so an entry made stale by a later upsert is a no-op.
+The daemon keeps one heap and reloads it once a day.
+
+Counts are reported as {"closed_count", "opened_count", "coming_soon_count"},
+the shape of the update_exam_statuses() SQL function they replace; the
+webhook route skips that function when a run reports them. When an UPDATE
+fails, its transitions go back on the heap for the next apply() and no
+counts are reported, so the route runs its own sweep.
+"""
+from __future__ import annotations
+
+import heapq
+import logging
+from datetime import date, timedelta
+from typing import Optional
+
+from database import get_status_rows, set_exam_status
+
+logger = logging.getLogger(__name__)
+
+OPEN, CLOSED, COMING_SOON = "Open", "Closed", "Coming Soon"
+
+# Same-day order: Closed wins over Open (a one-day window that already passed)
+_RANK = {COMING_SOON: 0, OPEN: 1, CLOSED: 2}
+_COUNT_KEYS = {CLOSED: "closed_count", OPEN: "opened_count", COMING_SOON: "coming_soon_count"}
+
+
+def _parse(value) -> Optional[date]:
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+class StatusTransitions:
+    def __init__(self):
+        self._heap: list[tuple[date, int, str, str]] = []   # (due, rank, exam id, status)
+        self._status: dict[str, str] = {}                    # exam id → status as last known
+        self.loaded_on: Optional[date] = None
+
+    def load(self, today: Optional[date] = None) -> "StatusTransitions":
+        """(Re)build the heap from one bulk read of the exams that can still change."""
+        today = today or date.today()
+        self._heap = []
+        self._status = {}
+        for row in get_status_rows():
+            self.add(row["id"], row.get("status"), row.get("application_start_date"),
+                     row.get("application_last_date"), today)
+        heapq.heapify(self._heap)
+        self.loaded_on = today
+        logger.debug("Status transitions: %d pending for %d exam(s)", len(self._heap), len(self._status))
+        return self
+
+    def add(self, exam_id: str, status: str | None, start, last, today: Optional[date] = None) -> None:
+        """Queue the transitions of one exam (its current status as `status`)."""
+        today = today or date.today()
+        start, last = _parse(start), _parse(last)
+        self._status[exam_id] = status or OPEN
+        events = []
+        if start and start > today and status not in (COMING_SOON, CLOSED):
+            events.append((today, COMING_SOON))
+        if start:
+            events.append((start, OPEN))
+        elif status == COMING_SOON:
+            events.append((today, OPEN))   # nothing left to wait for
+        if last:
+            events.append((last + timedelta(days=1), CLOSED))
+        for due, target in events:
+            heapq.heappush(self._heap, (due, _RANK[target], exam_id, target))
+
+    def pending(self) -> int:
+        return len(self._heap)
+
+    def next_due(self) -> Optional[date]:
+        return self._heap[0][0] if self._heap else None
+
+    def apply(self, today: Optional[date] = None, dry_run: bool = False) -> Optional[dict]:
+        """
+        Write every transition due by `today`. Returns the counts per target
+        status, or None when an UPDATE failed (its transitions are re-queued).
+        """
+        today = today or date.today()
+        final: dict[str, str] = {}
+        while self._heap and self._heap[0][0] <= today:
+            _, _, exam_id, target = heapq.heappop(self._heap)
+            final[exam_id] = target   # popped in date order: the latest due one wins
+
+        by_status: dict[str, list[str]] = {}
+        for exam_id, target in final.items():
+            current = self._status.get(exam_id)
+            # Open only follows Coming Soon, like the SQL function; Closed is final
+            if current == target or current == CLOSED or (target == OPEN and current != COMING_SOON):
+                continue
+            by_status.setdefault(target, []).append(exam_id)
+
+        counts = {key: 0 for key in _COUNT_KEYS.values()}
+        failed = 0
+        for target, ids in by_status.items():
+            changed, retry = (ids, []) if dry_run else set_exam_status(ids, target, today)
+            counts[_COUNT_KEYS[target]] = len(changed)
+            for exam_id in changed:
+                self._status[exam_id] = target
+            for exam_id in retry:
+                heapq.heappush(self._heap, (today, _RANK[target], exam_id, target))
+            failed += len(retry)
+        if any(counts.values()):
+            logger.info(
+                "Status transitions: %d closed, %d opened, %d coming soon",
+                counts["closed_count"], counts["opened_count"], counts["coming_soon_count"],
+            )
+        if failed:
+            logger.warning("Status transitions: %d not written, retried next time", failed)
+            return None
+        return counts
@@ -3,11 +3,29 @@ Webhook Pusher
 --------------
 After the crawler finishes, push results to the Next.js webhook endpoint
 so the web app's crawler_runs table stays in sync.
+
+Only exams inserted or changed in this run are pushed. The payload is
+split into size-bounded chunks that share one run id, and every chunk is
+gzip-compressed, so the receiving route stays inside its time limit.
+
+Every chunk carries an Idempotency-Key ("<run_id>:<chunk_index>"). Chunks
+that cannot be delivered are spooled to STATE_DIR/webhook_spool and retried
+with backoff at the start of the next run (in the background) or by
+`python main.py --flush-webhooks`; replays are de-duplicated by the key.
 """
+import gzip
+import json
 import logging
 import os
+import threading
+import time
+import uuid
+from pathlib import Path
+
 import requests
-from config import SUPABASE_URL
+
+from config import STATE_DIR
+from records import to_jsonable
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +36,13 @@ WEBHOOK_URL: str = os.environ.get(
     "https://apc-foundation.vercel.app/api/crawler/webhook"
 )
 CRON_SECRET: str = os.environ.get("CRON_SECRET", "")
+# Upper bound on the uncompressed exams JSON per request
+WEBHOOK_CHUNK_BYTES: int = int(os.environ.get("WEBHOOK_CHUNK_BYTES", 256 * 1024))
+
+SPOOL_DIR: Path = STATE_DIR / "webhook_spool"
+WEBHOOK_RETRY_ROUNDS: int        = int(os.environ.get("WEBHOOK_RETRY_ROUNDS", 4))
+WEBHOOK_RETRY_BASE_DELAY: float  = float(os.environ.get("WEBHOOK_RETRY_BASE_DELAY", 5.0))
+WEBHOOK_SPOOL_MAX_ATTEMPTS: int  = int(os.environ.get("WEBHOOK_SPOOL_MAX_ATTEMPTS", 20))
 
 
 def push_results(
@@ -25,49 +50,178 @@ def push_results(
     exams: list[dict],
     stats: dict,
     error_log: str = "",
+    run_id: str = "",
+    status_changes: dict | None = None,
 ) -> bool:
     """
     Push crawler results to the Next.js webhook endpoint.
-    Returns True if successful.
+    `exams` should hold only the exams inserted or changed in this run.
+    `status_changes` are the run's status transition counts (see
+    transitions.py); when given, the route does not sweep statuses itself.
+    Returns True if every chunk was accepted.
     """
     if not CRON_SECRET:
         logger.warning("CRON_SECRET not set — skipping webhook push.")
         return False
 
-    payload = {
-        "scrapers": scrapers,
-        "exams": exams,
-        "stats": stats,
-        "error_log": error_log,
-    }
+    run_id = run_id or str(uuid.uuid4())
+    chunks = _chunk_exams(exams, WEBHOOK_CHUNK_BYTES)
+    ok = True
+    for index, chunk in enumerate(chunks):
+        payload = {
+            "run_id": run_id,
+            "chunk_index": index,
+            "chunk_count": len(chunks),
+            "scrapers": scrapers,
+            "exams": chunk,
+            "stats": stats,
+            "error_log": error_log,
+        }
+        if status_changes is not None:
+            payload["status_changes"] = status_changes
+        body = gzip.compress(
+            json.dumps(payload, default=to_jsonable, ensure_ascii=False).encode("utf-8"),
+            compresslevel=6,
+        )
+        key = f"{run_id}:{index}"
+        if not _post(body, key, f"chunk {index + 1}/{len(chunks)}, {len(chunk)} exam(s)"):
+            _spool(key, body)
+            ok = False
+    return ok
+
+
+def _chunk_exams(exams: list[dict], limit: int) -> list[list[dict]]:
+    """
+    Split exams so each chunk's JSON stays under `limit` bytes.
+    Always returns at least one (possibly empty) chunk so the run is recorded.
+    """
+    chunks: list[list[dict]] = [[]]
+    size = 0
+    for exam in exams:
+        n = len(json.dumps(exam, default=to_jsonable, ensure_ascii=False).encode("utf-8")) + 1
+        if chunks[-1] and size + n > limit:
+            chunks.append([])
+            size = 0
+        chunks[-1].append(exam)
+        size += n
+    return chunks
 
+
+def _post(body: bytes, key: str, label: str) -> bool:
+    """POST one gzip-compressed chunk. Returns True if the webhook accepted it."""
     try:
         resp = requests.post(
             WEBHOOK_URL,
-            json=payload,
+            data=body,
             headers={
                 "Authorization": f"Bearer {CRON_SECRET}",
                 "Content-Type": "application/json",
+                "Content-Encoding": "gzip",
+                "Idempotency-Key": key,
             },
             timeout=30,
         )
         if resp.ok:
             data = resp.json()
             logger.info(
-                "Webhook push OK: new=%d, updated=%d, errors=%d, run_id=%s",
+                "Webhook push OK (%s, %d bytes): new=%d, updated=%d, errors=%d, run_id=%s%s",
+                label,
+                len(body),
                 data.get("new", 0),
                 data.get("updated", 0),
                 data.get("errors", 0),
                 data.get("run_id", ""),
+                " (duplicate)" if data.get("duplicate") else "",
             )
             return True
         else:
             logger.error(
-                "Webhook push failed: HTTP %d — %s",
+                "Webhook push failed (%s): HTTP %d — %s",
+                label,
                 resp.status_code,
                 resp.text[:500],
             )
             return False
     except Exception as exc:
-        logger.error("Webhook push exception: %s", exc)
+        logger.error("Webhook push exception (%s): %s", label, exc)
         return False
+
+
+# ── Spool ────────────────────────────────────────────────────────────────────
+# File name: "<run_id>__<chunk_index>.<attempts>.json.gz"
+def _spool_path(key: str, attempts: int) -> Path:
+    return SPOOL_DIR / f"{key.replace(':', '__')}.{attempts}.json.gz"
+
+
+def _parse_spool_path(path: Path) -> tuple[str, int]:
+    stem, attempts = path.name[: -len(".json.gz")].rsplit(".", 1)
+    return stem.replace("__", ":"), int(attempts)
+
+
+def _spool(key: str, body: bytes) -> None:
+    try:
+        SPOOL_DIR.mkdir(parents=True, exist_ok=True)
+        path = _spool_path(key, 0)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(body)
+        tmp.replace(path)
+        logger.warning("Spooled webhook chunk %s for retry → %s", key, path.name)
+    except OSError as exc:
+        logger.error("Could not spool webhook chunk %s: %s", key, exc)
+
+
+def spooled_count() -> int:
+    return len(list(SPOOL_DIR.glob("*.json.gz"))) if SPOOL_DIR.exists() else 0
+
+
+def flush_spool(
+    rounds: int = WEBHOOK_RETRY_ROUNDS,
+    base_delay: float = WEBHOOK_RETRY_BASE_DELAY,
+) -> int:
+    """
+    Retry spooled chunks, oldest first, sleeping base_delay × 2^n between
+    rounds. Chunks still failing after WEBHOOK_SPOOL_MAX_ATTEMPTS attempts
+    (across runs) are renamed to *.dead. Returns the number delivered.
+    """
+    if not CRON_SECRET or not SPOOL_DIR.exists():
+        return 0
+
+    delivered = 0
+    for round_no in range(rounds):
+        pending = sorted(SPOOL_DIR.glob("*.json.gz"), key=lambda p: p.stat().st_mtime)
+        if not pending:
+            break
+        if round_no:
+            time.sleep(base_delay * 2 ** (round_no - 1))
+
+        for path in pending:
+            try:
+                key, attempts = _parse_spool_path(path)
+                body = path.read_bytes()
+            except (OSError, ValueError):
+                continue   # claimed by a concurrent flush, or not ours
+            try:
+                if _post(body, key, f"spooled {key}, attempt {attempts + 1}"):
+                    path.unlink()
+                    delivered += 1
+                elif attempts + 1 >= WEBHOOK_SPOOL_MAX_ATTEMPTS:
+                    path.rename(path.with_name(path.name + ".dead"))
+                    logger.error("Giving up on webhook chunk %s after %d attempts", key, attempts + 1)
+                else:
+                    path.rename(_spool_path(key, attempts + 1))
+            except FileNotFoundError:
+                pass
+
+    if delivered:
+        logger.info("Delivered %d spooled webhook chunk(s); %d still pending", delivered, spooled_count())
+    return delivered
+
+
+def flush_spool_async() -> threading.Thread:
+    """
+    Flush the spool on a daemon thread so it never delays the run or its exit.
+    Anything still unsent when the process exits stays spooled for next time.
+    """
+    thread = threading.Thread(target=flush_spool, name="webhook-spool", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,460 @@
+"""
+Work Queue
+-----------
+Lease-based job queue for sharded crawling (`main.py --coordinator` /
+`main.py --worker`). Several processes or machines pull jobs, each job is
+leased for a limited time, and a job whose lease expires (worker crashed,
+machine gone) is handed to the next worker, up to WORKQUEUE_MAX_ATTEMPTS.
+
+Job kinds:
+  scraper → key = scraper name;  result = {"exams": [...]}
+  detail  → key = detail URL;    result = {"dates": {...}, "pdf_url": ...}
+
+Backends (WORKQUEUE_URL):
+  sqlite:///path/to/queue.sqlite3   default, STATE_DIR/workqueue.sqlite3
+  postgres                          the DB_* settings (table crawler.jobs)
+  memory                            in-process stand-in (single process / tests)
+"""
+from __future__ import annotations
+
+import abc
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import config
+from config import STATE_DIR, WORKQUEUE_MAX_ATTEMPTS, WORKQUEUE_URL
+from records import to_jsonable
+
+logger = logging.getLogger(__name__)
+
+
+class WorkQueue(abc.ABC):
+    """Interface shared by all backends."""
+
+    max_attempts: int = WORKQUEUE_MAX_ATTEMPTS
+
+    @abc.abstractmethod
+    def enqueue(self, run_id: str, kind: str, key: str, payload: dict | None = None) -> None:
+        ...
+
+    @abc.abstractmethod
+    def lease(self, worker: str, lease_seconds: float, run_id: str | None = None) -> Optional[dict]:
+        """
+        Claim the oldest available job (of run `run_id` only, if given) →
+        {"id", "run_id", "kind", "key", "payload", "attempts"}.
+        """
+
+    @abc.abstractmethod
+    def renew(self, job_id: int, worker: str, lease_seconds: float) -> bool:
+        ...
+
+    @abc.abstractmethod
+    def complete(self, job_id: int, worker: str, result: dict) -> bool:
+        ...
+
+    @abc.abstractmethod
+    def fail(self, job_id: int, worker: str, error: str) -> None:
+        ...
+
+    @abc.abstractmethod
+    def cancel(self, run_id: str, reason: str) -> int:
+        """Fail the run's pending and leased jobs, so no worker picks them up. Returns how many."""
+
+    @abc.abstractmethod
+    def outstanding(self, run_id: str) -> int:
+        """Jobs of the run that are still pending or leased."""
+
+    @abc.abstractmethod
+    def results(self, run_id: str, kind: str) -> list[dict]:
+        """Finished jobs of a kind → [{"key", "status", "result", "error"}] (done and failed)."""
+
+    @abc.abstractmethod
+    def result(self, run_id: str, kind: str, key: str) -> Optional[dict]:
+        ...
+
+    def close(self) -> None:
+        pass
+
+
+# ── In-process ───────────────────────────────────────────────────────────────
+class MemoryWorkQueue(WorkQueue):
+    def __init__(self):
+        self._jobs: dict[int, dict] = {}
+        self._index: dict[tuple[str, str, str], int] = {}
+        self._lock = threading.Lock()
+        self._next_id = 1
+
+    def enqueue(self, run_id, kind, key, payload=None):
+        with self._lock:
+            if (run_id, kind, key) in self._index:
+                return
+            job_id, self._next_id = self._next_id, self._next_id + 1
+            self._index[(run_id, kind, key)] = job_id
+            self._jobs[job_id] = {
+                "id": job_id, "run_id": run_id, "kind": kind, "key": key,
+                "payload": payload or {}, "status": "pending", "attempts": 0,
+                "worker": None, "lease_until": 0.0, "result": None, "error": None,
+            }
+
+    def lease(self, worker, lease_seconds, run_id=None):
+        now = time.time()
+        with self._lock:
+            for job in self._jobs.values():
+                if run_id is not None and job["run_id"] != run_id:
+                    continue
+                available = job["status"] == "pending" or (
+                    job["status"] == "leased" and job["lease_until"] < now
+                )
+                if not available:
+                    continue
+                if job["attempts"] >= self.max_attempts:
+                    job["status"], job["error"] = "failed", job["error"] or "lease expired too often"
+                    continue
+                job.update(status="leased", worker=worker, lease_until=now + lease_seconds,
+                           attempts=job["attempts"] + 1)
+                return {k: job[k] for k in ("id", "run_id", "kind", "key", "payload", "attempts")}
+        return None
+
+    def renew(self, job_id, worker, lease_seconds):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job or job["status"] != "leased" or job["worker"] != worker:
+                return False
+            job["lease_until"] = time.time() + lease_seconds
+            return True
+
+    def complete(self, job_id, worker, result):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job or job["status"] != "leased" or job["worker"] != worker:
+                return False
+            job.update(status="done", result=result)
+            return True
+
+    def fail(self, job_id, worker, error):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job or job["worker"] != worker:
+                return
+            job["error"] = error
+            job["status"] = "failed" if job["attempts"] >= self.max_attempts else "pending"
+
+    def cancel(self, run_id, reason):
+        with self._lock:
+            jobs = [j for j in self._jobs.values()
+                    if j["run_id"] == run_id and j["status"] in ("pending", "leased")]
+            for job in jobs:
+                job.update(status="failed", error=reason)
+            return len(jobs)
+
+    def outstanding(self, run_id):
+        with self._lock:
+            return sum(1 for j in self._jobs.values()
+                       if j["run_id"] == run_id and j["status"] in ("pending", "leased"))
+
+    def results(self, run_id, kind):
+        with self._lock:
+            return [
+                {"key": j["key"], "status": j["status"], "result": j["result"], "error": j["error"]}
+                for j in self._jobs.values()
+                if j["run_id"] == run_id and j["kind"] == kind and j["status"] in ("done", "failed")
+            ]
+
+    def result(self, run_id, kind, key):
+        with self._lock:
+            job = self._jobs.get(self._index.get((run_id, kind, key), -1))
+            return job["result"] if job and job["status"] == "done" else None
+
+
+# ── SQLite ───────────────────────────────────────────────────────────────────
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id      TEXT NOT NULL,
+    kind        TEXT NOT NULL,
+    key         TEXT NOT NULL,
+    payload     TEXT,
+    status      TEXT NOT NULL DEFAULT 'pending',
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    worker      TEXT,
+    lease_until REAL NOT NULL DEFAULT 0,
+    result      TEXT,
+    error       TEXT,
+    UNIQUE (run_id, kind, key)
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, id);
+"""
+
+
+class SQLiteWorkQueue(WorkQueue):
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SQLITE_SCHEMA)
+
+    def enqueue(self, run_id, kind, key, payload=None):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR IGNORE INTO jobs (run_id, kind, key, payload) VALUES (?, ?, ?, ?)",
+                (run_id, kind, key, json.dumps(payload or {})),
+            )
+
+    def lease(self, worker, lease_seconds, run_id=None):
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                while True:
+                    row = self._db.execute(
+                        """
+                        SELECT id, run_id, kind, key, payload, attempts FROM jobs
+                        WHERE (status = 'pending' OR (status = 'leased' AND lease_until < ?))
+                          AND (? IS NULL OR run_id = ?)
+                        ORDER BY id LIMIT 1
+                        """,
+                        (now, run_id, run_id),
+                    ).fetchone()
+                    if row is None:
+                        self._db.execute("COMMIT")
+                        return None
+                    job_id, job_run_id, kind, key, payload, attempts = row
+                    if attempts >= self.max_attempts:
+                        self._db.execute(
+                            "UPDATE jobs SET status = 'failed', error = COALESCE(error, 'lease expired too often') WHERE id = ?",
+                            (job_id,),
+                        )
+                        continue
+                    self._db.execute(
+                        "UPDATE jobs SET status = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1 WHERE id = ?",
+                        (worker, now + lease_seconds, job_id),
+                    )
+                    self._db.execute("COMMIT")
+                    return {"id": job_id, "run_id": job_run_id, "kind": kind, "key": key,
+                            "payload": json.loads(payload or "{}"), "attempts": attempts + 1}
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def renew(self, job_id, worker, lease_seconds):
+        with self._lock:
+            cur = self._db.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+                (time.time() + lease_seconds, job_id, worker),
+            )
+            return cur.rowcount == 1
+
+    def complete(self, job_id, worker, result):
+        with self._lock:
+            cur = self._db.execute(
+                "UPDATE jobs SET status = 'done', result = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+                (json.dumps(result, default=to_jsonable), job_id, worker),
+            )
+            return cur.rowcount == 1
+
+    def fail(self, job_id, worker, error):
+        with self._lock:
+            self._db.execute(
+                """
+                UPDATE jobs SET error = ?,
+                       status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END
+                WHERE id = ? AND worker = ?
+                """,
+                (error[:2000], self.max_attempts, job_id, worker),
+            )
+
+    def cancel(self, run_id, reason):
+        with self._lock:
+            return self._db.execute(
+                "UPDATE jobs SET status = 'failed', error = ? WHERE run_id = ? AND status IN ('pending', 'leased')",
+                (reason, run_id),
+            ).rowcount
+
+    def outstanding(self, run_id):
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM jobs WHERE run_id = ? AND status IN ('pending', 'leased')",
+                (run_id,),
+            ).fetchone()[0]
+
+    def results(self, run_id, kind):
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT key, status, result, error FROM jobs WHERE run_id = ? AND kind = ? AND status IN ('done', 'failed') ORDER BY id",
+                (run_id, kind),
+            ).fetchall()
+        return [{"key": k, "status": s, "result": json.loads(r) if r else None, "error": e} for k, s, r, e in rows]
+
+    def result(self, run_id, kind, key):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT result FROM jobs WHERE run_id = ? AND kind = ? AND key = ? AND status = 'done'",
+                (run_id, kind, key),
+            ).fetchone()
+        return json.loads(row[0]) if row and row[0] else None
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+# ── Postgres ─────────────────────────────────────────────────────────────────
+_PG_SCHEMA = """
+CREATE SCHEMA IF NOT EXISTS crawler;
+CREATE TABLE IF NOT EXISTS crawler.jobs (
+    id          bigserial PRIMARY KEY,
+    run_id      text NOT NULL,
+    kind        text NOT NULL,
+    key         text NOT NULL,
+    payload     jsonb NOT NULL DEFAULT '{}'::jsonb,
+    status      text NOT NULL DEFAULT 'pending',
+    attempts    int NOT NULL DEFAULT 0,
+    worker      text,
+    lease_until double precision NOT NULL DEFAULT 0,
+    result      jsonb,
+    error       text,
+    created_at  timestamptz NOT NULL DEFAULT now(),
+    UNIQUE (run_id, kind, key)
+);
+CREATE INDEX IF NOT EXISTS idx_crawler_jobs_status ON crawler.jobs(status, id);
+"""
+
+
+class PostgresWorkQueue(WorkQueue):
+    """
+    Shared queue on the project's Postgres (DB_* settings). Lives in its own
+    `crawler` schema, which PostgREST does not expose.
+    """
+
+    def __init__(self):
+        import psycopg2
+
+        self._lock = threading.Lock()
+        self._conn = psycopg2.connect(
+            host=config.DB_HOST, port=config.DB_PORT, dbname=config.DB_NAME,
+            user=config.DB_USER, password=config.DB_PASSWORD,
+        )
+        self._conn.autocommit = True
+        with self._conn.cursor() as cur:
+            cur.execute(_PG_SCHEMA)
+
+    def _exec(self, sql: str, params: tuple = (), fetch: str | None = None):
+        with self._lock, self._conn.cursor() as cur:
+            cur.execute(sql, params)
+            if fetch == "one":
+                return cur.fetchone()
+            if fetch == "all":
+                return cur.fetchall()
+            return cur.rowcount
+
+    def enqueue(self, run_id, kind, key, payload=None):
+        self._exec(
+            "INSERT INTO crawler.jobs (run_id, kind, key, payload) VALUES (%s, %s, %s, %s) ON CONFLICT DO NOTHING",
+            (run_id, kind, key, json.dumps(payload or {})),
+        )
+
+    def lease(self, worker, lease_seconds, run_id=None):
+        now = time.time()
+        # Jobs whose lease expired too often are failed first, then one job is claimed.
+        self._exec(
+            """
+            UPDATE crawler.jobs SET status = 'failed', error = COALESCE(error, 'lease expired too often')
+            WHERE status = 'leased' AND lease_until < %s AND attempts >= %s
+            """,
+            (now, self.max_attempts),
+        )
+        row = self._exec(
+            """
+            UPDATE crawler.jobs SET status = 'leased', worker = %s, lease_until = %s, attempts = attempts + 1
+            WHERE id = (
+                SELECT id FROM crawler.jobs
+                WHERE (status = 'pending' OR (status = 'leased' AND lease_until < %s))
+                  AND (%s::text IS NULL OR run_id = %s)
+                ORDER BY id
+                FOR UPDATE SKIP LOCKED
+                LIMIT 1
+            )
+            RETURNING id, run_id, kind, key, payload, attempts
+            """,
+            (worker, now + lease_seconds, now, run_id, run_id),
+            fetch="one",
+        )
+        if row is None:
+            return None
+        job_id, job_run_id, kind, key, payload, attempts = row
+        return {"id": job_id, "run_id": job_run_id, "kind": kind, "key": key,
+                "payload": payload or {}, "attempts": attempts}
+
+    def renew(self, job_id, worker, lease_seconds):
+        return self._exec(
+            "UPDATE crawler.jobs SET lease_until = %s WHERE id = %s AND worker = %s AND status = 'leased'",
+            (time.time() + lease_seconds, job_id, worker),
+        ) == 1
+
+    def complete(self, job_id, worker, result):
+        return self._exec(
+            "UPDATE crawler.jobs SET status = 'done', result = %s WHERE id = %s AND worker = %s AND status = 'leased'",
+            (json.dumps(result, default=to_jsonable), job_id, worker),
+        ) == 1
+
+    def fail(self, job_id, worker, error):
+        self._exec(
+            """
+            UPDATE crawler.jobs SET error = %s,
+                   status = CASE WHEN attempts >= %s THEN 'failed' ELSE 'pending' END
+            WHERE id = %s AND worker = %s
+            """,
+            (error[:2000], self.max_attempts, job_id, worker),
+        )
+
+    def cancel(self, run_id, reason):
+        return self._exec(
+            "UPDATE crawler.jobs SET status = 'failed', error = %s WHERE run_id = %s AND status IN ('pending', 'leased')",
+            (reason, run_id),
+        )
+
+    def outstanding(self, run_id):
+        return self._exec(
+            "SELECT COUNT(*) FROM crawler.jobs WHERE run_id = %s AND status IN ('pending', 'leased')",
+            (run_id,),
+            fetch="one",
+        )[0]
+
+    def results(self, run_id, kind):
+        rows = self._exec(
+            "SELECT key, status, result, error FROM crawler.jobs WHERE run_id = %s AND kind = %s AND status IN ('done', 'failed') ORDER BY id",
+            (run_id, kind),
+            fetch="all",
+        )
+        return [{"key": k, "status": s, "result": r, "error": e} for k, s, r, e in rows]
+
+    def result(self, run_id, kind, key):
+        row = self._exec(
+            "SELECT result FROM crawler.jobs WHERE run_id = %s AND kind = %s AND key = %s AND status = 'done'",
+            (run_id, kind, key),
+            fetch="one",
+        )
+        return row[0] if row else None
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_queue(url: str = WORKQUEUE_URL) -> WorkQueue:
+    """Open the queue backend named by `url` (see module docstring)."""
+    if url == "memory":
+        return MemoryWorkQueue()
+    if url in ("postgres", "postgresql"):
+        return PostgresWorkQueue()
+    if url.startswith("sqlite:///"):
+        return SQLiteWorkQueue(Path(url[len("sqlite:///"):]))
+    if not url:
+        return SQLiteWorkQueue(STATE_DIR / "workqueue.sqlite3")
+    raise ValueError(f"Unknown WORKQUEUE_URL: {url!r}")
@@ -0,0 +1,93 @@
+-- ============================================================
+-- Migration 008: Exam Reminder Deliveries + Due-Reminder Query
+-- ============================================================
+
+-- One row per reminder email actually sent, so a reminder is never sent twice.
+-- target_date is part of the key: if an exam's date moves, the student is
+-- reminded again for the new date.
+CREATE TABLE IF NOT EXISTS exam_reminder_deliveries (
+  id           uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+  reminder_id  uuid NOT NULL REFERENCES exam_reminders(id) ON DELETE CASCADE,
+  kind         text NOT NULL CHECK (kind IN ('application_deadline', 'exam_date')),
+  target_date  date NOT NULL,
+  sent_at      timestamptz NOT NULL DEFAULT now(),
+  UNIQUE (reminder_id, kind, target_date)
+);
+
+CREATE INDEX IF NOT EXISTS idx_exams_last_date ON exams(application_last_date) WHERE is_active;
+CREATE INDEX IF NOT EXISTS idx_exams_exam_date ON exams(exam_date) WHERE is_active;
+
+-- Only the crawler (service role, bypasses RLS) reads or writes deliveries
+ALTER TABLE exam_reminder_deliveries ENABLE ROW LEVEL SECURITY;
+
+-- ============================================================
+-- DB function: reminders due inside the next p_window_days days
+-- Called by the crawler in --reminders mode.
+-- Keyset-paged by student: pass the last student_id of the
+-- previous page as p_after_student. p_student (with p_limit NULL)
+-- returns all of one student's due rows, for a student whose
+-- reminders fill a whole page.
+-- ============================================================
+CREATE OR REPLACE FUNCTION due_exam_reminders(
+  p_window_days   int  DEFAULT 3,
+  p_limit         int  DEFAULT 500,
+  p_after_student uuid DEFAULT NULL,
+  p_student       uuid DEFAULT NULL
+)
+RETURNS TABLE(
+  reminder_id            uuid,
+  kind                   text,
+  target_date            date,
+  student_id             uuid,
+  email                  text,
+  full_name              text,
+  exam_id                uuid,
+  exam_name              text,
+  organization           text,
+  official_website       text,
+  application_last_date  date,
+  exam_date              date
+)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+AS $$
+  WITH due AS (
+    SELECT r.id AS reminder_id, 'application_deadline'::text AS kind,
+           e.application_last_date AS target_date, r.student_id, r.exam_id
+    FROM exam_reminders r
+    JOIN exams e ON e.id = r.exam_id
+    WHERE r.reminder_type IN ('application_deadline', 'both')
+      AND e.is_active = true
+      AND e.application_last_date BETWEEN CURRENT_DATE AND CURRENT_DATE + p_window_days
+
+    UNION ALL
+
+    SELECT r.id, 'exam_date'::text, e.exam_date, r.student_id, r.exam_id
+    FROM exam_reminders r
+    JOIN exams e ON e.id = r.exam_id
+    WHERE r.reminder_type IN ('exam_date', 'both')
+      AND e.is_active = true
+      AND e.exam_date BETWEEN CURRENT_DATE AND CURRENT_DATE + p_window_days
+  )
+  SELECT d.reminder_id, d.kind, d.target_date,
+         p.id, p.email, p.full_name,
+         e.id, e.exam_name, e.organization, e.official_website,
+         e.application_last_date, e.exam_date
+  FROM due d
+  JOIN profiles p ON p.id = d.student_id AND p.is_active = true
+  JOIN exams    e ON e.id = d.exam_id
+  WHERE (p_after_student IS NULL OR d.student_id > p_after_student)
+    AND (p_student IS NULL OR d.student_id = p_student)
+    AND NOT EXISTS (
+      SELECT 1 FROM exam_reminder_deliveries x
+      WHERE x.reminder_id = d.reminder_id
+        AND x.kind        = d.kind
+        AND x.target_date = d.target_date
+    )
+  ORDER BY d.student_id, d.target_date
+  LIMIT p_limit;
+$$;
+
+-- Returns student emails — keep it away from the public API roles
+REVOKE ALL ON FUNCTION due_exam_reminders(int, int, uuid, uuid) FROM PUBLIC, anon, authenticated;
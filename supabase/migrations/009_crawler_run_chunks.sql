@@ -0,0 +1,74 @@
+-- ============================================================
+-- Migration 009: Crawler Run Chunks + Atomic Chunk Accounting
+-- ============================================================
+
+-- One row per webhook chunk accounted into a run, keyed by the chunk's
+-- Idempotency-Key ("<run_id>:<chunk_index>"), so a retried chunk is never
+-- counted twice — even when it arrives while the first attempt is in flight.
+CREATE TABLE IF NOT EXISTS crawler_run_chunks (
+  run_id       uuid NOT NULL REFERENCES crawler_runs(id) ON DELETE CASCADE,
+  chunk_key    text NOT NULL,
+  received_at  timestamptz NOT NULL DEFAULT now(),
+  PRIMARY KEY (run_id, chunk_key)
+);
+
+-- Only the webhook route (service role, bypasses RLS) reads or writes chunks
+ALTER TABLE crawler_run_chunks ENABLE ROW LEVEL SECURITY;
+
+-- ============================================================
+-- DB function: record one chunk and add its counters to the run
+-- Called by /api/crawler/webhook after the chunk's exams are written.
+-- The run row is locked first, so chunks of one run are accounted one
+-- at a time: exactly one call sees received = chunk_count.
+-- p_chunk_key NULL adds the counters without recording a chunk
+-- (legacy payloads, failed chunks that the crawler will retry).
+-- ============================================================
+CREATE OR REPLACE FUNCTION record_crawler_chunk(
+  p_run_id      uuid,
+  p_chunk_key   text,
+  p_found       int  DEFAULT 0,
+  p_new         int  DEFAULT 0,
+  p_updated     int  DEFAULT 0,
+  p_errors      int  DEFAULT 0,
+  p_error_log   text DEFAULT NULL,
+  p_duration_ms int  DEFAULT 0
+)
+RETURNS TABLE(duplicate boolean, received int, total_errors int)
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+  v_inserted int := 1;
+  v_errors   int;
+BEGIN
+  PERFORM 1 FROM crawler_runs WHERE id = p_run_id FOR UPDATE;
+  IF NOT FOUND THEN
+    RAISE EXCEPTION 'crawler run % does not exist', p_run_id;
+  END IF;
+
+  IF p_chunk_key IS NOT NULL THEN
+    INSERT INTO crawler_run_chunks (run_id, chunk_key)
+    VALUES (p_run_id, p_chunk_key)
+    ON CONFLICT DO NOTHING;
+    GET DIAGNOSTICS v_inserted = ROW_COUNT;
+  END IF;
+
+  IF v_inserted = 1 THEN
+    UPDATE crawler_runs r
+    SET exams_found   = COALESCE(r.exams_found, 0) + p_found,
+        exams_new     = COALESCE(r.exams_new, 0) + p_new,
+        exams_updated = COALESCE(r.exams_updated, 0) + p_updated,
+        errors        = COALESCE(r.errors, 0) + p_errors,
+        error_log     = NULLIF(concat_ws(E'\n', r.error_log, NULLIF(p_error_log, '')), ''),
+        duration_ms   = COALESCE(r.duration_ms, 0) + p_duration_ms
+    WHERE r.id = p_run_id;
+  END IF;
+
+  SELECT COALESCE(r.errors, 0) INTO v_errors FROM crawler_runs r WHERE r.id = p_run_id;
+
+  RETURN QUERY
+  SELECT v_inserted = 0,
+         (SELECT count(*)::int FROM crawler_run_chunks c WHERE c.run_id = p_run_id),
+         v_errors;
+END;
+$$;